@@ -0,0 +1,649 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import hashlib
+import logging
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from threading import Lock
+
+from pysolbase.SolBase import SolBase
+
+from pysolhttpclient.Http.HttpResponse import HttpResponse
+from pysolhttpclient.NonCsDict.NonCsDict import NonCsDict
+
+logger = logging.getLogger(__name__)
+
+
+class HttpCache(object):
+    """
+    Http response cache (RFC 9111), in memory, bounded by bytes with LRU eviction.
+    - GET responses are stored if allowed (Cache-Control, Expires, status code), per Vary request headers
+    - fresh entries are served without network
+    - stale entries (or no-cache) are revalidated using If-None-Match / If-Modified-Since, a 304 is served from cache
+    - unsafe requests (POST, PUT, DELETE, PATCH) invalidate the uri
+    Install it using HttpClient.cache.
+    Storage is done by _storage_get / _storage_put / _storage_remove / _storage_clear (overridable).
+    """
+
+    # Status codes cacheable by default (heuristic freshness allowed)
+    CACHEABLE_STATUS_CODES = frozenset([200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501])
+
+    # Methods invalidating the cache
+    UNSAFE_METHODS = frozenset(["POST", "PUT", "DELETE", "PATCH"])
+
+    # Request headers bypassing the cache (caller driven conditional / partial requests)
+    BYPASS_REQUEST_HEADERS = frozenset(["if-none-match", "if-modified-since", "if-match", "if-unmodified-since", "if-range", "range"])
+
+    # Response headers not updated by a 304
+    NOT_UPDATED_HEADERS = frozenset(["content-length", "content-encoding", "transfer-encoding", "content-range"])
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_entry_bytes=8 * 1024 * 1024, shared=True, heuristic_max_sec=86400):
+        """
+        Const
+        :param max_bytes: int (max bytes stored, least recently used entries are evicted above)
+        :type max_bytes: int
+        :param max_entry_bytes: int (responses larger than this are not stored)
+        :type max_entry_bytes: int
+        :param shared: bool (shared cache : s-maxage honoured, private and authorized responses not stored)
+        :type shared: bool
+        :param heuristic_max_sec: int (max heuristic freshness, 10% of Last-Modified age, 0 to disable)
+        :type heuristic_max_sec: int
+        """
+
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.shared = shared
+        self.heuristic_max_sec = heuristic_max_sec
+        self._locker = Lock()
+
+        # Key => entry, in access order (oldest first)
+        self._d = OrderedDict()
+
+        # Primary key => vary header names (lower case) of the most recent response
+        self._vary = dict()
+
+        # Primary key => set of keys
+        self._keys = dict()
+
+        # Bytes stored
+        self.bytes = 0
+
+        # Counters
+        self.hit_count = 0
+        self.miss_count = 0
+        self.revalidate_count = 0
+        self.revalidated_count = 0
+        self.bypass_count = 0
+        self.store_count = 0
+        self.evicted_count = 0
+        self.invalidated_count = 0
+
+    # ====================================
+    # PARSING
+    # ====================================
+
+    @classmethod
+    def _header_get(cls, headers, name):
+        """
+        Get a header (case insensitive), multiple values joined by ","
+        :param headers: dict
+        :type headers: dict
+        :param name: str (lower case)
+        :type name: str
+        :return str,None
+        :rtype str,None
+        """
+
+        for k, v in headers.items():
+            if k.lower() == name:
+                if isinstance(v, list):
+                    v = ",".join(v)
+                if isinstance(v, bytes):
+                    v = v.decode("latin-1")
+                return v
+        return None
+
+    @classmethod
+    def _cache_control_parse(cls, value):
+        """
+        Parse a Cache-Control header
+        :param value: str,None
+        :type value: str,None
+        :return dict directive (lower case) => value (None if no value)
+        :rtype dict
+        """
+
+        d = dict()
+        if not value:
+            return d
+        for item in value.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            if "=" in item:
+                k, v = item.split("=", 1)
+                d[k.strip().lower()] = v.strip().strip('"')
+            else:
+                d[item.lower()] = None
+        return d
+
+    @classmethod
+    def _seconds_get(cls, d, name):
+        """
+        Get a delta-seconds directive
+        :param d: dict (parsed Cache-Control)
+        :type d: dict
+        :param name: str
+        :type name: str
+        :return int,None (None if absent or invalid)
+        :rtype int,None
+        """
+
+        v = d.get(name)
+        if v is None:
+            return None
+        try:
+            return max(0, int(v))
+        except ValueError:
+            return None
+
+    @classmethod
+    def _date_parse(cls, value):
+        """
+        Parse an http date
+        :param value: str,None
+        :type value: str,None
+        :return float,None (epoch seconds, None if absent or invalid)
+        :rtype float,None
+        """
+
+        if not value:
+            return None
+        try:
+            return parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return None
+
+    # ====================================
+    # KEYS
+    # ====================================
+
+    @classmethod
+    def method_get(cls, http_request):
+        """
+        Get the request method (upper case, auto-detected if not set)
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :return str
+        :rtype str
+        """
+
+        method = http_request.method
+        if not method:
+            method = "POST" if http_request.post_data else "GET"
+        return method.upper()
+
+    @classmethod
+    def _primary_key_get(cls, http_request):
+        """
+        Get the primary key (method, uri, decoding)
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :return str
+        :rtype str
+        """
+
+        return "{0} {1} {2}".format(cls.method_get(http_request), http_request.uri, int(bool(http_request.decompress_response)))
+
+    @classmethod
+    def _key_get(cls, primary_key, vary_names, headers):
+        """
+        Get the key (primary key and vary request header values)
+        :param primary_key: str
+        :type primary_key: str
+        :param vary_names: tuple (lower case header names)
+        :type vary_names: tuple
+        :param headers: dict (request headers)
+        :type headers: dict
+        :return str
+        :rtype str
+        """
+
+        if not vary_names:
+            return primary_key
+        h = hashlib.sha256()
+        for name in vary_names:
+            v = cls._header_get(headers, name)
+            h.update(b"\x00" if v is None else b"\x01" + " ".join(v.split()).encode("utf-8"))
+        return primary_key + " " + h.hexdigest()
+
+    # ====================================
+    # POLICY
+    # ====================================
+
+    def is_cacheable_request(self, http_request):
+        """
+        Return True if the cache can serve (or store) this request
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :return bool
+        :rtype bool
+        """
+
+        if self.method_get(http_request) != "GET" or http_request.post_data or http_request.stream_response:
+            return False
+        for k in http_request.headers.keys():
+            if k.lower() in HttpCache.BYPASS_REQUEST_HEADERS:
+                return False
+        if "no-store" in self._cache_control_parse(self._header_get(http_request.headers, "cache-control")):
+            return False
+        return True
+
+    def _entry_build(self, http_request, http_response, ms):
+        """
+        Build an entry from a response, None if not storable
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        :param ms: float (response time, epoch ms)
+        :type ms: float
+        :return dict,None
+        :rtype dict,None
+        """
+
+        if http_response.exception or http_response.buffer is None:
+            return None
+
+        headers = http_response.headers
+        cc = self._cache_control_parse(self._header_get(headers, "cache-control"))
+        if "no-store" in cc:
+            return None
+        if self.shared:
+            if "private" in cc:
+                return None
+            if self._header_get(http_request.headers, "authorization") is not None:
+                if not ("public" in cc or "s-maxage" in cc or "must-revalidate" in cc):
+                    return None
+
+        # Vary
+        vary = self._header_get(headers, "vary")
+        vary_names = tuple(sorted(set(v.strip().lower() for v in vary.split(",") if v.strip()))) if vary else tuple()
+        if "*" in vary_names:
+            return None
+
+        # Freshness lifetime (explicit, then heuristic)
+        now_sec = ms / 1000.0
+        date_sec = self._date_parse(self._header_get(headers, "date"))
+        if date_sec is None:
+            date_sec = now_sec
+        freshness_sec = None
+        if self.shared:
+            freshness_sec = self._seconds_get(cc, "s-maxage")
+        if freshness_sec is None:
+            freshness_sec = self._seconds_get(cc, "max-age")
+        if freshness_sec is None:
+            expires = self._header_get(headers, "expires")
+            if expires is not None:
+                # Invalid expires : already expired
+                expires_sec = self._date_parse(expires)
+                freshness_sec = max(0.0, expires_sec - date_sec) if expires_sec is not None else 0
+        explicit = freshness_sec is not None or "public" in cc
+
+        if not explicit and http_response.status_code not in HttpCache.CACHEABLE_STATUS_CODES:
+            return None
+
+        etag = self._header_get(headers, "etag")
+        last_modified = self._header_get(headers, "last-modified")
+        if freshness_sec is None:
+            freshness_sec = 0
+            lm_sec = self._date_parse(last_modified)
+            if lm_sec is not None and self.heuristic_max_sec:
+                freshness_sec = min(self.heuristic_max_sec, max(0.0, (date_sec - lm_sec) * 0.1))
+
+        # Nothing to serve nor revalidate
+        if freshness_sec <= 0 and etag is None and last_modified is None:
+            return None
+
+        # Initial age
+        try:
+            age_sec = max(0, int(self._header_get(headers, "age") or 0))
+        except ValueError:
+            age_sec = 0
+        age_sec = max(age_sec, now_sec - date_sec)
+
+        return {
+            "status_code": http_response.status_code,
+            "headers": list(headers.items()),
+            "buffer": http_response.buffer,
+            "content_length": http_response.content_length,
+            "vary_names": vary_names,
+            "response_ms": ms,
+            "age_sec": age_sec,
+            "freshness_sec": freshness_sec,
+            "no_cache": "no-cache" in cc,
+            "etag": etag,
+            "last_modified": last_modified,
+            "size": self._entry_size_get(http_response.buffer, headers),
+        }
+
+    @classmethod
+    def _entry_size_get(cls, buf, headers):
+        """
+        Get entry size in bytes (body and headers)
+        :param buf: bytes
+        :type buf: bytes
+        :param headers: dict
+        :type headers: dict
+        :return int
+        :rtype int
+        """
+
+        return len(buf) + sum(len(str(k)) + len(str(v)) for k, v in headers.items())
+
+    @classmethod
+    def _entry_is_fresh(cls, entry, http_request, ms):
+        """
+        Return True if the entry can be served without revalidation
+        :param entry: dict
+        :type entry: dict
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param ms: float (now, epoch ms)
+        :type ms: float
+        :return bool
+        :rtype bool
+        """
+
+        if entry["no_cache"]:
+            return False
+
+        req_cc = cls._cache_control_parse(cls._header_get(http_request.headers, "cache-control"))
+        if "no-cache" in req_cc:
+            return False
+        if not req_cc and "no-cache" in (cls._header_get(http_request.headers, "pragma") or "").lower():
+            return False
+
+        current_age_sec = entry["age_sec"] + max(0.0, (ms - entry["response_ms"]) / 1000.0)
+        freshness_sec = entry["freshness_sec"]
+        max_age = cls._seconds_get(req_cc, "max-age")
+        if max_age is not None:
+            freshness_sec = min(freshness_sec, max_age)
+        return current_age_sec < freshness_sec
+
+    # ====================================
+    # STORAGE (overridable)
+    # ====================================
+
+    def _storage_get(self, primary_key, http_request):
+        """
+        Get an entry
+        :param primary_key: str
+        :type primary_key: str
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :return dict,None
+        :rtype dict,None
+        """
+
+        with self._locker:
+            vary_names = self._vary.get(primary_key)
+            if vary_names is None:
+                return None
+            key = self._key_get(primary_key, vary_names, http_request.headers)
+            entry = self._d.get(key)
+            if entry is not None:
+                self._d.move_to_end(key)
+            return entry
+
+    def _storage_put(self, primary_key, http_request, entry):
+        """
+        Put an entry, evicting least recently used ones if required
+        :param primary_key: str
+        :type primary_key: str
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param entry: dict
+        :type entry: dict
+        """
+
+        with self._locker:
+            key = self._key_get(primary_key, entry["vary_names"], http_request.headers)
+            self._remove(key)
+            entry["primary_key"] = primary_key
+            self._vary[primary_key] = entry["vary_names"]
+            self._keys.setdefault(primary_key, set()).add(key)
+            self._d[key] = entry
+            self.bytes += entry["size"]
+
+            # Lru
+            while self.bytes > self.max_bytes and self._d:
+                self._remove(next(iter(self._d)))
+                self.evicted_count += 1
+
+    def _storage_remove(self, primary_key):
+        """
+        Remove all entries of a primary key
+        :param primary_key: str
+        :type primary_key: str
+        :return int (removed entries)
+        :rtype int
+        """
+
+        with self._locker:
+            keys = list(self._keys.get(primary_key, ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def _storage_clear(self):
+        """
+        Remove all entries
+        """
+
+        with self._locker:
+            self._d.clear()
+            self._vary.clear()
+            self._keys.clear()
+            self.bytes = 0
+
+    def _remove(self, key):
+        """
+        Remove a key (lock held)
+        :param key: str
+        :type key: str
+        """
+
+        entry = self._d.pop(key, None)
+        if entry is None:
+            return
+        self.bytes -= entry["size"]
+        primary_key = entry["primary_key"]
+        keys = self._keys.get(primary_key)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys[primary_key]
+                self._vary.pop(primary_key, None)
+
+    # ====================================
+    # API (HttpClient)
+    # ====================================
+
+    def lookup(self, http_request):
+        """
+        Lookup a request.
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :return tuple dict,None entry, bool fresh
+        :rtype tuple
+        """
+
+        entry = self._storage_get(self._primary_key_get(http_request), http_request)
+        if entry is None:
+            self.miss_count += 1
+            return None, False
+        if self._entry_is_fresh(entry, http_request, SolBase.mscurrent()):
+            self.hit_count += 1
+            return entry, True
+        self.revalidate_count += 1
+        return entry, False
+
+    @classmethod
+    def conditional_headers_get(cls, http_request, entry):
+        """
+        Get request headers for a revalidation (copied)
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param entry: dict
+        :type entry: dict
+        :return dict
+        :rtype dict
+        """
+
+        headers = dict(http_request.headers)
+        if entry["etag"] is not None:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"] is not None:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, http_request, http_response):
+        """
+        Store a response (if allowed)
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        :return bool (True if stored)
+        :rtype bool
+        """
+
+        entry = self._entry_build(http_request, http_response, SolBase.mscurrent())
+        if entry is None or entry["size"] > self.max_entry_bytes:
+            return False
+        self._storage_put(self._primary_key_get(http_request), http_request, entry)
+        self.store_count += 1
+        return True
+
+    def revalidated(self, http_request, entry, http_response):
+        """
+        Update an entry upon 304 (headers and freshness), and store it
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param entry: dict
+        :type entry: dict
+        :param http_response: HttpResponse (304)
+        :type http_response: HttpResponse
+        :return dict (updated entry)
+        :rtype dict
+        """
+
+        headers = NonCsDict(entry["headers"])
+        for k, v in http_response.headers.items():
+            if k.lower() not in HttpCache.NOT_UPDATED_HEADERS:
+                headers[k] = v
+
+        # Rebuild over updated headers
+        r = HttpResponse()
+        r.status_code = entry["status_code"]
+        r.headers = headers
+        r.buffer = entry["buffer"]
+        r.content_length = entry["content_length"]
+        new_entry = self._entry_build(http_request, r, SolBase.mscurrent())
+        self.revalidated_count += 1
+        if new_entry is None:
+            # No more storable (no-store...), serve once
+            self._storage_remove(self._primary_key_get(http_request))
+            new_entry = dict(entry)
+            new_entry["headers"] = list(headers.items())
+            return new_entry
+        self._storage_put(self._primary_key_get(http_request), http_request, new_entry)
+        return new_entry
+
+    @classmethod
+    def response_fill(cls, entry, http_response, ms):
+        """
+        Fill a response from an entry (body buffer is shared)
+        :param entry: dict
+        :type entry: dict
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        :param ms: float (now, epoch ms)
+        :type ms: float
+        """
+
+        http_response.status_code = entry["status_code"]
+        http_response.headers = NonCsDict(entry["headers"])
+        http_response.headers["age"] = str(int(entry["age_sec"] + max(0.0, (ms - entry["response_ms"]) / 1000.0)))
+        http_response.buffer = entry["buffer"]
+        http_response.content_length = entry["content_length"]
+        http_response.decompressed_bytes = len(entry["buffer"])
+        http_response.compressed_bytes = 0
+        http_response.from_cache = True
+
+    def invalidate(self, uri):
+        """
+        Invalidate an uri (all variants)
+        :param uri: str
+        :type uri: str
+        """
+
+        n = 0
+        for dec in (0, 1):
+            n += self._storage_remove("GET {0} {1}".format(uri, dec))
+        self.invalidated_count += n
+
+    def clear(self):
+        """
+        Remove all entries (counters are kept)
+        """
+
+        self._storage_clear()
+
+    def __len__(self):
+        """
+        Entries count
+        :return int
+        :rtype int
+        """
+
+        return len(self._d)
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hcache:n={0}*bytes={1}*hit={2}*miss={3}*reval={4}*revald={5}*store={6}*evict={7}".format(
+            len(self._d),
+            self.bytes,
+            self.hit_count,
+            self.miss_count,
+            self.revalidate_count,
+            self.revalidated_count,
+            self.store_count,
+            self.evicted_count,
+        )
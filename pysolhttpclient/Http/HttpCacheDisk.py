@@ -0,0 +1,350 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import json
+import logging
+import os
+import sqlite3
+
+import gevent
+from gevent.lock import Semaphore
+from pysolbase.SolBase import SolBase
+
+from pysolhttpclient.Http.HttpCache import HttpCache
+
+logger = logging.getLogger(__name__)
+
+
+class HttpCacheDisk(HttpCache):
+    """
+    Http response cache (RFC 9111), on disk (sqlite, WAL), shared by processes using the same file.
+    Policy is the one of HttpCache, only storage differs :
+    - entries survive restarts (workers start warm) and are shared by all processes
+    - bytes are bounded (max_bytes), least recently used entries are evicted (by any process)
+    - bodies are stored as blobs and read in one copy
+    Connections are opened lazily per process (fork safe).
+    Sqlite calls run in the gevent hub threadpool (other greenlets keep running while sqlite works or waits for locks),
+    a lock held by another process longer than busy_timeout_ms is a miss (get) or a skipped store (put).
+    """
+
+    # Access time is updated at most every ACCESS_UPDATE_MS per entry (limit writes on hits)
+    ACCESS_UPDATE_MS = 1000
+
+    _SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS entry ("
+        "key TEXT PRIMARY KEY, primary_key TEXT NOT NULL, meta TEXT NOT NULL, body BLOB NOT NULL, "
+        "size INTEGER NOT NULL, access_ms REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS entry_primary_key ON entry (primary_key)",
+        "CREATE INDEX IF NOT EXISTS entry_access_ms ON entry (access_ms)",
+        "CREATE TABLE IF NOT EXISTS vary (primary_key TEXT PRIMARY KEY, names TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS stat (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL, count INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO stat (id, bytes, count) VALUES (0, 0, 0)",
+        "CREATE TRIGGER IF NOT EXISTS entry_insert AFTER INSERT ON entry BEGIN "
+        "UPDATE stat SET bytes = bytes + NEW.size, count = count + 1 WHERE id = 0; END",
+        "CREATE TRIGGER IF NOT EXISTS entry_delete AFTER DELETE ON entry BEGIN "
+        "UPDATE stat SET bytes = bytes - OLD.size, count = count - 1 WHERE id = 0; "
+        "DELETE FROM vary WHERE primary_key = OLD.primary_key "
+        "AND NOT EXISTS (SELECT 1 FROM entry WHERE primary_key = OLD.primary_key); END",
+    ]
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, max_entry_bytes=8 * 1024 * 1024, shared=True, heuristic_max_sec=86400, busy_timeout_ms=500):
+        """
+        Const
+        :param path: str (sqlite file, created if required, shared by processes)
+        :type path: str
+        :param max_bytes: int (max bytes stored, least recently used entries are evicted above)
+        :type max_bytes: int
+        :param max_entry_bytes: int (responses larger than this are not stored)
+        :type max_entry_bytes: int
+        :param shared: bool (shared cache : s-maxage honoured, private and authorized responses not stored)
+        :type shared: bool
+        :param heuristic_max_sec: int (max heuristic freshness, 10% of Last-Modified age, 0 to disable)
+        :type heuristic_max_sec: int
+        :param busy_timeout_ms: int (wait for other processes locks, then miss or skip store)
+        :type busy_timeout_ms: int
+        """
+
+        super(HttpCacheDisk, self).__init__(max_bytes=max_bytes, max_entry_bytes=max_entry_bytes, shared=shared, heuristic_max_sec=heuristic_max_sec)
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        # Greenlet aware : held while the threadpool runs the query
+        self._db_locker = Semaphore()
+
+        # Last known entries count
+        self._count = 0
+
+        # Connection, and the pid which opened it
+        self._db = None
+        self._db_pid = None
+
+        # Validate now
+        self._db_get()
+
+    # ====================================
+    # SQLITE
+    # ====================================
+
+    def _db_get(self):
+        """
+        Get the connection of this process (lock held or init)
+        :return sqlite3.Connection
+        :rtype sqlite3.Connection
+        """
+
+        pid = os.getpid()
+        if self._db is not None and self._db_pid == pid:
+            return self._db
+
+        # New process (fork) : do not reuse the parent connection
+        db = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000.0, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("PRAGMA busy_timeout=%d" % int(self.busy_timeout_ms))
+        for sql in HttpCacheDisk._SCHEMA:
+            db.execute(sql)
+        self._db = db
+        self._db_pid = pid
+        logger.debug("Sqlite opened, path=%s, pid=%s", self.path, pid)
+        return db
+
+    def _stat_refresh(self, db):
+        """
+        Refresh bytes from the shared stat
+        :param db: sqlite3.Connection
+        :type db: sqlite3.Connection
+        :return int (entries count)
+        :rtype int
+        """
+
+        self.bytes, self._count = db.execute("SELECT bytes, count FROM stat WHERE id = 0").fetchone()
+        return self._count
+
+    def _db_run(self, func, *args):
+        """
+        Run func(db, *args) in the hub threadpool (one at a time, connection of this process)
+        :param func: callable
+        :type func: callable
+        :return object (func result)
+        :rtype object
+        """
+
+        with self._db_locker:
+            return gevent.get_hub().threadpool.apply(lambda: func(self._db_get(), *args))
+
+    @classmethod
+    def _is_locked(cls, e):
+        """
+        Return True if e is a sqlite lock timeout (another process holds the lock)
+        :param e: Exception
+        :type e: Exception
+        :return bool
+        :rtype bool
+        """
+
+        return isinstance(e, sqlite3.OperationalError) and "locked" in str(e)
+
+    # ====================================
+    # STORAGE
+    # ====================================
+
+    def _storage_get(self, primary_key, http_request):
+        """
+        Get an entry
+        :param primary_key: str
+        :type primary_key: str
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :return dict,None
+        :rtype dict,None
+        """
+
+        def _get(db):
+            """
+            Get (threadpool)
+            """
+            r = db.execute("SELECT names FROM vary WHERE primary_key = ?", (primary_key,)).fetchone()
+            if r is None:
+                return None
+            key = self._key_get(primary_key, tuple(json.loads(r[0])), http_request.headers)
+            r = db.execute("SELECT meta, body, access_ms FROM entry WHERE key = ?", (key,)).fetchone()
+            if r is None:
+                return None
+            ms = SolBase.mscurrent()
+            if ms - r[2] >= HttpCacheDisk.ACCESS_UPDATE_MS:
+                db.execute("UPDATE entry SET access_ms = ? WHERE key = ?", (ms, key))
+            return r
+
+        try:
+            row = self._db_run(_get)
+        except sqlite3.OperationalError as e:
+            if not self._is_locked(e):
+                raise
+            logger.warning("Sqlite locked, get is a miss, path=%s, ex=%s", self.path, e)
+            return None
+        if row is None:
+            return None
+
+        entry = json.loads(row[0])
+        entry["vary_names"] = tuple(entry["vary_names"])
+        entry["buffer"] = row[1]
+        return entry
+
+    def _storage_put(self, primary_key, http_request, entry):
+        """
+        Put an entry, evicting least recently used ones if required
+        :param primary_key: str
+        :type primary_key: str
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param entry: dict
+        :type entry: dict
+        """
+
+        key = self._key_get(primary_key, entry["vary_names"], http_request.headers)
+        meta = dict(entry)
+        body = meta.pop("buffer")
+        meta["primary_key"] = primary_key
+        meta = json.dumps(meta)
+
+        def _put(db):
+            """
+            Put (threadpool)
+            """
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute("DELETE FROM entry WHERE key = ?", (key,))
+                db.execute("INSERT INTO entry (key, primary_key, meta, body, size, access_ms) VALUES (?, ?, ?, ?, ?, ?)",
+                           (key, primary_key, meta, sqlite3.Binary(body), entry["size"], SolBase.mscurrent()))
+                db.execute("INSERT OR REPLACE INTO vary (primary_key, names) VALUES (?, ?)", (primary_key, json.dumps(entry["vary_names"])))
+
+                # Lru : least recently used entries, until enough bytes are freed, in one statement
+                n = 0
+                self._stat_refresh(db)
+                if self.bytes > self.max_bytes:
+                    n = db.execute(
+                        "DELETE FROM entry WHERE key IN (SELECT key FROM ("
+                        "SELECT key, size, SUM(size) OVER (ORDER BY access_ms, key ROWS UNBOUNDED PRECEDING) AS cum FROM entry"
+                        ") WHERE cum - size < ?)",
+                        (self.bytes - self.max_bytes,)).rowcount
+                    self._stat_refresh(db)
+                db.execute("COMMIT")
+                return n
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+        try:
+            self.evicted_count += self._db_run(_put)
+        except sqlite3.OperationalError as e:
+            if not self._is_locked(e):
+                raise
+            logger.warning("Sqlite locked, store skipped, path=%s, ex=%s", self.path, e)
+
+    def _storage_remove(self, primary_key):
+        """
+        Remove all entries of a primary key
+        :param primary_key: str
+        :type primary_key: str
+        :return int (removed entries)
+        :rtype int
+        """
+
+        def _remove(db):
+            """
+            Remove (threadpool)
+            """
+            n = db.execute("DELETE FROM entry WHERE primary_key = ?", (primary_key,)).rowcount
+            self._stat_refresh(db)
+            return n
+
+        try:
+            return self._db_run(_remove)
+        except sqlite3.OperationalError as e:
+            if not self._is_locked(e):
+                raise
+            logger.warning("Sqlite locked, remove skipped, path=%s, ex=%s", self.path, e)
+            return 0
+
+    def _storage_clear(self):
+        """
+        Remove all entries
+        """
+
+        def _clear(db):
+            """
+            Clear (threadpool)
+            """
+            db.execute("DELETE FROM entry")
+            db.execute("DELETE FROM vary")
+            self._stat_refresh(db)
+
+        try:
+            self._db_run(_clear)
+        except sqlite3.OperationalError as e:
+            if not self._is_locked(e):
+                raise
+            logger.warning("Sqlite locked, clear skipped, path=%s, ex=%s", self.path, e)
+
+    def close(self):
+        """
+        Close the connection (reopened on demand)
+        """
+
+        with self._db_locker:
+            if self._db is not None and self._db_pid == os.getpid():
+                self._db.close()
+            self._db = None
+            self._db_pid = None
+
+    def __len__(self):
+        """
+        Entries count (last known one if the database is locked)
+        :return int
+        :rtype int
+        """
+
+        try:
+            return self._db_run(self._stat_refresh)
+        except sqlite3.OperationalError as e:
+            if not self._is_locked(e):
+                raise
+            logger.warning("Sqlite locked, count not refreshed, path=%s, ex=%s", self.path, e)
+            return self._count
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hcachedisk:path={0}*n={1}*bytes={2}*hit={3}*miss={4}*reval={5}*revald={6}*store={7}*evict={8}".format(
+            self.path,
+            len(self),
+            self.bytes,
+            self.hit_count,
+            self.miss_count,
+            self.revalidate_count,
+            self.revalidated_count,
+            self.store_count,
+            self.evicted_count,
+        )
@@ -22,24 +22,51 @@
 # ===============================================================================
 """
 
+# WE MUST MONKEY PATCH ASAP HERE FOR PY3
+from pysolbase.SolBase import SolBase
+
+SolBase.voodoo_init(init_logging=False)
+
+# noinspection PyPep8
+import copy
 import logging
-from ssl import CERT_NONE
+import socket
+import warnings
+from ssl import CERT_NONE, create_default_context
 from threading import Lock
+from urllib.parse import urljoin
 
 import gevent
 import urllib3
+from gevent.local import local
+from gevent.pool import Pool
+from gevent.queue import Empty, Queue
 from gevent.timeout import Timeout
-from geventhttpclient.client import PROTO_HTTPS, HTTPClient, METHOD_GET
+from geventhttpclient.client import HTTPClient, METHOD_GET
+from geventhttpclient.connectionpool import ConnectionPool, SSLConnectionPool
 from geventhttpclient.url import URL
-from pysolbase.SolBase import SolBase
 from urllib3 import PoolManager, ProxyManager, Retry
-
+from urllib3.exceptions import InsecureRequestWarning, NameResolutionError, ConnectTimeoutError, NewConnectionError, LocationParseError
+from urllib3.util.connection import allowed_gai_family
+
+from pysolhttpclient.Http.HttpCoalescer import HttpCoalescer
+from pysolhttpclient.Http.HttpContentDecoder import HttpContentDecoder
+from pysolhttpclient.Http.HttpContentEncoder import HttpContentEncoder
+from pysolhttpclient.Http.HttpHook import HttpHook
+from pysolhttpclient.Http.HttpImpl import HttpImpl
+from pysolhttpclient.Http.HttpLatencyStats import HttpLatencyStats
+from pysolhttpclient.Http.HttpPoolCache import HttpPoolCache
+from pysolhttpclient.Http.HttpPoolStats import HttpPoolStats
+from pysolhttpclient.Http.HttpRequestBody import HttpRequestBody
 from pysolhttpclient.Http.HttpResponse import HttpResponse
+from pysolhttpclient.Http.HttpResponseStream import HttpResponseStream
+from pysolhttpclient.Http.HttpRetryBudget import HttpRetryBudget
 
 logger = logging.getLogger(__name__)
 
 # Suppress warnings
 urllib3.disable_warnings()
+warnings.simplefilter("ignore", InsecureRequestWarning)
 
 
 class HttpClient(object):
@@ -47,9 +74,17 @@ class HttpClient(object):
     Http client
     """
 
-    HTTP_IMPL_AUTO = None
-    HTTP_IMPL_GEVENT = 1
-    HTTP_IMPL_URLLIB3 = 3
+    HTTP_IMPL_AUTO = HttpImpl.HTTP_IMPL_AUTO
+    HTTP_IMPL_GEVENT = HttpImpl.HTTP_IMPL_GEVENT
+    HTTP_IMPL_URLLIB3 = HttpImpl.HTTP_IMPL_URLLIB3
+    HTTP_IMPL_ASYNCIO = HttpImpl.HTTP_IMPL_ASYNCIO
+
+    # Redirect status codes (HttpRequest.follow_redirects)
+    REDIRECT_STATUS_CODES = frozenset([301, 302, 303, 307, 308])
+
+    # Gevent : current greenlet timeouts, tuple (connection_timeout_sec, network_timeout_sec)
+    _gevent_local = local()
+    GEVENT_DEFAULT_TIMEOUTS = (10.0, 10.0)
 
     def __init__(self):
         """
@@ -57,17 +92,41 @@ class HttpClient(object):
         """
 
         # Gevent
-        self._gevent_pool_max = 1024
         self._gevent_locker = Lock()
-        self._gevent_pool = dict()
+        self._gevent_pool = HttpPoolCache("gevent", close_func=lambda p: p.close(), max_size=1024, idle_ttl_ms=300000)
+        self._gevent_ssl_context_insecure = None
 
         # urllib3
         # Force underlying fifo queue to 1024 via maxsize
-        self._u3_basic_pool_https_assert_off = PoolManager(num_pools=1024, maxsize=1024, assert_hostname=False, cert_reqs=CERT_NONE)
-        self._u3_basic_pool_assert_on = PoolManager(num_pools=1024, maxsize=1024)
-        self._u3_proxy_pool_max = 1024
+        self._u3_basic_pool_https_assert_off = self._urllib3_manager_install(PoolManager(num_pools=1024, maxsize=1024, assert_hostname=False, cert_reqs=CERT_NONE))
+        self._u3_basic_pool_assert_on = self._urllib3_manager_install(PoolManager(num_pools=1024, maxsize=1024))
         self._u3_proxy_locker = Lock()
-        self._u3_proxy_pool = dict()
+        self._u3_proxy_pool = HttpPoolCache("urllib3", close_func=lambda p: p.clear(), max_size=1024, idle_ttl_ms=300000)
+
+        # Batch (go_http_many) default concurrency
+        self.http_many_concurrency = 64
+
+        # Retry budget (HttpRetryBudget), caps retries (HttpRequest.retry_policy) to a ratio of the traffic, None to disable
+        self.retry_budget = HttpRetryBudget()
+
+        # Response cache (HttpCache), None to disable
+        self.cache = None
+
+        # Coalescing (single flight) of identical concurrent requests (HttpRequest.coalesce)
+        self.coalescer = HttpCoalescer()
+
+        # Dns cache (HttpDnsCache), used by new connections of all pools (gevent and urllib3), None to disable
+        self.dns_cache = None
+
+        # Latency histograms (HttpLatencyStats) per host, status class and backend, None to disable
+        self.latency_stats = HttpLatencyStats()
+
+        # Lifecycle hooks (HttpHook), see hook_add, compiled per lifecycle method
+        self._hooks = list()
+        self._hooks_pre_send = list()
+        self._hooks_on_connect = list()
+        self._hooks_on_response = list()
+        self._hooks_on_error = list()
 
     # ====================================
     # GEVENT HTTP POOL
@@ -84,54 +143,415 @@ class HttpClient(object):
         :rtype HTTPClient
         """
 
-        # Compute key
-        key = "{0}#{1}#{2}#{3}#{4}#{5}#{6}#{7}#{8}#{9}#".format(
-            # host and port
-            url.host,
-            url.port,
-            # Ssl
-            url.scheme == PROTO_HTTPS,
-            # Other dynamic stuff
-            http_request.https_insecure,
-            http_request.disable_ipv6,
-            http_request.connection_timeout_ms / 1000,
-            http_request.network_timeout_ms / 1000,
-            http_request.http_concurrency,
-            http_request.http_proxy_host,
-            http_request.http_proxy_port,
-        )
-
-        # Check
-        if key in self._gevent_pool:
+        # Key (prepared once per request)
+        # Timeouts are per request (applied to borrowed sockets), they are not part of the key
+        # Concurrency is fixed by the request which allocates the pool
+        # Mtls material hash is appended (material may be rotated)
+        prepared = http_request.prepare()
+        key = prepared.pool_key
+        if http_request.mtls_enabled:
+            if not prepared.is_https:
+                raise Exception("Cannot process, mtls ON, https OFF")
+            key = key + (http_request.mtls_pool_key_get(),)
+
+        # Check (in lock : get updates the lru order and may evict idle pools)
+        with self._gevent_locker:
+            http = self._gevent_pool.get(key)
+        if http is not None:
             SolBase.sleep(0)
-            return self._gevent_pool[key]
+            return http
 
         # Allocate (in lock)
         with self._gevent_locker:
-            # Check maxed
-            if len(self._gevent_pool) >= self._gevent_pool_max:
-                raise Exception("gevent pool maxed, cur={0}, max={1}".format(
-                    len(self._gevent_pool), self._gevent_pool_max
-                ))
+            # Re-check
+            http = self._gevent_pool.get(key)
+            if http is not None:
+                return http
+
+            # Mtls : ssl context (client key, crt and ca) from cache, shared by pools with the same material
+            # Notice : geventhttpclient sets check_hostname from insecure on it, which is the value it already has
+            if http_request.mtls_enabled:
+                ssl_context = http_request.mtls_ssl_context_get()
+
+                def ssl_context_factory(*_, **__):
+                    return ssl_context
+            elif http_request.https_insecure:
+                # Insecure : no certificate verification (as urllib3 and asyncio), geventhttpclient only skips hostname check
+                ssl_context_insecure = self._gevent_ssl_context_insecure_get()
+
+                def ssl_context_factory(*_, **__):
+                    return ssl_context_insecure
+            else:
+                ssl_context_factory = None
 
-            # Ok, allocate
+            # Ok, allocate (least recently used pools are evicted if maxed)
+            # Pool timeouts are disabled, per request timeouts are applied by _gevent_pool_install
             http = HTTPClient.from_url(
                 url,
                 insecure=http_request.https_insecure,
                 disable_ipv6=http_request.disable_ipv6,
-                connection_timeout=http_request.connection_timeout_ms / 1000,
-                network_timeout=http_request.network_timeout_ms / 1000,
+                connection_timeout=None,
+                network_timeout=None,
                 concurrency=http_request.http_concurrency,
                 proxy_host=http_request.http_proxy_host,
                 proxy_port=http_request.http_proxy_port,
+                ssl_context_factory=ssl_context_factory,
                 headers={},
             )
+            self._gevent_pool_install(http)
 
-            self._gevent_pool[key] = http
+            self._gevent_pool.put(key, http)
             logger.info("Started new pool for key=%s", key)
             SolBase.sleep(0)
             return http
 
+    def _gevent_ssl_context_insecure_get(self):
+        """
+        Get the gevent insecure ssl context (no hostname check, no certificate verification), shared by pools
+        :return ssl.SSLContext
+        :rtype ssl.SSLContext
+        """
+
+        if self._gevent_ssl_context_insecure is None:
+            ctx = create_default_context()
+            ctx.check_hostname = False
+            ctx.verify_mode = CERT_NONE
+            self._gevent_ssl_context_insecure = ctx
+        return self._gevent_ssl_context_insecure
+
+    @classmethod
+    def _gevent_timeouts_get(cls):
+        """
+        Get current greenlet timeouts
+        :return tuple (connection_timeout_sec, network_timeout_sec)
+        :rtype tuple
+        """
+
+        return getattr(HttpClient._gevent_local, "timeouts", HttpClient.GEVENT_DEFAULT_TIMEOUTS)
+
+    @classmethod
+    def _timings_get(cls):
+        """
+        Get current greenlet timings (set by _go_gevent and _go_urllib3), None if not set
+        :return HttpTimings,None
+        :rtype HttpTimings,None
+        """
+
+        return getattr(HttpClient._gevent_local, "timings", None)
+
+    def _gevent_pool_install(self, http):
+        """
+        Install per request timeouts, dns cache, timings and counters on a gevent client connection pool.
+        Timeouts are read from the current greenlet (set by _go_gevent) :
+        - connection timeout : bound resolution, then each address connection (connect, proxy tunnel, tls handshake)
+        - network timeout : applied to each borrowed socket (new or reused)
+        Resolution goes through dns_cache if set.
+        Phases (pool wait, dns, connect, tls) are recorded in current greenlet timings.
+        Sockets borrowed by keep-alive off requests are closed instead of going back to the pool.
+        :param http: HTTPClient
+        :type http: HTTPClient
+        """
+
+        # noinspection PyProtectedMember
+        cp = http._connection_pool
+        create_socket = cp._create_socket
+        get_socket = cp.get_socket
+        return_socket = cp.return_socket
+        release_socket = cp.release_socket
+        resolve = cp._resolve
+        # noinspection PyProtectedMember
+        connect_socket = cp._connect_socket
+        is_ssl = isinstance(cp, SSLConnectionPool)
+
+        # Counters (HttpClient.stats)
+        cp.pool_stats = HttpPoolStats()
+
+        # Sockets borrowed by keep-alive off requests (ids), closed instead of returned
+        no_reuse = set()
+
+        def _connection_timeout_get():
+            connection_timeout_sec, _ = HttpClient._gevent_timeouts_get()
+            return connection_timeout_sec, Timeout(
+                connection_timeout_sec, socket.timeout("Connection timeout, connection_timeout_sec={0}".format(connection_timeout_sec)))
+
+        def _resolve():
+            ms = SolBase.mscurrent()
+            try:
+                with _connection_timeout_get()[1]:
+                    dns_cache = self.dns_cache
+                    if dns_cache is None:
+                        return resolve()
+                    # noinspection PyProtectedMember
+                    return dns_cache.getaddrinfo(
+                        cp._connection_host, cp._connection_port,
+                        socket.AF_INET if cp.disable_ipv6 else 0, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+            finally:
+                t = HttpClient._timings_get()
+                if t:
+                    t.add("dns_ms", SolBase.msdiff(ms))
+
+        def _connect_socket(sock, address):
+            # One timeout per address (request one, not the pool one) : on timeout (socket.timeout, an OSError), create_socket goes to the next one
+            connection_timeout_sec, timeout = _connection_timeout_get()
+            sock.settimeout(connection_timeout_sec)
+            with timeout:
+                return _connect_socket_timed(sock, address)
+
+        def _connect_socket_timed(sock, address):
+            t = HttpClient._timings_get()
+            if not is_ssl:
+                ms = SolBase.mscurrent()
+                sock = connect_socket(sock, address)
+                if t:
+                    t.add("connect_ms", SolBase.msdiff(ms))
+                return sock
+
+            # Ssl : as SSLConnectionPool._connect_socket, tcp (and proxy tunnel) then tls handshake, timed apart
+            ms = SolBase.mscurrent()
+            sock = ConnectionPool._connect_socket(cp, sock, address)
+            # noinspection PyProtectedMember
+            if cp._use_proxy:
+                # noinspection PyProtectedMember
+                cp._setup_proxy(sock)
+            if t:
+                t.add("connect_ms", SolBase.msdiff(ms))
+            ms = SolBase.mscurrent()
+            # noinspection PyProtectedMember
+            sock = cp.ssl_context.wrap_socket(sock, server_hostname=cp.ssl_options.get("server_hostname", cp._request_host))
+            if t:
+                t.add("tls_ms", SolBase.msdiff(ms))
+            return sock
+
+        def _create_socket():
+            ms = SolBase.mscurrent()
+            try:
+                sock = create_socket()
+                cp.pool_stats.connections_created += 1
+                if self._hooks_on_connect:
+                    self._hooks_on_connect_fire()
+                return sock
+            finally:
+                t = HttpClient._timings_get()
+                if t:
+                    t.connection_new = True
+                    # noinspection PyProtectedMember
+                    t._setup_ms += SolBase.msdiff(ms)
+
+        def _get_socket():
+            HttpClient._gevent_local.pool_stats = cp.pool_stats
+            ms = SolBase.mscurrent()
+            sock = get_socket()
+            t = HttpClient._timings_get()
+            if t:
+                # noinspection PyProtectedMember
+                t.pool_ms = max(0.0, SolBase.msdiff(ms) - t._setup_ms)
+                # noinspection PyProtectedMember
+                t._mark_ms = SolBase.mscurrent()
+            _, network_timeout_sec = HttpClient._gevent_timeouts_get()
+            sock.settimeout(network_timeout_sec)
+            if not getattr(HttpClient._gevent_local, "keep_alive", True):
+                no_reuse.add(id(sock))
+            return sock
+
+        def _return_socket(sock):
+            if no_reuse and id(sock) in no_reuse:
+                no_reuse.discard(id(sock))
+                release_socket(sock)
+            else:
+                return_socket(sock)
+
+        def _release_socket(sock):
+            no_reuse.discard(id(sock))
+            release_socket(sock)
+
+        cp._create_socket = _create_socket
+        cp.get_socket = _get_socket
+        cp.return_socket = _return_socket
+        cp.release_socket = _release_socket
+        cp._resolve = _resolve
+        cp._connect_socket = _connect_socket
+
+    # ====================================
+    # URLLIB3 DNS AND TIMINGS
+    # ====================================
+
+    def _urllib3_manager_install(self, pm):
+        """
+        Install dns cache, timings and counters on a urllib3 pool manager (or proxy manager) :
+        - new connections resolve through dns_cache if set
+        - phases (pool wait, dns, connect, tls, write, ttfb) are recorded in current greenlet timings
+        - each pool gets its counters (HttpPoolStats, HttpClient.stats)
+        - connections used by keep-alive off requests are closed when going back to their pool
+        :param pm: urllib3.PoolManager
+        :type pm: urllib3.PoolManager
+        :return urllib3.PoolManager
+        :rtype urllib3.PoolManager
+        """
+
+        # noinspection PyProtectedMember
+        new_pool = pm._new_pool
+
+        def _new_pool(scheme, host, port, request_context=None):
+            pool = new_pool(scheme, host, port, request_context=request_context)
+            # noinspection PyProtectedMember
+            new_conn = pool._new_conn
+            # noinspection PyProtectedMember
+            get_conn = pool._get_conn
+            # noinspection PyProtectedMember
+            put_conn = pool._put_conn
+            pool.pool_stats = HttpPoolStats()
+
+            def _pool_get_conn(*args, **kwargs):
+                HttpClient._gevent_local.pool_stats = pool.pool_stats
+                ms = SolBase.mscurrent()
+                conn = get_conn(*args, **kwargs)
+                t = HttpClient._timings_get()
+                if t:
+                    t.pool_ms = SolBase.msdiff(ms)
+                conn.no_reuse = not getattr(HttpClient._gevent_local, "keep_alive", True)
+                return conn
+
+            def _pool_put_conn(conn):
+                # Keep-alive off : closed, reconnects on next use
+                if conn is not None and getattr(conn, "no_reuse", False):
+                    conn.no_reuse = False
+                    conn.close()
+                put_conn(conn)
+
+            def _pool_new_conn():
+                conn = new_conn()
+                self._urllib3_connection_install(conn, pool.pool_stats)
+                return conn
+
+            pool._get_conn = _pool_get_conn
+            pool._put_conn = _pool_put_conn
+            pool._new_conn = _pool_new_conn
+            return pool
+
+        pm._new_pool = _new_pool
+        return pm
+
+    def _urllib3_connection_install(self, conn, pool_stats):
+        """
+        Install dns cache, timings and counters on a urllib3 connection
+        :param conn: urllib3.connection.HTTPConnection
+        :type conn: urllib3.connection.HTTPConnection
+        :param pool_stats: HttpPoolStats (of the connection pool)
+        :type pool_stats: HttpPoolStats
+        """
+
+        connect = conn.connect
+        request = conn.request
+        getresponse = conn.getresponse
+
+        def _connect():
+            # Connect : tcp (_new_conn), then proxy tunnel and tls handshake (https)
+            t = HttpClient._timings_get()
+            ms = SolBase.mscurrent()
+            if t:
+                t.connection_new = True
+                connect_ms = t.connect_ms or 0.0
+                dns_ms = t.dns_ms or 0.0
+            connect()
+            pool_stats.connections_created += 1
+            if self._hooks_on_connect:
+                self._hooks_on_connect_fire()
+            if t:
+                setup_ms = SolBase.msdiff(ms)
+                # noinspection PyProtectedMember
+                t._setup_ms += setup_ms
+                tls_ms = setup_ms - ((t.connect_ms or 0.0) - connect_ms) - ((t.dns_ms or 0.0) - dns_ms)
+                if conn.sock is not None and hasattr(conn.sock, "cipher"):
+                    t.add("tls_ms", max(0.0, tls_ms))
+                else:
+                    t.add("connect_ms", max(0.0, tls_ms))
+
+        def _request(*args, **kwargs):
+            # Http connections connect while sending, setup is excluded
+            t = HttpClient._timings_get()
+            ms = SolBase.mscurrent()
+            # noinspection PyProtectedMember
+            setup_ms = t._setup_ms if t else 0.0
+            request(*args, **kwargs)
+            if t:
+                # noinspection PyProtectedMember
+                t.add("write_ms", max(0.0, SolBase.msdiff(ms) - (t._setup_ms - setup_ms)))
+
+        def _getresponse(*args, **kwargs):
+            ms = SolBase.mscurrent()
+            r = getresponse(*args, **kwargs)
+            t = HttpClient._timings_get()
+            if t:
+                t.ttfb_ms = SolBase.msdiff(ms)
+            return r
+
+        # noinspection PyProtectedMember
+        new_conn = conn._new_conn
+        conn._new_conn = lambda: self._urllib3_new_conn(conn, new_conn)
+        conn.connect = _connect
+        conn.request = _request
+        conn.getresponse = _getresponse
+
+    def _urllib3_new_conn(self, conn, new_conn):
+        """
+        Connect a urllib3 connection (tcp) through its original _new_conn, recording timings.
+        Without dns_cache, new_conn is called as is (name resolution is included in connect_ms).
+        With dns_cache, the host is resolved through it, then new_conn is called for each address in order,
+        the address being set as the connection dns host (tls server name and Host header still use the host).
+        :param conn: urllib3.connection.HTTPConnection
+        :type conn: urllib3.connection.HTTPConnection
+        :param new_conn: callable (original HTTPConnection._new_conn, bound)
+        :type new_conn: callable
+        :return socket.socket
+        :rtype socket.socket
+        """
+
+        t = HttpClient._timings_get()
+        dns_cache = self.dns_cache
+        if dns_cache is None:
+            ms = SolBase.mscurrent()
+            try:
+                return new_conn()
+            finally:
+                if t:
+                    t.add("connect_ms", SolBase.msdiff(ms))
+
+        # Resolve (as urllib3 create_connection : idna check, allowed family)
+        # noinspection PyProtectedMember
+        dns_host = conn._dns_host
+        host = dns_host.strip("[]")
+        try:
+            host.encode("idna")
+        except UnicodeError:
+            raise LocationParseError("'{0}', label empty or too long".format(host)) from None
+        ms = SolBase.mscurrent()
+        try:
+            addresses = dns_cache.getaddrinfo(host, conn.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(conn.host, conn, e) from e
+        finally:
+            if t:
+                t.add("dns_ms", SolBase.msdiff(ms))
+
+        # Connect, addresses in order
+        ms = SolBase.mscurrent()
+        err = None
+        try:
+            for _, _, _, _, sa in addresses:
+                conn._dns_host = sa[0]
+                try:
+                    return new_conn()
+                except (ConnectTimeoutError, NewConnectionError) as e:
+                    err = e
+        finally:
+            conn._dns_host = dns_host
+            if t:
+                t.add("connect_ms", SolBase.msdiff(ms))
+
+        if err is not None:
+            raise err
+        raise NewConnectionError(conn, "Failed to establish a new connection: getaddrinfo returns an empty list")
+
     # ====================================
     # URLLIB3 HTTP PROXY POOL
     # ====================================
@@ -148,8 +568,11 @@ class HttpClient(object):
         # --------------------------
         # DETECT
 
+        # Prepared
+        prepared = http_request.prepare()
+
         # HTTPS
-        is_https = http_request.uri.startswith("https")
+        is_https = prepared.is_https
 
         # MTLS
         is_mtls = http_request.mtls_enabled
@@ -174,44 +597,24 @@ class HttpClient(object):
         # --------------------------
         # HERE, PROXY AND/OR MTLS
 
-        # GET POOL KEY
-        if is_proxy and not is_mtls:
-            # PROXY ON, MTLS OFF
-            key = "P_{0}#{1}#{2}#{3}".format(
-                http_request.http_proxy_host,
-                http_request.http_proxy_port,
-                http_request.https_insecure,
-                is_https,
-            )
-        elif not is_proxy and is_mtls:
-            # PROXY OFF, MTLS ON
-            key = "M_{0}#{1}#{2}".format(
-                http_request.https_insecure,
-                is_https,
-                http_request.mtls_pool_key_get(),
-            )
-        else:
-            # PROXY ON, MTLS ON
-            key = "PM_{0}#{1}#{2}#{3}#{4}".format(
-                http_request.http_proxy_host,
-                http_request.http_proxy_port,
-                http_request.https_insecure,
-                is_https,
-                http_request.mtls_pool_key_get(),
-            )
+        # GET POOL KEY (prepared once per request, mtls material hash appended as it may be rotated)
+        key = prepared.urllib3_key
+        if is_mtls:
+            key = key + (http_request.mtls_pool_key_get(),)
 
-        # TRY FROM CACHE
-        if key in self._u3_proxy_pool:
+        # TRY FROM CACHE (in lock : get updates the lru order and may evict idle pools)
+        with self._u3_proxy_locker:
+            p = self._u3_proxy_pool.get(key)
+        if p is not None:
             SolBase.sleep(0)
-            return self._u3_proxy_pool[key]
+            return p
 
         # Allocate (in lock)
         with self._u3_proxy_locker:
-            # Check maxed
-            if len(self._u3_proxy_pool) >= self._u3_proxy_pool_max:
-                raise Exception("u3 pool maxed, cur={0}, max={1}".format(
-                    len(self._u3_proxy_pool), self._u3_proxy_pool_max
-                ))
+            # Re-check
+            p = self._u3_proxy_pool.get(key)
+            if p is not None:
+                return p
 
             # Uri
             # noinspection HttpUrlsUsage
@@ -223,40 +626,41 @@ class HttpClient(object):
 
             # Ok, allocate
             # Force underlying fifo queue to 1024 via maxsize
+            # Mtls : ssl context from cache (shared), hostname checked by it if secure (assert_hostname None)
+            # Insecure : no certificate verification (urllib3 applies cert_reqs to the ssl context, mtls one included)
+            cert_reqs = CERT_NONE if http_request.https_insecure else None
             if is_https:
                 if is_mtls:
                     if is_proxy:
                         # HTTPS ON + MTLS ON + PROXY ON
                         p = ProxyManager(
                             num_pools=1024, maxsize=1024, proxy_url=proxy_url,
-                            assert_hostname=False if http_request.https_insecure else True,
-                            key_file=http_request.mtls_client_key,
-                            cert_file=http_request.mtls_client_crt,
-                            key_password=http_request.mtls_client_pwd,
-                            ca_certs=http_request.mtls_ca_crt,
+                            assert_hostname=False if http_request.https_insecure else None,
+                            cert_reqs=cert_reqs,
+                            ssl_context=http_request.mtls_ssl_context_get(),
                         )
                     else:
                         # HTTPS ON + MTLS ON + PROXY OFF
                         p = PoolManager(
                             num_pools=1024, maxsize=1024,
-                            assert_hostname=False if http_request.https_insecure else True,
-                            key_file=http_request.mtls_client_key,
-                            cert_file=http_request.mtls_client_crt,
-                            key_password=http_request.mtls_client_pwd,
-                            ca_certs=http_request.mtls_ca_crt,
+                            assert_hostname=False if http_request.https_insecure else None,
+                            cert_reqs=cert_reqs,
+                            ssl_context=http_request.mtls_ssl_context_get(),
                         )
                 else:
                     if is_proxy:
                         # HTTPS ON + MTLS OFF + PROXY ON
                         p = ProxyManager(
                             num_pools=1024, maxsize=1024, proxy_url=proxy_url,
-                            assert_hostname=False if http_request.https_insecure else True
+                            assert_hostname=False if http_request.https_insecure else True,
+                            cert_reqs=cert_reqs,
                         )
                     else:
                         # HTTPS ON + MTLS OFF + PROXY OFF
                         p = PoolManager(
                             num_pools=1024, maxsize=1024,
-                            assert_hostname=False if http_request.https_insecure else True
+                            assert_hostname=False if http_request.https_insecure else True,
+                            cert_reqs=cert_reqs,
                         )
             else:
                 # HTTPS OFF (cannot have MTLS ON)
@@ -267,12 +671,123 @@ class HttpClient(object):
                     # HTTPS OFF + PROXY OFF
                     p = PoolManager(num_pools=1024, maxsize=1024)
 
-            # STORE IN CACHE
-            self._u3_proxy_pool[key] = p
+            # Dns cache
+            self._urllib3_manager_install(p)
+
+            # STORE IN CACHE (least recently used pools are evicted if maxed)
+            self._u3_proxy_pool.put(key, p)
             logger.info("Started new pool for key=%s", key)
             SolBase.sleep(0)
             return p
 
+    # ====================================
+    # POOL EVICTIONS AND STATS
+    # ====================================
+
+    def pool_evictions_get(self):
+        """
+        Get pool evictions counters
+        :return dict, "gevent" and "urllib3" => dict "lru", "idle", "size"
+        :rtype dict
+        """
+
+        d = dict()
+        for name, cache in [("gevent", self._gevent_pool), ("urllib3", self._u3_proxy_pool)]:
+            d[name] = {
+                "lru": cache.evicted_lru_count,
+                "idle": cache.evicted_idle_count,
+                "size": len(cache),
+            }
+        return d
+
+    def stats(self):
+        """
+        Get pool statistics, per pool key :
+        - open, idle, in_use : connections (gauges)
+        - connections_created, requests, bytes_sent, bytes_received (body bytes), errors (exception class name => count)
+        - age_ms : pool age
+        Gevent pools are keyed by pool key, urllib3 pools by (pool manager key, scheme, host, port).
+        :return dict, "gevent" and "urllib3" => dict str(key) => dict
+        :rtype dict
+        """
+
+        d = {"gevent": dict(), "urllib3": dict()}
+
+        # Gevent : one connection pool per key
+        with self._gevent_locker:
+            items = self._gevent_pool.items()
+        for key, http in items:
+            # noinspection PyProtectedMember
+            cp = http._connection_pool
+            # noinspection PyProtectedMember
+            idle = cp._socket_queue.qsize()
+            # noinspection PyProtectedMember
+            in_use = cp.size - cp._semaphore.counter
+            d["gevent"][str(key)] = cp.pool_stats.to_dict(idle + in_use, idle, in_use)
+
+        # Urllib3 : pool managers, one connection pool per scheme, host, port
+        managers = [("basic_https_assert_off", self._u3_basic_pool_https_assert_off), ("basic_assert_on", self._u3_basic_pool_assert_on)]
+        with self._u3_proxy_locker:
+            managers.extend(self._u3_proxy_pool.items())
+        for manager_key, pm in managers:
+            for pool_key in pm.pools.keys():
+                pool = pm.pools.get(pool_key)
+                if pool is None or pool.pool is None:
+                    continue
+                # Queue is filled with None up to maxsize, connections are put back when released
+                ar = list(pool.pool.queue)
+                idle = len([c for c in ar if c is not None and c.sock is not None])
+                in_use = pool.pool.maxsize - len(ar)
+                key = (manager_key, pool.scheme, pool.host, pool.port)
+                d["urllib3"][str(key)] = pool.pool_stats.to_dict(idle + in_use, idle, in_use)
+
+        return d
+
+    # ====================================
+    # HOOKS
+    # ====================================
+
+    def hook_add(self, hook):
+        """
+        Add a lifecycle hook (invoked in add order)
+        :param hook: HttpHook
+        :type hook: HttpHook
+        """
+
+        self._hooks.append(hook)
+        self._hooks_compile()
+
+    def hook_remove(self, hook):
+        """
+        Remove a lifecycle hook
+        :param hook: HttpHook
+        :type hook: HttpHook
+        """
+
+        self._hooks.remove(hook)
+        self._hooks_compile()
+
+    def _hooks_compile(self):
+        """
+        Compile hooks into flat lists of bound methods, per lifecycle method (overridden methods only)
+        """
+
+        for name in HttpHook.HOOK_NAMES:
+            base = getattr(HttpHook, name)
+            ar = [getattr(hook, name) for hook in self._hooks if getattr(type(hook), name, base) is not base]
+            setattr(self, "_hooks_" + name, ar)
+
+    def _hooks_on_connect_fire(self):
+        """
+        Fire on_connect hooks for the request of current greenlet (from pool connection hooks)
+        """
+
+        http_response = getattr(HttpClient._gevent_local, "http_response", None)
+        if http_response is None:
+            return
+        for f in self._hooks_on_connect:
+            f(http_response.http_request, http_response)
+
     # ====================================
     # HTTP EXEC
     # ====================================
@@ -286,16 +801,125 @@ class HttpClient(object):
         :rtype HttpResponse
         """
 
+        if self.coalescer and self.coalescer.is_coalescable(http_request):
+            http_response = self.coalescer.go(http_request, self._go_http_one)
+        else:
+            http_response = self._go_http_one(http_request)
+
+        if self.latency_stats is not None:
+            self.latency_stats.record(http_request, http_response)
+        return http_response
+
+    def _go_http_one(self, http_request):
+        """
+        Perform an http request (cache, attempts, redirects)
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :return HttpResponse
+        :rtype HttpResponse
+        """
+
         ms = SolBase.mscurrent()
+
+        # Cache : fresh entries are served, stale ones revalidated (conditional request)
+        # A cache failure never fails the request (lookup failure is a miss)
+        cache = self.cache
+        cacheable = False
+        entry = None
+        cur_request = http_request
+        if cache is not None:
+            cacheable = cache.is_cacheable_request(http_request)
+            if cacheable:
+                try:
+                    entry, fresh = cache.lookup(http_request)
+                except Exception as e:
+                    logger.warning("Cache lookup failed, miss, ex=%s", SolBase.extostr(e))
+                    entry, fresh = None, False
+                if fresh:
+                    http_response = HttpResponse()
+                    http_response.http_request = http_request
+                    cache.response_fill(entry, http_response, SolBase.mscurrent())
+                    http_response.elapsed_ms = SolBase.msdiff(ms)
+                    return http_response
+                elif entry:
+                    cur_request = copy.copy(http_request)
+                    cur_request.headers = cache.conditional_headers_get(http_request, entry)
+            else:
+                cache.bypass_count += 1
+
+        # Budget : all requests count
+        if self.retry_budget:
+            self.retry_budget.deposit()
+
+        # Hops (one without redirect following), all sharing general_timeout_ms
+        redirects = list()
+        while True:
+            # Attempts (one without retry policy)
+            attempt = 0
+            while True:
+                attempt += 1
+                http_response = self._go_http_attempt(cur_request, ms)
+                if not self._retry_wait(cur_request, http_response, attempt, ms):
+                    break
+            http_response.attempts = attempt
+
+            # Redirect
+            if not http_request.follow_redirects:
+                break
+            next_request = self._redirect_request_get(cur_request, http_response, len(redirects))
+            if next_request is None:
+                break
+            redirects.append(http_response)
+            cur_request = next_request
+
+        # Cache : 304 served from cache, storable responses stored, unsafe methods invalidate
+        if entry and not redirects:
+            # Conditional request copy
+            http_response.http_request = http_request
+        if cache is not None and not http_response.exception:
+            if cacheable and not redirects and entry and http_response.status_code == 304:
+                try:
+                    entry = cache.revalidated(http_request, entry, http_response)
+                except Exception as e:
+                    logger.warning("Cache revalidation failed, entry served as is, ex=%s", SolBase.extostr(e))
+                cache.response_fill(entry, http_response, SolBase.mscurrent())
+            else:
+                try:
+                    if cacheable and not redirects:
+                        cache.store(http_request, http_response)
+                    elif cache.method_get(http_request) in cache.UNSAFE_METHODS and http_response.status_code < 400:
+                        cache.invalidate(http_request.uri)
+                except Exception as e:
+                    logger.warning("Cache update failed, skipped, ex=%s", SolBase.extostr(e))
+
+        # Assign
+        http_response.redirects = redirects
+        http_response.elapsed_ms = SolBase.msdiff(ms)
+
+        # Return
+        return http_response
+
+    def _go_http_attempt(self, http_request, ms):
+        """
+        Perform an http request attempt, bounded by the remaining general timeout
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param ms: float (request start)
+        :type ms: float
+        :return HttpResponse
+        :rtype HttpResponse
+        """
+
         http_response = HttpResponse()
         general_timeout_sec = float(http_request.general_timeout_ms) / 1000.0
+        remaining_sec = general_timeout_sec - SolBase.msdiff(ms) / 1000.0
         try:
             # Assign request
             http_response.http_request = http_request
 
             # Fire
             gevent.with_timeout(
-                general_timeout_sec,
+                remaining_sec,
                 self._go_http_internal,
                 http_request, http_response)
             SolBase.sleep(0)
@@ -314,6 +938,238 @@ class HttpClient(object):
         # Return
         return http_response
 
+    @classmethod
+    def _redirect_request_get(cls, http_request, http_response, hop_count):
+        """
+        Get the request to follow a redirect response, None if the response is not a redirect to follow
+        Method and body are rewritten per status code :
+        - 303 : GET (unless HEAD), body dropped
+        - 301, 302 : POST becomes GET, body dropped (as browsers do), other methods kept
+        - 307, 308 : method and body kept
+        If the body is kept and is a stream, the redirect is not followed (it cannot be replayed).
+        Credentials headers are dropped if the redirect goes to another origin.
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        :param hop_count: int (redirects already followed)
+        :type hop_count: int
+        :return HttpRequest,None
+        :rtype HttpRequest,None
+        """
+
+        if http_response.exception is not None or http_response.status_code not in HttpClient.REDIRECT_STATUS_CODES:
+            return None
+
+        # Location
+        location = http_response.headers.get("location")
+        if isinstance(location, list):
+            location = location[0]
+        if isinstance(location, bytes):
+            location = location.decode("latin-1")
+        if not location:
+            return None
+
+        # Max hops
+        if hop_count >= http_request.max_redirects:
+            http_response.exception = Exception("Too many redirects, max_redirects={0}".format(http_request.max_redirects))
+            return None
+
+        # Method and body
+        method = http_request.method
+        if not method:
+            method = "POST" if http_request.post_data else "GET"
+        method = method.upper()
+        drop_body = False
+        if http_response.status_code == 303:
+            drop_body = True
+            if method != "HEAD":
+                method = "GET"
+        elif http_response.status_code in (301, 302):
+            if method == "POST":
+                drop_body = True
+                method = "GET"
+
+        # Body kept : a stream is consumed, it cannot be replayed
+        if not drop_body and HttpRequestBody.is_stream(http_request.post_data):
+            logger.debug("Redirect not followed (stream body), st=%s", http_response.status_code)
+            return None
+
+        # Release the hop connection (redirect bodies are small, drain them so that the connection goes back to its pool)
+        if http_response.stream:
+            http_response.stream.read(64 * 1024)
+            http_response.stream.close()
+
+        # Next request (shallow copy, headers copied)
+        next_request = copy.copy(http_request)
+        next_request.uri = urljoin(http_request.uri, location)
+        next_request.method = method
+        headers = dict(http_request.headers)
+        if drop_body:
+            next_request.post_data = None
+            next_request.post_data_length = None
+            for k in list(headers.keys()):
+                if k.lower() in ("content-length", "content-type", "transfer-encoding"):
+                    del headers[k]
+
+        # Other origin : drop credentials
+        prepared = http_request.prepare()
+        next_prepared = next_request.prepare()
+        if (prepared.scheme, prepared.host, prepared.port) != (next_prepared.scheme, next_prepared.host, next_prepared.port):
+            for k in list(headers.keys()):
+                if k.lower() in ("authorization", "proxy-authorization", "cookie"):
+                    del headers[k]
+        next_request.headers = headers
+
+        logger.debug("Following redirect, st=%s, uri=%s, method=%s", http_response.status_code, next_request.uri, method)
+        return next_request
+
+    def _retry_wait(self, http_request, http_response, attempt, ms):
+        """
+        Check if an attempt must be retried (retry policy, general timeout, retry budget), wait for backoff if so
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        :param attempt: int (attempt done, 1 for the first one)
+        :type attempt: int
+        :param ms: float (request start)
+        :type ms: float
+        :return bool (True if a new attempt must be done)
+        :rtype bool
+        """
+
+        # Policy
+        policy = http_request.retry_policy
+        if policy is None or attempt >= policy.max_attempts:
+            return False
+        if http_response.exception is None and http_response.status_code not in policy.retry_status_codes:
+            return False
+        if not policy.is_retryable(http_request, http_response):
+            return False
+
+        # Deadline : backoff must leave some time for the next attempt
+        backoff_ms = policy.backoff_ms_get(attempt)
+        if SolBase.msdiff(ms) + backoff_ms >= http_request.general_timeout_ms:
+            logger.debug("Retry skipped (general_timeout), attempt=%s, backoff_ms=%s", attempt, backoff_ms)
+            return False
+
+        # Budget
+        if self.retry_budget and not self.retry_budget.withdraw():
+            logger.debug("Retry denied (budget), attempt=%s, budget=%s", attempt, self.retry_budget)
+            return False
+
+        # Release (not consumed)
+        if http_response.stream:
+            http_response.stream.close()
+
+        logger.debug("Retrying, attempt=%s, backoff_ms=%s, st=%s, ex=%s", attempt, backoff_ms, http_response.status_code, http_response.exception)
+        SolBase.sleep(backoff_ms)
+        return True
+
+    def go_http_many(self, http_requests, concurrency=None, general_timeout_ms=None):
+        """
+        Perform several http requests, using a greenlet pool with bounded concurrency
+        :param http_requests: list of HttpRequest
+        :type http_requests: list
+        :param concurrency: int,None (max concurrent requests, default to self.http_many_concurrency)
+        :type concurrency: int,None
+        :param general_timeout_ms: int,None (overall deadline, stragglers are cancelled, None for no deadline)
+        :type general_timeout_ms: int,None
+        :return list of HttpResponse, in input order
+        :rtype list
+        """
+
+        http_requests = list(http_requests)
+        ar = [None] * len(http_requests)
+        for idx, http_response in self._go_http_many_internal(http_requests, concurrency, general_timeout_ms):
+            ar[idx] = http_response
+        return ar
+
+    def go_http_many_iter(self, http_requests, concurrency=None, general_timeout_ms=None):
+        """
+        Perform several http requests, using a greenlet pool with bounded concurrency.
+        Yield HttpResponse as they complete (use HttpResponse.http_request to match them).
+        :param http_requests: list of HttpRequest
+        :type http_requests: list
+        :param concurrency: int,None (max concurrent requests, default to self.http_many_concurrency)
+        :type concurrency: int,None
+        :param general_timeout_ms: int,None (overall deadline, stragglers are cancelled, None for no deadline)
+        :type general_timeout_ms: int,None
+        :return generator of HttpResponse
+        :rtype generator
+        """
+
+        for _, http_response in self._go_http_many_internal(list(http_requests), concurrency, general_timeout_ms):
+            yield http_response
+
+    def _go_http_many_internal(self, http_requests, concurrency, general_timeout_ms):
+        """
+        Perform several http requests, yield (index, HttpResponse) as they complete
+        :param http_requests: list of HttpRequest
+        :type http_requests: list
+        :param concurrency: int,None
+        :type concurrency: int,None
+        :param general_timeout_ms: int,None
+        :type general_timeout_ms: int,None
+        :return generator of tuple (int, HttpResponse)
+        :rtype generator
+        """
+
+        if concurrency is None:
+            concurrency = self.http_many_concurrency
+        if concurrency <= 0:
+            raise Exception("Invalid concurrency={0}".format(concurrency))
+
+        ms = SolBase.mscurrent()
+        q = Queue()
+        pool = Pool(concurrency)
+        pending = set(range(len(http_requests)))
+
+        def _run(i, cur_request):
+            q.put((i, self.go_http(cur_request)))
+
+        def _feed():
+            # Pool.spawn blocks while the pool is full
+            for i, cur_request in enumerate(http_requests):
+                pool.spawn(_run, i, cur_request)
+
+        feeder = gevent.spawn(_feed)
+        try:
+            while len(pending) > 0:
+                # Wait for next one
+                if general_timeout_ms:
+                    remaining_sec = (general_timeout_ms - SolBase.msdiff(ms)) / 1000.0
+                    if remaining_sec <= 0:
+                        break
+                else:
+                    remaining_sec = None
+                try:
+                    idx, http_response = q.get(timeout=remaining_sec)
+                except Empty:
+                    break
+                pending.discard(idx)
+                yield idx, http_response
+        finally:
+            # Cancel stragglers (or everything if our caller gave up)
+            feeder.kill()
+            pool.kill()
+
+        # Some may have completed while we were killing
+        while not q.empty():
+            idx, http_response = q.get_nowait()
+            if idx in pending:
+                pending.discard(idx)
+                yield idx, http_response
+
+        # Deadline reached
+        for idx in sorted(pending):
+            http_response = HttpResponse()
+            http_response.http_request = http_requests[idx]
+            http_response.exception = Exception("Timeout while processing batch, general_timeout_ms={0}".format(general_timeout_ms))
+            http_response.elapsed_ms = SolBase.msdiff(ms)
+            yield idx, http_response
+
     def _go_http_internal(self, http_request, http_response):
         """
         Perform an http request
@@ -333,27 +1189,49 @@ class HttpClient(object):
             # Validate MTLS
             http_request.mtls_status_validate()
 
-            # Uri
-            url = URL(http_request.uri)
-            SolBase.sleep(0)
-
-            # If proxy and https => urllib3
-            if http_request.http_proxy_host and url.scheme == PROTO_HTTPS:
-                # Proxy via urllib3
-                impl = HttpClient.HTTP_IMPL_URLLIB3
+            # Notice : https over http proxy is supported by both implementations (CONNECT tunnels, pooled)
 
             # Log
             logger.debug("Http using impl=%s", impl)
 
+            # Timings and pool counters (recorded by pool and connection hooks of current greenlet)
+            HttpClient._gevent_local.timings = http_response.timings
+            HttpClient._gevent_local.pool_stats = None
+            HttpClient._gevent_local.body = None
+            HttpClient._gevent_local.http_response = http_response
+
             # Fire
-            if impl == HttpClient.HTTP_IMPL_GEVENT:
-                self._go_gevent(http_request, http_response)
-                SolBase.sleep(0)
-            elif impl == HttpClient.HTTP_IMPL_URLLIB3:
-                self._go_urllib3(http_request, http_response)
-                SolBase.sleep(0)
-            else:
-                raise Exception("Invalid force_http_implementation")
+            ex = None
+            try:
+                if impl == HttpClient.HTTP_IMPL_GEVENT:
+                    self._go_gevent(http_request, http_response)
+                    SolBase.sleep(0)
+                elif impl == HttpClient.HTTP_IMPL_URLLIB3:
+                    self._go_urllib3(http_request, http_response)
+                    SolBase.sleep(0)
+                elif impl == HttpClient.HTTP_IMPL_ASYNCIO:
+                    raise Exception("HTTP_IMPL_ASYNCIO not supported by HttpClient, use HttpAsyncClient.go_http_async")
+                else:
+                    raise Exception("Invalid force_http_implementation")
+            except BaseException as e:
+                # Including general timeout
+                ex = e
+                for f in self._hooks_on_error:
+                    f(http_request, http_response, e)
+                raise
+            finally:
+                pool_stats = HttpClient._gevent_local.pool_stats
+                if pool_stats:
+                    pool_stats.request_done(HttpClient._gevent_local.body, http_response, ex)
+                HttpClient._gevent_local.timings = None
+                HttpClient._gevent_local.pool_stats = None
+                HttpClient._gevent_local.body = None
+                HttpClient._gevent_local.http_response = None
+                HttpClient._gevent_local.keep_alive = True
+
+            # Hooks
+            for f in self._hooks_on_response:
+                f(http_request, http_response)
         except Exception:
             # This is not an underlying http exception, we raise without storing in http_response
             raise
@@ -374,35 +1252,145 @@ class HttpClient(object):
         :param v: str
         """
 
-        if isinstance(k, str):
-            k = k.lower()
+        HttpResponse.add_header(d, k, v)
 
-        if k not in d:
-            d[k] = v
-        else:
-            # Already present
-            if isinstance(d[k], list):
-                # Just append
-                d[k].append(v)
+    @classmethod
+    def _body_and_headers_get(cls, http_request, impl):
+        """
+        Get body and headers to send.
+        Streamed bodies (iterable, generator, file-like) are wrapped into HttpRequestBody :
+        - length known (post_data_length) : sent with content-length, streamed
+        - length unknown : sent with chunked transfer encoding
+        Request headers are copied if we need to alter them.
+        Bodies are compressed if HttpRequest.compress_request is set (compressed streams are sent chunked).
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param impl: int
+        :type impl: int
+        :return tuple body, headers
+        :rtype tuple
+        """
+
+        body = http_request.post_data
+        headers = http_request.headers
+        body_length = http_request.post_data_length
+
+        # Compression (unless already encoded by caller)
+        if http_request.compress_request and body and not any(k.lower() == "content-encoding" for k in headers):
+            encoder = None
+            if HttpRequestBody.is_stream(body):
+                # Stream : threshold applied on known length only, compressed length is unknown
+                if body_length is None or body_length >= http_request.compress_request_min_size:
+                    encoder = HttpContentEncoder(http_request.compress_request)
+                    body = encoder.iter_wrap(HttpRequestBody(body, length=body_length))
+                    body_length = None
+            else:
+                if isinstance(body, str):
+                    body = body.encode("utf-8")
+                if len(body) >= http_request.compress_request_min_size:
+                    encoder = HttpContentEncoder(http_request.compress_request)
+                    body = encoder.encode_all(body)
+            if encoder:
+                headers = dict(headers)
+                headers["Content-Encoding"] = encoder.encoding
+
+        if HttpRequestBody.is_stream(body):
+            if body_length == 0:
+                # Nothing to stream
+                body = b""
             else:
-                # Build a list, existing value and new value
-                d[k] = [d[k], v]
+                body = HttpRequestBody(body, length=body_length)
+                if body_length is not None and not http_request.chunked:
+                    headers = dict(headers)
+                    headers["Content-Length"] = str(body_length)
+
+        # Chunked : geventhttpclient relies on transfer-encoding header
+        if http_request.chunked and body and impl == HttpClient.HTTP_IMPL_GEVENT:
+            headers = dict(headers)
+            headers["Transfer-Encoding"] = "chunked"
+
+        # Keep-alive off : advertised (unless set by caller), connection is not reused
+        if not http_request.keep_alive and not any(k.lower() == "connection" for k in headers):
+            headers = dict(headers)
+            headers["Connection"] = "close"
+
+        # Decompression : advertise supported encodings (unless set by caller)
+        if http_request.decompress_response and not any(k.lower() == "accept-encoding" for k in headers):
+            headers = dict(headers)
+            headers["Accept-Encoding"] = HttpContentDecoder.accept_encoding_get()
+
+        return body, headers
 
-    # ====================================
-    # GEVENT
-    # ====================================
     @classmethod
-    def _gevent_check_chunked(cls, http_request):
+    def _keep_alive_get(cls, http_request):
         """
-        Check chunked stuff
+        Get keep-alive, off if HttpRequest.keep_alive is off or a "Connection: close" header is set
+        (a connection used with "Connection: close" must not be reused)
         :param http_request: HttpRequest
         :type http_request: HttpRequest
+        :return bool
+        :rtype bool
         """
-        if http_request.chunked:
-            # Chunked is NOT supported for geventhttpclient
-            # REF : https://github.com/geventhttpclient/geventhttpclient/issues/158
-            raise Exception("Chunked not supported for geventhttpclient, req=%s" % http_request)
 
+        if not http_request.keep_alive:
+            return False
+        for k, v in http_request.headers.items():
+            if k.lower() == "connection" and str(v).strip().lower() == "close":
+                return False
+        return True
+
+    @classmethod
+    def _decoder_get(cls, http_request, http_response):
+        """
+        Get response content decoder, None if not decoded (buffered : decoded size bounded by decompress_response_max_bytes)
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        :return HttpContentDecoder,None
+        :rtype HttpContentDecoder,None
+        """
+
+        if not http_request.decompress_response:
+            return None
+        return HttpContentDecoder.from_content_encoding(
+            http_response.headers.get("content-encoding"),
+            max_decoded_bytes=None if http_request.stream_response else http_request.decompress_response_max_bytes,
+        )
+
+    @classmethod
+    def _stream_read_func_get(cls, http_response, read_func, decoder):
+        """
+        Get stream read function : decoded (if decoder), updating http_response byte counters
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        :param read_func: callable(length), raw read
+        :type read_func: callable
+        :param decoder: HttpContentDecoder,None
+        :type decoder: HttpContentDecoder,None
+        :return callable
+        :rtype callable
+        """
+
+        if decoder is None:
+            def _read(length):
+                buf = read_func(length)
+                http_response.compressed_bytes += len(buf)
+                http_response.decompressed_bytes += len(buf)
+                return buf
+        else:
+            decoded_read_func = decoder.read_func_wrap(read_func)
+
+            def _read(length):
+                buf = decoded_read_func(length)
+                http_response.compressed_bytes = decoder.compressed_bytes
+                http_response.decompressed_bytes = decoder.decompressed_bytes
+                return buf
+        return _read
+
+    # ====================================
+    # GEVENT
+    # ====================================
     def _go_gevent(self, http_request, http_response):
         """
         Perform an http request
@@ -415,9 +1403,11 @@ class HttpClient(object):
         # Implementation
         http_response.http_implementation = HttpClient.HTTP_IMPL_GEVENT
 
-        # Uri
-        url = URL(http_request.uri)
-        SolBase.sleep(0)
+        # Uri (parsed once per request)
+        prepared = http_request.prepare()
+        if prepared.gevent_url is None:
+            prepared.gevent_url = URL(http_request.uri)
+        url = prepared.gevent_url
 
         # Get instance
         logger.debug("Get pool")
@@ -425,6 +1415,20 @@ class HttpClient(object):
         logger.debug("Get pool done, pool=%s", http)
         SolBase.sleep(0)
 
+        # Body and headers
+        body, headers = self._body_and_headers_get(http_request, HttpClient.HTTP_IMPL_GEVENT)
+        HttpClient._gevent_local.body = body
+        HttpClient._gevent_local.keep_alive = self._keep_alive_get(http_request)
+
+        # Hooks : headers sent as altered
+        if self._hooks_pre_send:
+            headers = dict(headers)
+            for f in self._hooks_pre_send:
+                f(http_request, http_response, headers, body)
+
+        # Timeouts, applied to the borrowed socket
+        HttpClient._gevent_local.timeouts = (http_request.connection_timeout_ms / 1000.0, http_request.network_timeout_ms / 1000.0)
+
         # Fire
         ms_start = SolBase.mscurrent()
         logger.debug("Http now")
@@ -434,14 +1438,13 @@ class HttpClient(object):
             # ----------------
             if http_request.post_data:
                 # Post
-                self._gevent_check_chunked(http_request=http_request)
                 response = http.post(url.request_uri,
-                                     body=http_request.post_data,
-                                     headers=http_request.headers)
+                                     body=body,
+                                     headers=headers)
             else:
                 # Get
                 response = http.get(url.request_uri,
-                                    headers=http_request.headers)
+                                    headers=headers)
         else:
             # ----------------
             # Use input
@@ -450,52 +1453,46 @@ class HttpClient(object):
                 # With post datas (optional)
                 # Get may be called with post buffer (RFC allowed)
                 if http_request.post_data:
-                    self._gevent_check_chunked(http_request=http_request)
                     response = http.request(METHOD_GET,
                                             url.request_uri,
-                                            body=http_request.post_data,
-                                            headers=http_request.headers)
+                                            body=body,
+                                            headers=headers)
                 else:
                     response = http.get(url.request_uri,
-                                        headers=http_request.headers)
+                                        headers=headers)
             elif http_request.method == "DELETE":
                 # With post datas
-                self._gevent_check_chunked(http_request=http_request)
                 response = http.delete(url.request_uri,
-                                       body=http_request.post_data,
-                                       headers=http_request.headers)
+                                       body=body,
+                                       headers=headers)
             elif http_request.method == "HEAD":
                 # No post datas
                 response = http.head(url.request_uri,
-                                     headers=http_request.headers)
+                                     headers=headers)
             elif http_request.method == "OPTIONS":
                 # No post datas
                 response = http.options(url.request_uri,
-                                        headers=http_request.headers)
+                                        headers=headers)
             elif http_request.method == "PUT":
                 # With post datas
-                self._gevent_check_chunked(http_request=http_request)
                 response = http.put(url.request_uri,
-                                    body=http_request.post_data,
-                                    headers=http_request.headers)
+                                    body=body,
+                                    headers=headers)
             elif http_request.method == "POST":
                 # With post datas
-                self._gevent_check_chunked(http_request=http_request)
                 response = http.post(url.request_uri,
-                                     body=http_request.post_data,
-                                     headers=http_request.headers)
+                                     body=body,
+                                     headers=headers)
             elif http_request.method == "PATCH":
                 # With post datas
-                self._gevent_check_chunked(http_request=http_request)
                 response = http.patch(url.request_uri,
-                                      body=http_request.post_data,
-                                      headers=http_request.headers)
+                                      body=body,
+                                      headers=headers)
             elif http_request.method == "TRACE":
                 # With post datas
-                self._gevent_check_chunked(http_request=http_request)
                 response = http.trace(url.request_uri,
-                                      body=http_request.post_data,
-                                      headers=http_request.headers)
+                                      body=body,
+                                      headers=headers)
             else:
                 raise Exception("Invalid gevent method={0}".format(http_request.method))
 
@@ -506,16 +1503,57 @@ class HttpClient(object):
         if not response:
             raise Exception("No response from http")
 
+        # Time to first byte (request write included), from socket borrowed
+        timings = http_response.timings
+        # noinspection PyProtectedMember
+        if timings._mark_ms is not None:
+            # noinspection PyProtectedMember
+            timings.ttfb_ms = SolBase.msdiff(timings._mark_ms)
+
         # Process it
         http_response.status_code = response.status_code
 
+        # noinspection PyProtectedMember
+        for k, v in response._headers_index.items():
+            HttpClient._add_header(http_response.headers, k, v)
+
+        # Decoder (Content-Encoding)
+        decoder = self._decoder_get(http_request, http_response)
+
+        # Stream
+        if http_request.stream_response:
+            # Body is read on demand, socket goes back to pool upon full read (or closed if not fully read)
+            http_response.stream = HttpResponseStream(
+                read_func=self._stream_read_func_get(http_response, response.read, decoder),
+                close_func=response.release,
+            )
+            http_response.content_length = response.content_length if response.content_length and not decoder else 0
+            SolBase.sleep(0)
+            return
+
         # Read
         ms_start = SolBase.mscurrent()
         logger.debug("Read now")
-        http_response.buffer = response.read()
+        if decoder:
+            # Decoded incrementally
+            ar = list()
+            while True:
+                buf = response.read(HttpContentDecoder.CHUNK_SIZE)
+                if not buf:
+                    break
+                ar.append(decoder.decompress(buf))
+            ar.append(decoder.flush())
+            http_response.buffer = b"".join(ar)
+            http_response.compressed_bytes = decoder.compressed_bytes
+            http_response.decompressed_bytes = decoder.decompressed_bytes
+        else:
+            http_response.buffer = response.read()
+            http_response.compressed_bytes = len(http_response.buffer) if http_response.buffer else 0
+            http_response.decompressed_bytes = http_response.compressed_bytes
         SolBase.sleep(0)
-        logger.debug("Read done, ms=%s", SolBase.msdiff(ms_start))
-        if response.content_length:
+        timings.read_ms = SolBase.msdiff(ms_start)
+        logger.debug("Read done, ms=%s", timings.read_ms)
+        if response.content_length and not decoder:
             http_response.content_length = response.content_length
         else:
             if http_response.buffer:
@@ -523,10 +1561,6 @@ class HttpClient(object):
             else:
                 http_response.content_length = 0
 
-        # noinspection PyProtectedMember
-        for k, v in response._headers_index.items():
-            HttpClient._add_header(http_response.headers, k, v)
-
         response.should_close()
 
         # Over
@@ -536,6 +1570,19 @@ class HttpClient(object):
     # URLLIB3
     # ====================================
 
+    @classmethod
+    def _urllib3_stream_close(cls, r):
+        """
+        Close an urllib3 streamed response
+        :param r: urllib3.response.HTTPResponse
+        :type r: urllib3.response.HTTPResponse
+        """
+
+        if not r.isclosed():
+            # Not fully consumed, connection cannot be reused
+            r.close()
+        r.release_conn()
+
     def _go_urllib3(self, http_request, http_response):
         """
         Perform an http request
@@ -568,6 +1615,20 @@ class HttpClient(object):
                         redirect=0)
         SolBase.sleep(0)
 
+        # Timeouts, applied to the borrowed connection
+        timeouts = urllib3.Timeout(connect=http_request.connection_timeout_ms / 1000.0, read=http_request.network_timeout_ms / 1000.0)
+
+        # Body and headers
+        body, headers = self._body_and_headers_get(http_request, HttpClient.HTTP_IMPL_URLLIB3)
+        HttpClient._gevent_local.body = body
+        HttpClient._gevent_local.keep_alive = self._keep_alive_get(http_request)
+
+        # Hooks : headers sent as altered
+        if self._hooks_pre_send:
+            headers = dict(headers)
+            for f in self._hooks_pre_send:
+                f(http_request, http_response, headers, body)
+
         # Fire
         logger.debug("urlopen")
         if not http_request.method:
@@ -578,19 +1639,25 @@ class HttpClient(object):
                 r = conn.urlopen(
                     method='POST',
                     url=http_request.uri,
-                    body=http_request.post_data,
-                    headers=http_request.headers,
+                    body=body,
+                    headers=headers,
                     redirect=False,
                     retries=retries,
+                    timeout=timeouts,
                     chunked=http_request.chunked,
+                    preload_content=False,
+                    decode_content=False,
                 )
             else:
                 r = conn.urlopen(
                     method='GET',
                     url=http_request.uri,
-                    headers=http_request.headers,
+                    headers=headers,
                     redirect=False,
                     retries=retries,
+                    timeout=timeouts,
+                    preload_content=False,
+                    decode_content=False,
                 )
         else:
             # ----------------
@@ -601,20 +1668,26 @@ class HttpClient(object):
                 r = conn.urlopen(
                     method=http_request.method,
                     url=http_request.uri,
-                    headers=http_request.headers,
+                    headers=headers,
                     redirect=False,
                     retries=retries,
+                    timeout=timeouts,
+                    preload_content=False,
+                    decode_content=False,
                 )
             elif http_request.method in ["GET", "TRACE", "POST", "PUT", "PATCH", "DELETE"]:
                 # GET can be called with post datas
                 r = conn.urlopen(
                     method=http_request.method,
                     url=http_request.uri,
-                    body=http_request.post_data,
-                    headers=http_request.headers,
+                    body=body,
+                    headers=headers,
                     redirect=False,
                     retries=retries,
+                    timeout=timeouts,
                     chunked=http_request.chunked,
+                    preload_content=False,
+                    decode_content=False,
                 )
             else:
                 raise Exception("Invalid urllib3 method={0}".format(http_request.method))
@@ -625,7 +1698,38 @@ class HttpClient(object):
         http_response.status_code = r.status
         for k, v in r.headers.items():
             HttpClient._add_header(http_response.headers, k, v)
-        http_response.buffer = r.data
+
+        # Decoder (Content-Encoding, decoded by us, not by urllib3)
+        decoder = self._decoder_get(http_request, http_response)
+
+        # Stream
+        if http_request.stream_response:
+            # Body is read on demand, connection goes back to pool upon full read
+            http_response.stream = HttpResponseStream(
+                read_func=self._stream_read_func_get(http_response, lambda length: r.read(length, decode_content=False), decoder),
+                close_func=lambda: HttpClient._urllib3_stream_close(r),
+            )
+            cl = r.headers.get("Content-Length")
+            http_response.content_length = int(cl) if cl and cl.isdigit() and not decoder else 0
+            SolBase.sleep(0)
+            return
+
+        # Read (not preloaded, timed), connection goes back to pool
+        ms_start = SolBase.mscurrent()
+        try:
+            data = r.read(decode_content=False)
+        finally:
+            HttpClient._urllib3_stream_close(r)
+        http_response.timings.read_ms = SolBase.msdiff(ms_start)
+
+        if decoder:
+            http_response.buffer = decoder.decode_all(data)
+            http_response.compressed_bytes = decoder.compressed_bytes
+            http_response.decompressed_bytes = decoder.decompressed_bytes
+        else:
+            http_response.buffer = data
+            http_response.compressed_bytes = len(http_response.buffer)
+            http_response.decompressed_bytes = http_response.compressed_bytes
         http_response.content_length = len(http_response.buffer)
 
         # Over
@@ -0,0 +1,203 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import copy
+import logging
+from threading import Lock
+
+from gevent.event import AsyncResult
+from pysolbase.SolBase import SolBase
+
+from pysolhttpclient.Http.HttpResponse import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+
+class HttpCoalescer(object):
+    """
+    Http request coalescing (single flight), client wide.
+    Identical concurrent requests (method, uri, selected headers) are sent once :
+    - the first caller (leader) performs the request
+    - concurrent callers wait for it (bounded by their own general_timeout_ms)
+    - each caller gets its own HttpResponse, sharing the body buffer
+    Only safe requests without body, not streamed, with HttpRequest.coalesce set are coalesced.
+    """
+
+    # Methods which can be coalesced
+    COALESCE_METHODS = frozenset(["GET", "HEAD"])
+
+    def __init__(self):
+        """
+        Const
+        """
+
+        self._locker = Lock()
+
+        # Key => AsyncResult (HttpResponse of the leader)
+        self._inflight = dict()
+
+        # Counters
+        self.leader_count = 0
+        self.coalesced_count = 0
+
+    @classmethod
+    def is_coalescable(cls, http_request):
+        """
+        Return True if the request can be coalesced
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :return bool
+        :rtype bool
+        """
+
+        if not http_request.coalesce or http_request.post_data or http_request.stream_response:
+            return False
+        method = http_request.method.upper() if http_request.method else "GET"
+        return method in HttpCoalescer.COALESCE_METHODS
+
+    @classmethod
+    def key_get(cls, http_request):
+        """
+        Get the coalescing key : method, uri, decoding, implementation, proxies, tls verification, mtls material,
+        selected headers (all if coalesce_headers is None)
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :return tuple
+        :rtype tuple
+        """
+
+        if http_request.coalesce_headers is None:
+            headers = tuple(sorted((k.lower(), str(v)) for k, v in http_request.headers.items()))
+        else:
+            names = set(n.lower() for n in http_request.coalesce_headers)
+            headers = tuple(sorted((k.lower(), str(v)) for k, v in http_request.headers.items() if k.lower() in names))
+
+        mtls = None
+        if http_request.mtls_enabled:
+            mtls = (http_request.mtls_client_key, http_request.mtls_client_crt, http_request.mtls_client_pwd, http_request.mtls_ca_crt)
+
+        return (
+            http_request.method.upper() if http_request.method else "GET",
+            http_request.uri,
+            bool(http_request.decompress_response),
+            http_request.force_http_implementation,
+            (http_request.http_proxy_host, http_request.http_proxy_port),
+            (http_request.socks5_proxy_host, http_request.socks5_proxy_port),
+            bool(http_request.https_insecure),
+            mtls,
+            headers,
+        )
+
+    def go(self, http_request, go_func):
+        """
+        Perform a request, or wait for an identical one in flight.
+        If the leader is aborted (GreenletExit, Timeout...), a waiting follower becomes the new leader.
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param go_func: callable(HttpRequest), return HttpResponse
+        :type go_func: callable
+        :return HttpResponse
+        :rtype HttpResponse
+        """
+
+        key = self.key_get(http_request)
+        ms = SolBase.mscurrent()
+        while True:
+            with self._locker:
+                ar = self._inflight.get(key)
+                leader = ar is None
+                if leader:
+                    ar = AsyncResult()
+                    self._inflight[key] = ar
+                    self.leader_count += 1
+                else:
+                    self.coalesced_count += 1
+
+            # Leader
+            if leader:
+                try:
+                    http_response = go_func(http_request)
+                    ar.set(http_response)
+                    return http_response
+                except Exception as e:
+                    ar.set_exception(e)
+                    raise
+                except BaseException:
+                    # Aborted (not an error of the request) : followers retry, never re-raised in them
+                    ar.set(None)
+                    raise
+                finally:
+                    with self._locker:
+                        if self._inflight.get(key) is ar:
+                            del self._inflight[key]
+
+            # Follower (wait, not get : a Timeout raised by the caller is not taken as ours)
+            remaining_ms = http_request.general_timeout_ms - SolBase.msdiff(ms)
+            if remaining_ms > 0:
+                ar.wait(timeout=remaining_ms / 1000.0)
+            if not ar.ready():
+                http_response = HttpResponse()
+                http_response.http_request = http_request
+                http_response.exception = Exception("Timeout while waiting coalesced request, general_timeout_ms={0}".format(http_request.general_timeout_ms))
+                http_response.elapsed_ms = SolBase.msdiff(ms)
+                return http_response
+            leader_response = ar.get(block=False)
+            if leader_response is None:
+                # Leader aborted, retry
+                continue
+            return self._response_copy(leader_response, http_request, ms)
+
+    @classmethod
+    def _response_copy(cls, leader_response, http_request, ms):
+        """
+        Copy the leader response for a follower (body buffer is shared, headers are copied)
+        :param leader_response: HttpResponse
+        :type leader_response: HttpResponse
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param ms: float (follower wait start)
+        :type ms: float
+        :return HttpResponse
+        :rtype HttpResponse
+        """
+
+        http_response = copy.copy(leader_response)
+        http_response.http_request = http_request
+        http_response.headers = leader_response.headers.copy()
+        http_response.redirects = list(leader_response.redirects)
+        http_response.timings = copy.copy(leader_response.timings)
+        http_response.elapsed_ms = SolBase.msdiff(ms)
+        http_response.coalesced = True
+        return http_response
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hcoalescer:inflight={0}*leader={1}*coalesced={2}".format(
+            len(self._inflight),
+            self.leader_count,
+            self.coalesced_count,
+        )
@@ -0,0 +1,399 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import logging
+import zlib
+
+# Optional : brotli (br)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Optional : zstandard (zstd)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+
+class HttpContentDecoder(object):
+    """
+    Http response content decoder (content-encoding), incremental, with bounded output.
+    Supports gzip, deflate (zlib or raw), br (if brotli is installed), zstd (if zstandard is installed).
+    Several encodings (ie "gzip, br") are decoded in reverse order.
+    Output is produced on demand (max_length) : input not yet decoded is kept (zlib unconsumed tail, brotli output limit,
+    small input slices for decoders without output limit), a small compressed chunk cannot expand in memory at once.
+    Counts bytes received (compressed) and bytes produced (decompressed), decoded bytes may be bounded (max_decoded_bytes).
+    """
+
+    # Chunk size for incremental reads
+    CHUNK_SIZE = 64 * 1024
+
+    # Input slice for decoders without output limit (zstandard, brotli without output_buffer_limit)
+    SLICE_SIZE = 64
+
+    # Accept-Encoding header value, computed once
+    _accept_encoding = None
+
+    def __init__(self, encodings, max_decoded_bytes=None):
+        """
+        Const
+        :param encodings: list of str (as sent, first applied first)
+        :type encodings: list
+        :param max_decoded_bytes: int,None (decoding fails above, None : no limit)
+        :type max_decoded_bytes: int,None
+        """
+
+        self.encodings = encodings
+        self.max_decoded_bytes = max_decoded_bytes
+        self._decoders = [self._decoder_create(e) for e in reversed(encodings)]
+
+        # Counters
+        self.compressed_bytes = 0
+        self.decompressed_bytes = 0
+
+    @classmethod
+    def accept_encoding_get(cls):
+        """
+        Get Accept-Encoding header value (supported encodings)
+        :return str
+        :rtype str
+        """
+
+        if cls._accept_encoding is None:
+            ar = ["gzip", "deflate"]
+            if brotli is not None:
+                ar.append("br")
+            if zstandard is not None:
+                ar.append("zstd")
+            cls._accept_encoding = ", ".join(ar)
+        return cls._accept_encoding
+
+    @classmethod
+    def from_content_encoding(cls, content_encoding, max_decoded_bytes=None):
+        """
+        Get a decoder for a Content-Encoding header value, None if identity (or absent)
+        None if an encoding is not supported (body is kept as received, with its Content-Encoding header)
+        :param content_encoding: str,bytes,list,None
+        :type content_encoding: str,bytes,list,None
+        :param max_decoded_bytes: int,None (decoding fails above, None : no limit)
+        :type max_decoded_bytes: int,None
+        :return HttpContentDecoder,None
+        :rtype HttpContentDecoder,None
+        """
+
+        if not content_encoding:
+            return None
+        if isinstance(content_encoding, list):
+            content_encoding = ",".join(content_encoding)
+        if isinstance(content_encoding, bytes):
+            content_encoding = content_encoding.decode("latin-1")
+
+        encodings = [e.strip().lower() for e in content_encoding.split(",")]
+        encodings = [e for e in encodings if e and e != "identity"]
+        if len(encodings) == 0:
+            return None
+        try:
+            return HttpContentDecoder(encodings, max_decoded_bytes=max_decoded_bytes)
+        except Exception as e:
+            logger.warning("Cannot decode, body kept as received, ex=%s", e)
+            return None
+
+    @classmethod
+    def _decoder_create(cls, encoding):
+        """
+        Create an incremental decoder state
+        - in : input not yet decoded
+        - out : output produced above the requested length (decoders without exact output limit)
+        - more : output may be pending without more input
+        :param encoding: str
+        :type encoding: str
+        :return dict
+        :rtype dict
+        """
+
+        if encoding in ("gzip", "x-gzip"):
+            wbits = 16 + zlib.MAX_WBITS
+            st = {"kind": "zlib", "d": zlib.decompressobj(wbits), "wbits": wbits, "first": True, "raw_fallback": False}
+        elif encoding == "deflate":
+            # zlib wrapped, raw deflate fallback (some servers send raw deflate)
+            wbits = zlib.MAX_WBITS
+            st = {"kind": "zlib", "d": zlib.decompressobj(wbits), "wbits": wbits, "first": True, "raw_fallback": True}
+        elif encoding == "br" and brotli is not None:
+            d = brotli.Decompressor()
+            st = {"kind": "br" if hasattr(d, "can_accept_more_data") else "sliced", "d": d}
+        elif encoding == "zstd" and zstandard is not None:
+            st = {"kind": "sliced", "d": zstandard.ZstdDecompressor().decompressobj()}
+        else:
+            raise Exception("Unsupported content-encoding={0}".format(encoding))
+        st["in"] = b""
+        st["out"] = bytearray()
+        st["more"] = False
+        return st
+
+    @classmethod
+    def _decoder_pending(cls, st):
+        """
+        Return True if a decoder state may produce output without more input
+        :param st: dict
+        :type st: dict
+        :return bool
+        :rtype bool
+        """
+
+        return bool(st["in"]) or bool(st["out"]) or st["more"]
+
+    @classmethod
+    def _decoder_step(cls, st, max_length):
+        """
+        Decode pending input of a decoder state, up to max_length bytes
+        :param st: dict
+        :type st: dict
+        :param max_length: int (> 0)
+        :type max_length: int
+        :return bytes
+        :rtype bytes
+        """
+
+        # Output kept from a previous step
+        if st["out"]:
+            out = bytes(st["out"][:max_length])
+            del st["out"][:max_length]
+            return out
+
+        if st["kind"] == "zlib":
+            buf = st["in"]
+            try:
+                out = st["d"].decompress(buf, max_length)
+            except zlib.error:
+                # First chunk : raw deflate fallback
+                if not st["first"] or not st["raw_fallback"]:
+                    raise
+                st["wbits"] = -zlib.MAX_WBITS
+                st["d"] = zlib.decompressobj(st["wbits"])
+                out = st["d"].decompress(buf, max_length)
+            st["first"] = False
+            st["in"] = st["d"].unconsumed_tail
+            st["more"] = len(out) >= max_length and not st["d"].eof
+
+            # Next member (concatenated gzip)
+            if st["d"].eof and st["d"].unused_data:
+                st["in"] = st["d"].unused_data
+                st["d"] = zlib.decompressobj(st["wbits"])
+        elif st["kind"] == "br":
+            # Input is accepted only once pending output is drained
+            d = st["d"]
+            buf = b""
+            if d.can_accept_more_data():
+                buf, st["in"] = st["in"], b""
+            out = d.process(buf, output_buffer_limit=max_length)
+            st["more"] = not d.is_finished() and (len(out) >= max_length or not d.can_accept_more_data())
+        else:
+            # No output limit : small input slices
+            buf, st["in"] = st["in"][:cls.SLICE_SIZE], st["in"][cls.SLICE_SIZE:]
+            d = st["d"]
+            out = d.process(buf) if hasattr(d, "process") else d.decompress(buf)
+
+        if len(out) > max_length:
+            st["out"].extend(out[max_length:])
+            out = out[:max_length]
+        return out
+
+    @classmethod
+    def _decoder_flush(cls, st):
+        """
+        Flush a decoder state (pending input already decoded)
+        :param st: dict
+        :type st: dict
+        :return bytes
+        :rtype bytes
+        """
+
+        d = st["d"]
+        return d.flush() if hasattr(d, "flush") else b""
+
+    def _pull(self, i, max_length):
+        """
+        Produce up to max_length bytes from decoder i, pulling from decoder i - 1 as required
+        :param i: int
+        :type i: int
+        :param max_length: int (> 0)
+        :type max_length: int
+        :return bytes
+        :rtype bytes
+        """
+
+        st = self._decoders[i]
+        out = bytearray()
+        while len(out) < max_length:
+            if not self._decoder_pending(st):
+                if i == 0:
+                    break
+                buf = self._pull(i - 1, HttpContentDecoder.CHUNK_SIZE)
+                if not buf:
+                    break
+                st["in"] = buf
+            pending = len(st["in"])
+            buf = self._decoder_step(st, max_length - len(out))
+            if not buf and len(st["in"]) == pending and not st["out"]:
+                # No progress : more input required
+                st["more"] = False
+                if st["in"]:
+                    break
+            out.extend(buf)
+        return bytes(out)
+
+    def _count(self, buf):
+        """
+        Count decoded bytes, check limit
+        :param buf: bytes
+        :type buf: bytes
+        :return bytes
+        :rtype bytes
+        """
+
+        self.decompressed_bytes += len(buf)
+        if self.max_decoded_bytes is not None and self.decompressed_bytes > self.max_decoded_bytes:
+            raise Exception("Decoded body too large, max_decoded_bytes={0}".format(self.max_decoded_bytes))
+        return buf
+
+    def decompress(self, buf, max_length=-1):
+        """
+        Decompress a chunk (may return empty bytes).
+        With max_length, return up to max_length bytes, the remaining is kept and returned by next calls
+        (call with empty buf to get it, until empty bytes are returned).
+        :param buf: bytes
+        :type buf: bytes
+        :param max_length: int (-1 : all)
+        :type max_length: int
+        :return bytes
+        :rtype bytes
+        """
+
+        if buf:
+            self.compressed_bytes += len(buf)
+            self._decoders[0]["in"] += buf
+
+        last = len(self._decoders) - 1
+        if max_length is not None and max_length >= 0:
+            return self._count(self._pull(last, max_length) if max_length else b"")
+
+        ar = list()
+        while True:
+            buf = self._count(self._pull(last, HttpContentDecoder.CHUNK_SIZE))
+            if not buf:
+                return b"".join(ar)
+            ar.append(buf)
+
+    def flush(self):
+        """
+        Flush (end of input) : all remaining bytes
+        :return bytes
+        :rtype bytes
+        """
+
+        ar = [self.decompress(b"")]
+        for i, st in enumerate(self._decoders):
+            buf = self._decoder_flush(st)
+            if not buf:
+                continue
+            if i + 1 < len(self._decoders):
+                self._decoders[i + 1]["in"] += buf
+                ar.append(self.decompress(b""))
+            else:
+                ar.append(self._count(buf))
+        return b"".join(ar)
+
+    def decode_all(self, buf):
+        """
+        Decode a full buffer
+        :param buf: bytes
+        :type buf: bytes
+        :return bytes
+        :rtype bytes
+        """
+
+        return self.decompress(buf) + self.flush()
+
+    def read_func_wrap(self, read_func):
+        """
+        Wrap a raw read function (read_func(length), all if length is None, empty bytes at eof) into a decoded one.
+        Memory is bounded by length : a raw chunk is decoded only up to the requested length.
+        :param read_func: callable
+        :type read_func: callable
+        :return callable
+        :rtype callable
+        """
+
+        # Output of the final flush above the requested length
+        pending = bytearray()
+        eof = [False]
+
+        def _read(length=None):
+            # All
+            if length is None:
+                buf = bytes(pending)
+                pending.clear()
+                if not eof[0]:
+                    eof[0] = True
+                    buf += self.decode_all(read_func(None))
+                return buf
+
+            # Up to length (a raw chunk may decode to nothing)
+            out = bytearray(pending[:length])
+            del pending[:length]
+            while len(out) < length:
+                buf = self.decompress(b"", length - len(out))
+                if buf:
+                    out.extend(buf)
+                    continue
+                if eof[0]:
+                    break
+                raw = read_func(HttpContentDecoder.CHUNK_SIZE)
+                if raw:
+                    out.extend(self.decompress(raw, length - len(out)))
+                else:
+                    eof[0] = True
+                    pending.extend(self.flush())
+                    n = length - len(out)
+                    out.extend(pending[:n])
+                    del pending[:n]
+            return bytes(out)
+
+        return _read
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hdecoder:enc={0}*in={1}*out={2}".format(
+            self.encodings,
+            self.compressed_bytes,
+            self.decompressed_bytes,
+        )
+
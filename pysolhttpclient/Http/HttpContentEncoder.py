@@ -0,0 +1,144 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import zlib
+
+# Optional : brotli (br)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Optional : zstandard (zstd)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class HttpContentEncoder(object):
+    """
+    Http request content encoder (content-encoding), incremental.
+    Supports gzip, deflate, br (if brotli is installed), zstd (if zstandard is installed).
+    """
+
+    def __init__(self, encoding, level=None):
+        """
+        Const
+        :param encoding: str (gzip, deflate, br, zstd)
+        :type encoding: str
+        :param level: int,None (compression level, None for default)
+        :type level: int,None
+        """
+
+        self.encoding = encoding.lower()
+
+        if self.encoding == "gzip":
+            self._kind = "zlib"
+            self._c = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION if level is None else level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        elif self.encoding == "deflate":
+            self._kind = "zlib"
+            self._c = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION if level is None else level, zlib.DEFLATED, zlib.MAX_WBITS)
+        elif self.encoding == "br" and brotli is not None:
+            self._kind = "br"
+            self._c = brotli.Compressor() if level is None else brotli.Compressor(quality=level)
+        elif self.encoding == "zstd" and zstandard is not None:
+            self._kind = "zstd"
+            self._c = (zstandard.ZstdCompressor() if level is None else zstandard.ZstdCompressor(level=level)).compressobj()
+        else:
+            raise Exception("Unsupported content-encoding={0}".format(encoding))
+
+        # Counters
+        self.uncompressed_bytes = 0
+        self.compressed_bytes = 0
+
+    def compress(self, buf):
+        """
+        Compress a chunk (may return empty bytes)
+        :param buf: bytes
+        :type buf: bytes
+        :return bytes
+        :rtype bytes
+        """
+
+        self.uncompressed_bytes += len(buf)
+        if self._kind == "br":
+            out = self._c.process(buf)
+        else:
+            out = self._c.compress(buf)
+        self.compressed_bytes += len(out)
+        return out
+
+    def flush(self):
+        """
+        Flush (end of input)
+        :return bytes
+        :rtype bytes
+        """
+
+        if self._kind == "br":
+            out = self._c.finish()
+        else:
+            out = self._c.flush()
+        self.compressed_bytes += len(out)
+        return out
+
+    def encode_all(self, buf):
+        """
+        Encode a full buffer
+        :param buf: bytes
+        :type buf: bytes
+        :return bytes
+        :rtype bytes
+        """
+
+        return self.compress(buf) + self.flush()
+
+    def iter_wrap(self, it):
+        """
+        Encode an iterable of bytes chunks
+        :param it: iterable of bytes
+        :type it: iterable
+        :return generator of bytes
+        :rtype generator
+        """
+
+        for buf in it:
+            out = self.compress(buf)
+            if out:
+                yield out
+        out = self.flush()
+        if out:
+            yield out
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hencoder:enc={0}*in={1}*out={2}".format(
+            self.encoding,
+            self.uncompressed_bytes,
+            self.compressed_bytes,
+        )
@@ -0,0 +1,221 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import logging
+import socket
+from collections import OrderedDict
+from threading import Lock
+
+import gevent
+from pysolbase.SolBase import SolBase
+
+logger = logging.getLogger(__name__)
+
+
+class HttpDnsCache(object):
+    """
+    Dns resolution cache (getaddrinfo), client wide (HttpClient.dns_cache), used by gevent and urllib3 connections.
+    - positive entries are kept ttl_ms, negative ones (resolution errors) negative_ttl_ms
+    - positive entries are refreshed in background refresh_ahead_ms before expiry (if used)
+    - addresses are returned in round-robin order (connections are spread over them)
+    The resolver is pluggable : callable(host, port, family, type, proto) returning a getaddrinfo list
+    (socket.getaddrinfo if None, gevent resolver if monkey patched).
+    Notice : getaddrinfo does not give record ttl, ttl are fixed.
+    """
+
+    def __init__(self, ttl_ms=60000, negative_ttl_ms=5000, refresh_ahead_ms=5000, resolver=None, max_size=4096):
+        """
+        Const
+        :param ttl_ms: int (positive entries ttl)
+        :type ttl_ms: int
+        :param negative_ttl_ms: int (negative entries ttl, 0 to disable)
+        :type negative_ttl_ms: int
+        :param refresh_ahead_ms: int (background refresh before expiry, 0 to disable)
+        :type refresh_ahead_ms: int
+        :param resolver: callable,None
+        :type resolver: callable,None
+        :param max_size: int (max entries, least recently used are dropped)
+        :type max_size: int
+        """
+
+        self.ttl_ms = ttl_ms
+        self.negative_ttl_ms = negative_ttl_ms
+        self.refresh_ahead_ms = refresh_ahead_ms
+        self.resolver = resolver
+        self.max_size = max_size
+        self._locker = Lock()
+
+        # (host, port, family, type, proto) => [addresses, exception, expire ms, round-robin index, refreshing]
+        self._d = OrderedDict()
+
+        # Counters
+        self.hit_count = 0
+        self.miss_count = 0
+        self.negative_hit_count = 0
+        self.refresh_count = 0
+        self.error_count = 0
+
+    def _resolve(self, key):
+        """
+        Resolve (resolver call)
+        :param key: tuple (host, port, family, type, proto)
+        :type key: tuple
+        :return list
+        :rtype list
+        """
+
+        resolver = self.resolver or socket.getaddrinfo
+        return list(resolver(*key))
+
+    def _put(self, key, addresses, ex):
+        """
+        Store an entry (lock held)
+        :param key: tuple
+        :type key: tuple
+        :param addresses: list,None
+        :type addresses: list,None
+        :param ex: Exception,None
+        :type ex: Exception,None
+        """
+
+        ttl_ms = self.ttl_ms if ex is None else self.negative_ttl_ms
+        old = self._d.get(key)
+        self._d[key] = [addresses, ex, SolBase.mscurrent() + ttl_ms, old[3] if old else 0, False]
+        self._d.move_to_end(key)
+        while len(self._d) > self.max_size:
+            self._d.popitem(last=False)
+
+    def _refresh(self, key):
+        """
+        Background refresh (an error keeps the current entry up to its expiry)
+        :param key: tuple
+        :type key: tuple
+        """
+
+        try:
+            addresses = self._resolve(key)
+            with self._locker:
+                self._put(key, addresses, None)
+                self.refresh_count += 1
+        except Exception as ex:
+            logger.debug("Dns refresh failed, key=%s, ex=%s", key, SolBase.extostr(ex))
+            with self._locker:
+                self.error_count += 1
+                e = self._d.get(key)
+                if e:
+                    e[4] = False
+
+    def _rotate(self, e):
+        """
+        Get addresses in round-robin order (lock held)
+        :param e: list (entry)
+        :type e: list
+        :return list
+        :rtype list
+        """
+
+        addresses = e[0]
+        if len(addresses) <= 1:
+            return list(addresses)
+        i = e[3] % len(addresses)
+        e[3] = i + 1
+        return addresses[i:] + addresses[:i]
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0):
+        """
+        Cached getaddrinfo (round-robin order)
+        :param host: str
+        :type host: str
+        :param port: int
+        :type port: int
+        :param family: int
+        :type family: int
+        :param type: int
+        :type type: int
+        :param proto: int
+        :type proto: int
+        :return list
+        :rtype list
+        """
+
+        key = (host, port, family, type, proto)
+        ms = SolBase.mscurrent()
+        with self._locker:
+            e = self._d.get(key)
+            if e is not None and ms < e[2]:
+                self._d.move_to_end(key)
+                if e[1] is not None:
+                    self.negative_hit_count += 1
+                    raise e[1].with_traceback(None)
+                self.hit_count += 1
+                if self.refresh_ahead_ms and not e[4] and e[2] - ms <= self.refresh_ahead_ms:
+                    e[4] = True
+                    gevent.spawn(self._refresh, key)
+                return self._rotate(e)
+            self.miss_count += 1
+
+        # Resolve (out of lock)
+        try:
+            addresses = self._resolve(key)
+        except Exception as ex:
+            with self._locker:
+                self.error_count += 1
+                if self.negative_ttl_ms:
+                    self._put(key, None, ex)
+            raise
+
+        with self._locker:
+            self._put(key, addresses, None)
+            return self._rotate(self._d[key])
+
+    def clear(self):
+        """
+        Remove all entries (counters are kept)
+        """
+
+        with self._locker:
+            self._d.clear()
+
+    def __len__(self):
+        """
+        Entries count
+        :return int
+        :rtype int
+        """
+
+        return len(self._d)
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hdns:n={0}*hit={1}*miss={2}*neg={3}*refresh={4}*err={5}".format(
+            len(self._d),
+            self.hit_count,
+            self.miss_count,
+            self.negative_hit_count,
+            self.refresh_count,
+            self.error_count,
+        )
@@ -0,0 +1,215 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import math
+from array import array
+
+
+class HttpHistogram(object):
+    """
+    Latency histogram, HDR style (log linear buckets, fixed memory).
+    Values (ms) are recorded in microseconds, each power of two range is split in sub buckets :
+    relative error is bounded by 1 / 2^(sub_bucket_bits - 1) whatever the value.
+    Histograms with the same layout are mergeable.
+    """
+
+    def __init__(self, sub_bucket_bits=6, max_bits=36):
+        """
+        Const
+        :param sub_bucket_bits: int (precision, 6 : 32 sub buckets per power of two, ~3% error)
+        :type sub_bucket_bits: int
+        :param max_bits: int (max value, 2^max_bits microseconds, 36 : ~19 hours, above are clamped)
+        :type max_bits: int
+        """
+
+        self.sub_bucket_bits = sub_bucket_bits
+        self.max_bits = max_bits
+        self._sub_count = 1 << sub_bucket_bits
+        self._half_count = self._sub_count >> 1
+        self._max_value = (1 << max_bits) - 1
+
+        # Buckets
+        self._counts = array("q", [0]) * (self._index_get(self._max_value) + 1)
+
+        # Totals (ms)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+
+    def _index_get(self, v):
+        """
+        Get bucket index
+        :param v: int (microseconds)
+        :type v: int
+        :return int
+        :rtype int
+        """
+
+        if v < self._sub_count:
+            return v
+        shift = v.bit_length() - self.sub_bucket_bits
+        return shift * self._half_count + (v >> shift)
+
+    def _value_get(self, idx):
+        """
+        Get bucket value (middle of bucket range)
+        :param idx: int
+        :type idx: int
+        :return int (microseconds)
+        :rtype int
+        """
+
+        if idx < self._sub_count:
+            return idx
+        shift = idx // self._half_count - 1
+        sub = idx - shift * self._half_count
+        return (sub << shift) + (1 << (shift - 1))
+
+    def record(self, ms, count=1):
+        """
+        Record a value
+        :param ms: float (milliseconds)
+        :type ms: float
+        :param count: int
+        :type count: int
+        """
+
+        if ms < 0.0:
+            ms = 0.0
+        v = min(int(ms * 1000.0), self._max_value)
+        self._counts[self._index_get(v)] += count
+        self.count += count
+        self.sum_ms += ms * count
+        if self.min_ms is None or ms < self.min_ms:
+            self.min_ms = ms
+        if self.max_ms is None or ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, p):
+        """
+        Get a percentile (bucket precision, bounded by min and max)
+        :param p: float (0.0 - 100.0)
+        :type p: float
+        :return float,None (ms, None if empty)
+        :rtype float,None
+        """
+
+        if self.count == 0:
+            return None
+
+        rank = max(1, int(math.ceil(p / 100.0 * self.count)))
+        cur = 0
+        for idx, c in enumerate(self._counts):
+            if c == 0:
+                continue
+            cur += c
+            if cur >= rank:
+                ms = self._value_get(idx) / 1000.0
+                return min(max(ms, self.min_ms), self.max_ms)
+        return self.max_ms
+
+    def merge(self, other):
+        """
+        Merge another histogram into this one (same layout)
+        :param other: HttpHistogram
+        :type other: HttpHistogram
+        """
+
+        if other.sub_bucket_bits != self.sub_bucket_bits or other.max_bits != self.max_bits:
+            raise Exception("Cannot merge, layout mismatch, self={0}, other={1}".format(self, other))
+        if other.count == 0:
+            return
+
+        for idx, c in enumerate(other._counts):
+            if c:
+                self._counts[idx] += c
+        self.count += other.count
+        self.sum_ms += other.sum_ms
+        if self.min_ms is None or other.min_ms < self.min_ms:
+            self.min_ms = other.min_ms
+        if self.max_ms is None or other.max_ms > self.max_ms:
+            self.max_ms = other.max_ms
+
+    def copy(self):
+        """
+        Copy (snapshot)
+        :return HttpHistogram
+        :rtype HttpHistogram
+        """
+
+        h = HttpHistogram(self.sub_bucket_bits, self.max_bits)
+        h.merge(self)
+        return h
+
+    def to_dict(self):
+        """
+        To dict (sparse buckets, json serializable, see from_dict)
+        :return dict
+        :rtype dict
+        """
+
+        return {
+            "sub_bucket_bits": self.sub_bucket_bits,
+            "max_bits": self.max_bits,
+            "count": self.count,
+            "sum_ms": self.sum_ms,
+            "min_ms": self.min_ms,
+            "max_ms": self.max_ms,
+            "buckets": [[idx, c] for idx, c in enumerate(self._counts) if c],
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        """
+        From dict (see to_dict)
+        :param d: dict
+        :type d: dict
+        :return HttpHistogram
+        :rtype HttpHistogram
+        """
+
+        h = HttpHistogram(d["sub_bucket_bits"], d["max_bits"])
+        for idx, c in d["buckets"]:
+            h._counts[idx] = c
+        h.count = d["count"]
+        h.sum_ms = d["sum_ms"]
+        h.min_ms = d["min_ms"]
+        h.max_ms = d["max_ms"]
+        return h
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hhisto:count={0}*min={1}*max={2}*p50={3}*p99={4}*bits={5}/{6}".format(
+            self.count,
+            self.min_ms,
+            self.max_ms,
+            self.percentile(50.0),
+            self.percentile(99.0),
+            self.sub_bucket_bits,
+            self.max_bits,
+        )
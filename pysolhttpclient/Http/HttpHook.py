@@ -0,0 +1,85 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+
+
+class HttpHook(object):
+    """
+    Http request lifecycle hook (HttpClient.hook_add), override the methods you need.
+    Hooks are invoked per attempt (retries and redirects included), not for responses served by cache or coalescing.
+    Only overridden methods are registered, a client without hooks pays nothing.
+    Exceptions raised by hooks are not caught, they fail the request attempt.
+    """
+
+    # Lifecycle methods
+    HOOK_NAMES = ("pre_send", "on_connect", "on_response", "on_error")
+
+    def pre_send(self, http_request, http_response, headers, body):
+        """
+        Called before sending, once body and headers are computed (http_response.http_implementation is set).
+        Headers are sent as altered by hooks (the request headers are not altered).
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        :param headers: dict (headers to send)
+        :type headers: dict
+        :param body: bytes,str,HttpRequestBody,None (body to send, compressed if any)
+        :type body: object
+        """
+
+        pass
+
+    def on_connect(self, http_request, http_response):
+        """
+        Called when a new connection is established (tcp, proxy tunnel, tls), not called on connection reuse.
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        """
+
+        pass
+
+    def on_response(self, http_request, http_response):
+        """
+        Called when a response is received (status and headers, body unless streamed).
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        """
+
+        pass
+
+    def on_error(self, http_request, http_response, ex):
+        """
+        Called when an attempt fails (including general timeout).
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        :param ex: BaseException
+        :type ex: BaseException
+        """
+
+        pass
@@ -0,0 +1,40 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+
+
+class HttpImpl(object):
+    """
+    Http implementations
+    """
+
+    # Auto : urllib3 for HttpClient, asyncio for HttpAsyncClient
+    HTTP_IMPL_AUTO = None
+
+    # geventhttpclient (HttpClient)
+    HTTP_IMPL_GEVENT = 1
+
+    # urllib3 (HttpClient)
+    HTTP_IMPL_URLLIB3 = 3
+
+    # asyncio (HttpAsyncClient)
+    HTTP_IMPL_ASYNCIO = 4
@@ -0,0 +1,202 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+from threading import Lock
+
+from pysolhttpclient.Http.HttpHistogram import HttpHistogram
+from pysolhttpclient.Http.HttpImpl import HttpImpl
+
+
+class HttpLatencyStats(object):
+    """
+    Http latency histograms (HttpHistogram), per (host, status class, backend), fed by HttpClient.go_http.
+    - host : uri host:port (from the prepared request)
+    - status class : "2xx", "3xx", "4xx", "5xx" ("error" on exception)
+    - backend : "gevent", "urllib3", "asyncio" (implementation which served the response, "cache" if served from cache)
+    Keys are bounded by max_keys, hosts above are accounted under host "other".
+    Snapshots (dict key => HttpHistogram) are mergeable (merge), and can be rendered by HttpPrometheus.
+    """
+
+    # Host for keys above max_keys
+    HOST_OTHER = "other"
+
+    # Implementation => backend
+    BACKENDS = {
+        HttpImpl.HTTP_IMPL_GEVENT: "gevent",
+        HttpImpl.HTTP_IMPL_URLLIB3: "urllib3",
+        HttpImpl.HTTP_IMPL_ASYNCIO: "asyncio",
+    }
+
+    def __init__(self, max_keys=1024, sub_bucket_bits=6, max_bits=36):
+        """
+        Const
+        :param max_keys: int (max keys, fixed memory)
+        :type max_keys: int
+        :param sub_bucket_bits: int (HttpHistogram precision)
+        :type sub_bucket_bits: int
+        :param max_bits: int (HttpHistogram max value)
+        :type max_bits: int
+        """
+
+        self.max_keys = max_keys
+        self.sub_bucket_bits = sub_bucket_bits
+        self.max_bits = max_bits
+
+        self._locker = Lock()
+        self._histograms = dict()
+
+    @classmethod
+    def _status_class_get(cls, http_response):
+        """
+        Get status class
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        :return str
+        :rtype str
+        """
+
+        if http_response.exception or not http_response.status_code:
+            return "error"
+        return "{0}xx".format(http_response.status_code // 100)
+
+    @classmethod
+    def _backend_get(cls, http_request, http_response):
+        """
+        Get backend
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        :return str
+        :rtype str
+        """
+
+        if http_response.from_cache:
+            return "cache"
+
+        # Implementation which served it, the requested one if failed before (auto : urllib3)
+        impl = http_response.http_implementation
+        if impl is None:
+            impl = http_request.force_http_implementation
+        return cls.BACKENDS.get(impl, "urllib3")
+
+    @classmethod
+    def _host_get(cls, http_request):
+        """
+        Get host label (host:port), from the prepared request (uri parsed once)
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :return str
+        :rtype str
+        """
+
+        try:
+            prepared = http_request.prepare()
+        except Exception:
+            return ""
+        if not prepared.host:
+            return ""
+        if ":" in prepared.host:
+            return "[{0}]:{1}".format(prepared.host, prepared.port)
+        return "{0}:{1}".format(prepared.host, prepared.port)
+
+    def record(self, http_request, http_response):
+        """
+        Record a request
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        """
+
+        host = self._host_get(http_request)
+        status_class = self._status_class_get(http_response)
+        backend = self._backend_get(http_request, http_response)
+        ms = http_response.elapsed_ms or 0.0
+
+        key = (host, status_class, backend)
+        with self._locker:
+            h = self._histograms.get(key)
+            if h is None:
+                if len(self._histograms) >= self.max_keys:
+                    key = (self.HOST_OTHER, status_class, backend)
+                    h = self._histograms.get(key)
+                if h is None:
+                    h = HttpHistogram(self.sub_bucket_bits, self.max_bits)
+                    self._histograms[key] = h
+            h.record(ms)
+
+    def snapshot(self):
+        """
+        Get a snapshot (copies)
+        :return dict, (host, status_class, backend) => HttpHistogram
+        :rtype dict
+        """
+
+        with self._locker:
+            return {key: h.copy() for key, h in self._histograms.items()}
+
+    def merge(self, snapshot):
+        """
+        Merge a snapshot (from another client or process, see HttpHistogram.from_dict) into this one.
+        Keys above max_keys are kept (merge never drops values).
+        :param snapshot: dict, (host, status_class, backend) => HttpHistogram
+        :type snapshot: dict
+        """
+
+        with self._locker:
+            for key, other in snapshot.items():
+                key = tuple(key)
+                h = self._histograms.get(key)
+                if h is None:
+                    h = HttpHistogram(self.sub_bucket_bits, self.max_bits)
+                    self._histograms[key] = h
+                h.merge(other)
+
+    def clear(self):
+        """
+        Clear
+        """
+
+        with self._locker:
+            self._histograms.clear()
+
+    def __len__(self):
+        """
+        Keys count
+        :return int
+        :rtype int
+        """
+
+        return len(self._histograms)
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hlstats:keys={0}*max={1}".format(
+            len(self._histograms),
+            self.max_keys,
+        )
@@ -0,0 +1,323 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+from pysolbase.SolBase import SolBase
+
+logger = logging.getLogger(__name__)
+
+# Guards HttpMtlsCache lock creation only (held without any io, may be a native lock)
+_locker_init = threading.Lock()
+
+
+class HttpMtlsCache(object):
+    """
+    Mtls material and ssl context cache (process wide).
+    Material (client key, client crt, ca crt) can be file paths (str) or PEM contents (bytes).
+    Files are read once, then watched : mtime and size are checked at most every CHECK_INTERVAL_MS,
+    the material is reloaded on change (certificate rotation).
+    Ssl contexts are built once per material content hash, pools are keyed by this hash.
+    """
+
+    # Files mtime/size check interval
+    CHECK_INTERVAL_MS = 1000
+
+    # Max cached sources and contexts (least recently used are dropped)
+    MAX_SIZE = 256
+
+    # Lock, created on first use (_locker_get)
+    _locker = None
+
+    # Source (client_key, client_crt, client_pwd, ca_crt) => [content_hash, last_check_ms, file stats]
+    _material = OrderedDict()
+
+    # (content_hash, https_insecure) => ssl.SSLContext
+    _context = OrderedDict()
+
+    # Content hash => (client_key, client_crt, client_pwd, ca_crt) as bytes (None for optional ones)
+    _content = OrderedDict()
+
+    # Counters
+    load_count = 0
+    reload_count = 0
+    context_count = 0
+
+    @classmethod
+    def _locker_get(cls):
+        """
+        Get the lock, created on first use
+        Notice : created lazily, HttpRequest (which imports us) may be imported before gevent monkey patching
+        :return threading.Lock
+        :rtype threading.Lock
+        """
+
+        if cls._locker is None:
+            with _locker_init:
+                if cls._locker is None:
+                    cls._locker = threading.Lock()
+        return cls._locker
+
+    @classmethod
+    def _file_read(cls, name, value):
+        """
+        Read material (path or PEM content)
+        :param name: str (attribute name, for errors)
+        :type name: str
+        :param value: str,bytes,None
+        :type value: str,bytes,None
+        :return tuple bytes,None content, tuple,None (mtime_ns, size) for paths
+        :rtype tuple
+        """
+
+        if value is None:
+            return None, None
+        elif isinstance(value, (bytes, bytearray)):
+            return bytes(value), None
+
+        try:
+            st = os.stat(value)
+            with open(value, "rb") as f:
+                buf = f.read()
+        except (IOError, OSError):
+            raise Exception("MTLS_FAILED (not isfile), %s=%s" % (name, value))
+        return buf, (st.st_mtime_ns, st.st_size)
+
+    @classmethod
+    def _source_load(cls, source):
+        """
+        Load a source
+        :param source: tuple (client_key, client_crt, client_pwd, ca_crt)
+        :type source: tuple
+        :return tuple content_hash, file stats
+        :rtype tuple
+        """
+
+        client_key, client_crt, client_pwd, ca_crt = source
+
+        # Notice : ca checked first (optional), then key and crt (mandatory)
+        ca_buf, ca_st = cls._file_read("mtls_ca_crt", ca_crt)
+        key_buf, key_st = cls._file_read("mtls_client_key", client_key)
+        crt_buf, crt_st = cls._file_read("mtls_client_crt", client_crt)
+        if isinstance(client_pwd, str):
+            pwd_buf = client_pwd.encode("utf-8")
+        else:
+            pwd_buf = client_pwd
+
+        # Hash
+        h = hashlib.sha256()
+        for buf in (key_buf, crt_buf, pwd_buf, ca_buf):
+            if buf is None:
+                h.update(b"\x00")
+            else:
+                h.update(b"\x01" + str(len(buf)).encode("ascii") + b"\x01" + buf)
+        content_hash = h.hexdigest()
+
+        # Store content (contexts are built from it)
+        cls._content[content_hash] = (key_buf, crt_buf, pwd_buf, ca_buf)
+        cls._content.move_to_end(content_hash)
+        while len(cls._content) > cls.MAX_SIZE:
+            cls._content.popitem(last=False)
+
+        return content_hash, (key_st, crt_st, ca_st)
+
+    @classmethod
+    def _source_stats(cls, source):
+        """
+        Get source file stats
+        :param source: tuple (client_key, client_crt, client_pwd, ca_crt)
+        :type source: tuple
+        :return tuple
+        :rtype tuple
+        """
+
+        ar = list()
+        for value in (source[0], source[1], source[3]):
+            if value is None or isinstance(value, (bytes, bytearray)):
+                ar.append(None)
+                continue
+            try:
+                st = os.stat(value)
+                ar.append((st.st_mtime_ns, st.st_size))
+            except (IOError, OSError):
+                ar.append(False)
+        return tuple(ar)
+
+    @classmethod
+    def material_get(cls, client_key, client_crt, client_pwd, ca_crt):
+        """
+        Get material content hash, loading (or reloading on change) the material if required.
+        Raise an Exception if a file cannot be read.
+        :param client_key: str,bytes (path or PEM content)
+        :type client_key: str,bytes
+        :param client_crt: str,bytes (path or PEM content)
+        :type client_crt: str,bytes
+        :param client_pwd: str,bytes,None
+        :type client_pwd: str,bytes,None
+        :param ca_crt: str,bytes,None (path or PEM content)
+        :type ca_crt: str,bytes,None
+        :return str
+        :rtype str
+        """
+
+        source = (client_key, client_crt, client_pwd, ca_crt)
+        now_ms = SolBase.mscurrent()
+        with cls._locker_get():
+            entry = cls._material.get(source)
+            if entry is not None:
+                cls._material.move_to_end(source)
+                if now_ms - entry[1] < cls.CHECK_INTERVAL_MS:
+                    return entry[0]
+
+                # Watch
+                entry[1] = now_ms
+                if cls._source_stats(source) == entry[2] and entry[0] in cls._content:
+                    return entry[0]
+
+                # Changed : reload
+                logger.info("Mtls material changed, reloading, old_hash=%s", entry[0])
+                content_hash, stats = cls._source_load(source)
+                entry[0] = content_hash
+                entry[2] = stats
+                cls.reload_count += 1
+                return content_hash
+
+            # Load
+            content_hash, stats = cls._source_load(source)
+            cls._material[source] = [content_hash, now_ms, stats]
+            while len(cls._material) > cls.MAX_SIZE:
+                cls._material.popitem(last=False)
+            cls.load_count += 1
+            return content_hash
+
+    @classmethod
+    def context_get(cls, content_hash, https_insecure):
+        """
+        Get ssl context for material content hash (built once)
+        :param content_hash: str (from material_get)
+        :type content_hash: str
+        :param https_insecure: bool (if True, hostname and server certificate are not checked)
+        :type https_insecure: bool
+        :return ssl.SSLContext
+        :rtype ssl.SSLContext
+        """
+
+        key = (content_hash, https_insecure)
+        with cls._locker_get():
+            ctx = cls._context.get(key)
+            if ctx is not None:
+                cls._context.move_to_end(key)
+                return ctx
+
+            content = cls._content.get(content_hash)
+            if content is None:
+                raise Exception("MTLS_FAILED (material not loaded), content_hash=%s" % content_hash)
+
+            ctx = cls._context_build(content, https_insecure)
+            cls._context[key] = ctx
+            while len(cls._context) > cls.MAX_SIZE:
+                cls._context.popitem(last=False)
+            cls.context_count += 1
+            return ctx
+
+    @classmethod
+    def _context_build(cls, content, https_insecure):
+        """
+        Build ssl context
+        :param content: tuple (client_key, client_crt, client_pwd, ca_crt) as bytes
+        :type content: tuple
+        :param https_insecure: bool
+        :type https_insecure: bool
+        :return ssl.SSLContext
+        :rtype ssl.SSLContext
+        """
+
+        # Notice : ssl is imported lazily, HttpRequest (which imports us) may be imported before gevent monkey patching
+        import ssl
+
+        key_buf, crt_buf, pwd_buf, ca_buf = content
+
+        # Ca (system ones if not provided)
+        if ca_buf is not None:
+            ctx = ssl.create_default_context(cadata=ca_buf.decode("ascii"))
+        else:
+            ctx = ssl.create_default_context()
+        if https_insecure:
+            # Insecure : no hostname check, no server certificate verification (as without mtls)
+            ctx.check_hostname = False
+            ctx.verify_mode = ssl.CERT_NONE
+
+        # Client key and crt : ssl can only load them from files, given through memory backed files (never on disk)
+        # Notice : an empty password is used if none is set, to fail instead of prompting for encrypted keys
+        fds = list()
+        d = None
+        try:
+            if hasattr(os, "memfd_create") and os.path.isdir("/proc/self/fd"):
+                # Anonymous memory files (linux), released with their fd (process crash included)
+                files = list()
+                for name, buf in (("client.key", key_buf), ("client.crt", crt_buf)):
+                    fd = os.memfd_create(name, os.MFD_CLOEXEC)
+                    fds.append(fd)
+                    with os.fdopen(fd, "wb", closefd=False) as fw:
+                        fw.write(buf)
+                    files.append("/proc/self/fd/%d" % fd)
+                key_file, crt_file = files
+            else:
+                # Memory backed directory if any (/dev/shm), removed right after loading
+                d = tempfile.mkdtemp(prefix="mtls_", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+                key_file = os.path.join(d, "client.key")
+                crt_file = os.path.join(d, "client.crt")
+                for f, buf in ((key_file, key_buf), (crt_file, crt_buf)):
+                    fd = os.open(f, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                    with os.fdopen(fd, "wb") as fw:
+                        fw.write(buf)
+            ctx.load_cert_chain(
+                certfile=crt_file,
+                keyfile=key_file,
+                password=pwd_buf if pwd_buf is not None else b"",
+            )
+        finally:
+            for fd in fds:
+                os.close(fd)
+            if d:
+                shutil.rmtree(d, ignore_errors=True)
+        return ctx
+
+    @classmethod
+    def clear(cls):
+        """
+        Clear all cached material and contexts, reset counters
+        """
+
+        with cls._locker_get():
+            cls._material.clear()
+            cls._context.clear()
+            cls._content.clear()
+            cls.load_count = 0
+            cls.reload_count = 0
+            cls.context_count = 0
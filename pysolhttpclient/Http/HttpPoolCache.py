@@ -0,0 +1,208 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import logging
+from collections import OrderedDict
+
+from pysolbase.SolBase import SolBase
+
+logger = logging.getLogger(__name__)
+
+
+class HttpPoolCache(object):
+    """
+    Bounded pool cache, with LRU eviction and idle eviction.
+    Evicted pools are closed using close_func.
+    Not thread safe : callers must hold their own lock for every call, get included (it updates the lru order and may evict).
+    A pool just got is the most recently used one, it is not evicted before the next max_size puts.
+    """
+
+    def __init__(self, name, close_func, max_size=1024, idle_ttl_ms=300000):
+        """
+        Const
+        :param name: str (for logs)
+        :type name: str
+        :param close_func: callable(pool), called upon eviction
+        :type close_func: callable
+        :param max_size: int (max pools, least recently used is evicted above)
+        :type max_size: int
+        :param idle_ttl_ms: int,None (pools not used since idle_ttl_ms are evicted, None to disable)
+        :type idle_ttl_ms: int,None
+        """
+
+        self.name = name
+        self.max_size = max_size
+        self.idle_ttl_ms = idle_ttl_ms
+        self._close_func = close_func
+
+        # key => [pool, last access ms], in access order (oldest first)
+        self._d = OrderedDict()
+
+        # Idle check is done at most every idle_check_interval_ms
+        self.idle_check_interval_ms = 1000
+        self._idle_check_last_ms = SolBase.mscurrent()
+
+        # Stats
+        self.evicted_lru_count = 0
+        self.evicted_idle_count = 0
+
+    def get(self, key):
+        """
+        Get a pool, None if not found
+        :param key: object
+        :type key: object
+        :return object,None
+        :rtype object,None
+        """
+
+        e = self._d.get(key)
+        if e is None:
+            return None
+
+        ms = SolBase.mscurrent()
+        e[1] = ms
+        self._d.move_to_end(key)
+        self._evict_idle(ms)
+        return e[0]
+
+    def put(self, key, pool):
+        """
+        Put a pool, evicting least recently used ones if required
+        :param key: object
+        :type key: object
+        :param pool: object
+        :type pool: object
+        """
+
+        ms = SolBase.mscurrent()
+        self._d[key] = [pool, ms]
+        self._d.move_to_end(key)
+
+        # Lru
+        while len(self._d) > self.max_size:
+            k, e = self._d.popitem(last=False)
+            self.evicted_lru_count += 1
+            self._close(k, e[0], "lru")
+
+        self._evict_idle(ms)
+
+    def evict_idle(self):
+        """
+        Evict idle pools now
+        """
+
+        self._idle_check_last_ms = 0
+        self._evict_idle(SolBase.mscurrent())
+
+    def _evict_idle(self, ms):
+        """
+        Evict idle pools (at most every idle_check_interval_ms)
+        :param ms: float (current ms)
+        :type ms: float
+        """
+
+        if self.idle_ttl_ms is None:
+            return
+        if ms - self._idle_check_last_ms < self.idle_check_interval_ms:
+            return
+        self._idle_check_last_ms = ms
+
+        # Oldest first, stop at first non idle
+        while len(self._d) > 0:
+            k = next(iter(self._d))
+            e = self._d[k]
+            if ms - e[1] < self.idle_ttl_ms:
+                break
+            del self._d[k]
+            self.evicted_idle_count += 1
+            self._close(k, e[0], "idle")
+
+    def _close(self, key, pool, reason):
+        """
+        Close an evicted pool
+        :param key: object
+        :type key: object
+        :param pool: object
+        :type pool: object
+        :param reason: str
+        :type reason: str
+        """
+
+        logger.info("Evicting pool, cache=%s, reason=%s, key=%s", self.name, reason, key)
+        try:
+            self._close_func(pool)
+        except Exception as e:
+            logger.warning("Exception while closing pool, key=%s, ex=%s", key, SolBase.extostr(e))
+
+    def clear(self):
+        """
+        Close and remove all pools
+        """
+
+        while len(self._d) > 0:
+            k, e = self._d.popitem(last=False)
+            self._close(k, e[0], "clear")
+
+    def items(self):
+        """
+        Items (key, pool), oldest first
+        :return list
+        :rtype list
+        """
+
+        return [(k, e[0]) for k, e in self._d.items()]
+
+    def __len__(self):
+        """
+        Length
+        :return int
+        :rtype int
+        """
+
+        return len(self._d)
+
+    def __contains__(self, key):
+        """
+        Contains
+        :param key: object
+        :type key: object
+        :return bool
+        :rtype bool
+        """
+
+        return key in self._d
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hpcache:name={0}*len={1}/{2}*ttl={3}*evicted.lru/idle={4}/{5}".format(
+            self.name,
+            len(self._d),
+            self.max_size,
+            self.idle_ttl_ms,
+            self.evicted_lru_count,
+            self.evicted_idle_count,
+        )
@@ -0,0 +1,128 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+from pysolbase.SolBase import SolBase
+
+from pysolhttpclient.Http.HttpRequestBody import HttpRequestBody
+
+
+class HttpPoolStats(object):
+    """
+    Http connection pool counters (one per pool, attached to it).
+    Gauges (open, idle, in use connections) are read from the pool itself by HttpClient.stats().
+    Bytes are body bytes (as sent and received on the wire, headers excluded).
+    """
+
+    def __init__(self):
+        """
+        Const
+        """
+
+        self.created_ms = SolBase.mscurrent()
+
+        # Connections opened
+        self.connections_created = 0
+
+        # Requests served (success or failure)
+        self.requests = 0
+
+        # Body bytes
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+        # Exception class name => count
+        self.errors = dict()
+
+    def request_done(self, body, http_response, ex):
+        """
+        Account a request
+        :param body: bytes,str,HttpRequestBody,None (body as sent)
+        :type body: object
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        :param ex: Exception,None
+        :type ex: Exception,None
+        """
+
+        self.requests += 1
+        if isinstance(body, HttpRequestBody):
+            self.bytes_sent += body.bytes_read
+        elif body:
+            self.bytes_sent += len(body)
+
+        if ex is not None:
+            name = ex.__class__.__name__
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+        if http_response.stream is not None:
+            # Streamed : accounted upon stream close
+            stream = http_response.stream
+            # noinspection PyProtectedMember
+            close_func = stream._close_func
+
+            def _close_func():
+                self.bytes_received += http_response.compressed_bytes
+                close_func()
+
+            stream._close_func = _close_func
+        else:
+            self.bytes_received += http_response.compressed_bytes
+
+    def to_dict(self, open_count, idle_count, in_use_count):
+        """
+        To dict, with pool gauges
+        :param open_count: int
+        :type open_count: int
+        :param idle_count: int
+        :type idle_count: int
+        :param in_use_count: int
+        :type in_use_count: int
+        :return dict
+        :rtype dict
+        """
+
+        return {
+            "open": open_count,
+            "idle": idle_count,
+            "in_use": in_use_count,
+            "connections_created": self.connections_created,
+            "requests": self.requests,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "errors": dict(self.errors),
+            "age_ms": SolBase.msdiff(self.created_ms),
+        }
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hpstats:conn={0}*req={1}*sent={2}*recv={3}*err={4}".format(
+            self.connections_created,
+            self.requests,
+            self.bytes_sent,
+            self.bytes_received,
+            self.errors,
+        )
@@ -0,0 +1,107 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+
+
+class HttpPrometheus(object):
+    """
+    Prometheus text format (0.0.4) exporter, no server dependency (serve the string as you like).
+    Latency snapshots (HttpLatencyStats) are rendered as summaries (quantiles, sum and count, in seconds).
+    """
+
+    # Default quantiles (p50, p99, p999)
+    QUANTILES = (0.5, 0.99, 0.999)
+
+    # Labels of latency keys
+    LATENCY_LABELS = ("host", "status_class", "backend")
+
+    @classmethod
+    def _escape(cls, s):
+        """
+        Escape a label value
+        :param s: str
+        :type s: str
+        :return str
+        :rtype str
+        """
+
+        return str(s).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+    @classmethod
+    def _labels_get(cls, names, values, extra=None):
+        """
+        Get labels
+        :param names: tuple of str
+        :type names: tuple
+        :param values: tuple
+        :type values: tuple
+        :param extra: list of (name, value),None
+        :type extra: list,None
+        :return str
+        :rtype str
+        """
+
+        ar = ["{0}=\"{1}\"".format(k, cls._escape(v)) for k, v in zip(names, values)]
+        if extra:
+            ar.extend("{0}=\"{1}\"".format(k, cls._escape(v)) for k, v in extra)
+        return "{" + ",".join(ar) + "}"
+
+    @classmethod
+    def _float_get(cls, f):
+        """
+        Get a float as string
+        :param f: float
+        :type f: float
+        :return str
+        :rtype str
+        """
+
+        return repr(float(f))
+
+    @classmethod
+    def latency_render(cls, snapshot, name="pysolhttpclient_request_duration_seconds", quantiles=QUANTILES):
+        """
+        Render a latency snapshot (HttpLatencyStats.snapshot) as a Prometheus summary
+        :param snapshot: dict, (host, status_class, backend) => HttpHistogram
+        :type snapshot: dict
+        :param name: str (metric name)
+        :type name: str
+        :param quantiles: iterable of float (0.0 - 1.0)
+        :type quantiles: tuple,list
+        :return str
+        :rtype str
+        """
+
+        ar = [
+            "# HELP {0} Http client request duration (seconds)".format(name),
+            "# TYPE {0} summary".format(name),
+        ]
+        for key in sorted(snapshot.keys()):
+            h = snapshot[key]
+            for q in quantiles:
+                ms = h.percentile(q * 100.0)
+                v = "NaN" if ms is None else cls._float_get(ms / 1000.0)
+                ar.append("{0}{1} {2}".format(name, cls._labels_get(cls.LATENCY_LABELS, key, [("quantile", q)]), v))
+            labels = cls._labels_get(cls.LATENCY_LABELS, key)
+            ar.append("{0}_sum{1} {2}".format(name, labels, cls._float_get(h.sum_ms / 1000.0)))
+            ar.append("{0}_count{1} {2}".format(name, labels, h.count))
+        return "\n".join(ar) + "\n"
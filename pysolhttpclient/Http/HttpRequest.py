@@ -21,9 +21,10 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 # ===============================================================================
 """
-import os.path
-
-from pysolhttpclient.Http.HttpClient import HttpClient
+from pysolhttpclient.Http.HttpImpl import HttpImpl
+from pysolhttpclient.Http.HttpMtlsCache import HttpMtlsCache
+from pysolhttpclient.Http.HttpRequestBody import HttpRequestBody
+from pysolhttpclient.Http.HttpRequestPrepared import HttpRequestPrepared
 
 
 class HttpRequest(object):
@@ -31,11 +32,28 @@ class HttpRequest(object):
     Http client
     """
 
+    # Attributes the prepared form depends on (setting one of them drops the prepared form)
+    _PREPARED_ATTRS = frozenset([
+        "uri",
+        "https_insecure",
+        "disable_ipv6",
+        "http_proxy_host",
+        "http_proxy_port",
+        "mtls_enabled",
+        "mtls_client_key",
+        "mtls_client_crt",
+        "mtls_client_pwd",
+        "mtls_ca_crt",
+    ])
+
     def __init__(self):
         """
         Const
         """
 
+        # Prepared form (HttpRequestPrepared), see prepare()
+        self._prepared = None
+
         # Method
         # If none, auto-detect (post_data : POST, GET otherwise)
         # If set : GET|HEAD|OPTIONS|TRACE, or POST|PUT|PATCH|DELETE (with post_data)
@@ -45,8 +63,13 @@ class HttpRequest(object):
         self.uri = None
 
         # Post data
+        # Can be bytes, str, or a stream : iterable (generator, list...) of bytes/str chunks, file-like object (read)
         self.post_data = None
 
+        # Post data length (streams only)
+        # If set, stream is sent with content-length, otherwise it is sent using chunked transfer encoding
+        self.post_data_length = None
+
         # Request headers
         self.headers = dict()
 
@@ -66,6 +89,8 @@ class HttpRequest(object):
         self.http_concurrency = 8192
 
         # Https insecure
+        # If True, the server certificate is not verified (and its hostname not checked),
+        # on all implementations (gevent, urllib3, asyncio), with or without proxy and mtls
         self.https_insecure = True
 
         # Ip v6
@@ -80,38 +105,117 @@ class HttpRequest(object):
         self.socks5_proxy_port = None
 
         # Force implementation
-        self.force_http_implementation = HttpClient.HTTP_IMPL_AUTO
+        self.force_http_implementation = HttpImpl.HTTP_IMPL_AUTO
 
         # Chunked, default False
-        # SUPPORTED only for urllib3 implementation
+        # Streams without post_data_length are always sent chunked
         self.chunked = False
 
+        # Stream response, default False
+        # If True, response body is not buffered : HttpResponse.stream must be consumed (or closed) by the caller
+        # The connection is released back to its pool when the stream is consumed or closed
+        self.stream_response = False
+
+        # Request compression, default None (off)
+        # If set (gzip, deflate, br, zstd), post_data is compressed and sent with Content-Encoding,
+        # if its length is at least compress_request_min_size (streams of unknown length are always compressed)
+        # Compressed streams are sent using chunked transfer encoding (compressed length is unknown)
+        self.compress_request = None
+        self.compress_request_min_size = 1024
+
+        # Response decompression, default True
+        # If True, Accept-Encoding is sent (unless set in headers) and the body is decoded (gzip, deflate, br, zstd)
+        # according to its Content-Encoding (buffer or stream)
+        # Buffered (not streamed) decoded bodies above decompress_response_max_bytes fail (None : no limit)
+        # Streamed bodies are decoded on demand, up to the length read
+        self.decompress_response = True
+        self.decompress_response_max_bytes = 256 * 1024 * 1024
+
+        # Redirects (301, 302, 303, 307, 308), off by default
+        # If on, up to max_redirects hops are followed, all sharing general_timeout_ms
+        # Hops are recorded in HttpResponse.redirects, HttpResponse.http_request is the last hop request
+        self.follow_redirects = False
+        self.max_redirects = 10
+
+        # Retry policy (HttpRetryPolicy), None for no retry
+        # Retries are bounded by general_timeout_ms (overall deadline) and by the client retry budget
+        self.retry_policy = None
+
+        # Coalescing (single flight), off by default
+        # If on, identical concurrent requests (GET, HEAD without body, not streamed) are sent once (HttpClient.coalescer),
+        # keyed on method, uri and coalesce_headers (all request headers if None)
+        self.coalesce = False
+        self.coalesce_headers = None
+
         # MTLS SUPPORT
-        # NOTE : this will rely on file system load (which is bad for perf....)
-        # => https://github.com/urllib3/urllib3/issues/474
-        # => https://bugs.python.org/issue16487
+        # Key and certificates are file paths (str) or PEM contents (bytes)
+        # They are loaded once and cached in memory (HttpMtlsCache), with a ssl context per content hash
+        # Files are watched (mtime/size, checked at most every HttpMtlsCache.CHECK_INTERVAL_MS) and reloaded on change
+        # Ssl loads key and crt from files only : they are given to it through anonymous memory files (memfd, linux),
+        # elsewhere through a temporary directory (/dev/shm if present, else the temp dir, which may be on disk) removed right after
         self.mtls_enabled = False
         self.mtls_client_key = None  # Mandatory
         self.mtls_client_crt = None  # Mandatory
         self.mtls_client_pwd = None  # Optional
         self.mtls_ca_crt = None  # Optional
 
+    def __setattr__(self, key, value):
+        """
+        Set attribute, dropping the prepared form if required
+        :param key: str
+        :type key: str
+        :param value: object
+        :type value: object
+        """
+
+        if key in HttpRequest._PREPARED_ATTRS:
+            self.__dict__["_prepared"] = None
+        object.__setattr__(self, key, value)
+
+    def prepare(self):
+        """
+        Get the prepared form : uri parsed and pool keys computed once.
+        It is cached until uri, tls, proxy or mtls attributes are set.
+        Called by clients for each request, it can be called upfront on request templates.
+        :return HttpRequestPrepared
+        :rtype HttpRequestPrepared
+        """
+
+        if self._prepared is None:
+            self._prepared = HttpRequestPrepared(self)
+        return self._prepared
+
     def mtls_pool_key_get(self):
         """
-        Get MTLS pool key
+        Get MTLS pool key (material content hash based, it changes if material is rotated)
         :return: str,None
         :return str,None
         """
         if self.mtls_enabled:
-            return "MTLS_%s_%s_%s_%s" % (
-                self.mtls_ca_crt,
+            return "MTLS_%s" % HttpMtlsCache.material_get(
                 self.mtls_client_key,
                 self.mtls_client_crt,
-                len(self.mtls_client_pwd),
+                self.mtls_client_pwd,
+                self.mtls_ca_crt,
             )
         else:
             return None
 
+    def mtls_ssl_context_get(self):
+        """
+        Get MTLS ssl context (cached per material content hash)
+        :return ssl.SSLContext
+        :rtype ssl.SSLContext
+        """
+
+        content_hash = HttpMtlsCache.material_get(
+            self.mtls_client_key,
+            self.mtls_client_crt,
+            self.mtls_client_pwd,
+            self.mtls_ca_crt,
+        )
+        return HttpMtlsCache.context_get(content_hash, self.https_insecure)
+
     def mtls_status_validate(self):
         """
         Get MTLS status _mtls_status_msg and _mtls_status_ex
@@ -122,6 +226,14 @@ class HttpRequest(object):
         if not self.mtls_enabled:
             return
 
+        # Material (supported by all implementations)
+        self.mtls_material_validate()
+
+    def mtls_material_validate(self):
+        """
+        Validate MTLS material (keys and certificates), raise an Exception if invalid
+        """
+
         # Notice : mtls_client_pwd and mtls_ca_crt are optional
         if self.mtls_client_key is None or self.mtls_client_crt is None:
             # Invalid
@@ -133,21 +245,27 @@ class HttpRequest(object):
                 )
             )
 
-        # OPTIONAL
-        if self.mtls_ca_crt is not None and not os.path.isfile(self.mtls_ca_crt):
-            raise Exception("MTLS_FAILED (not isfile), mtls_ca_crt=%s" % self.mtls_ca_crt)
-        # MANDATORY
-        elif not os.path.isfile(self.mtls_client_key):
-            raise Exception("MTLS_FAILED (not isfile), mtls_client_key=%s" % self.mtls_client_key)
-        # MANDATORY
-        elif not os.path.isfile(self.mtls_client_crt):
-            raise Exception("MTLS_FAILED (not isfile), mtls_client_crt=%s" % self.mtls_client_crt)
-
-        # MUST RUN UNDER URLLIB3
-        if self.force_http_implementation == HttpClient.HTTP_IMPL_AUTO:
-            self.force_http_implementation = HttpClient.HTTP_IMPL_URLLIB3
-        elif self.force_http_implementation == HttpClient.HTTP_IMPL_GEVENT:
-            raise Exception("MTLS_FAILED (not supported on HTTP_IMPL_GEVENT)")
+        # Load (in memory cache, files are not accessed on each call)
+        HttpMtlsCache.material_get(
+            self.mtls_client_key,
+            self.mtls_client_crt,
+            self.mtls_client_pwd,
+            self.mtls_ca_crt,
+        )
+
+    def _post_data_len_str(self):
+        """
+        Post data length, for logging
+        :return str
+        :rtype str
+        """
+
+        if self.post_data is None:
+            return "None"
+        elif HttpRequestBody.is_stream(self.post_data):
+            return "stream/{0}".format(self.post_data_length)
+        else:
+            return str(len(self.post_data))
 
     def __str__(self):
         """
@@ -156,10 +274,10 @@ class HttpRequest(object):
         :rtype str
         """
 
-        return "hreq:uri={0}*m={1}*pd={2}*ka={3}*cc={4}*httpsi={5}*prox={6}*socks={7}*force={8}*h={9}*to.c/n/g={10}/{11}/{12}*mtls={13}/{14}/{15}/{16}/{17}".format(
+        return "hreq:uri={0}*m={1}*pd={2}*ka={3}*cc={4}*httpsi={5}*prox={6}*socks={7}*force={8}*h={9}*to.c/n/g={10}/{11}/{12}*mtls={13}/{14}/{15}/{16}/{17}*stream={18}".format(
             self.uri,
             self.method,
-            len(self.post_data) if self.post_data else "None",
+            self._post_data_len_str(),
             self.keep_alive,
             self.http_concurrency,
             self.https_insecure,
@@ -173,4 +291,5 @@ class HttpRequest(object):
             "y" if self.mtls_client_key is not None else "",
             "y" if self.mtls_client_pwd is not None else "",
             "y" if self.mtls_ca_crt is not None else "",
+            self.stream_response,
         )
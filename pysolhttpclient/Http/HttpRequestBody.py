@@ -0,0 +1,202 @@
+"""
+# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+
+
+class HttpRequestBody(object):
+    """
+    Http request body stream.
+    Wrap an iterable (generator, list of chunks...) or a file-like object (read) as a file-like object,
+    with an optional known length.
+    Chunks can be bytes or str (str are utf-8 encoded).
+    """
+
+    def __init__(self, data, length=None):
+        """
+        Const
+        :param data: iterable of bytes/str, or file-like object (read)
+        :type data: object
+        :param length: int,None (known length, None if unknown)
+        :type length: int,None
+        """
+
+        self.length = length
+
+        # Bytes read so far
+        self.bytes_read = 0
+
+        # Source (seekable files can be rewound to their initial position)
+        self._file_pos = None
+        if hasattr(data, "read"):
+            self._file = data
+            self._it = None
+            try:
+                if data.seekable():
+                    self._file_pos = data.tell()
+            except (AttributeError, IOError, OSError, ValueError):
+                pass
+        else:
+            self._file = None
+            self._it = iter(data)
+
+        # Pending bytes (iterable only)
+        self._buf = bytearray()
+
+    @classmethod
+    def is_stream(cls, data):
+        """
+        Return True if data is a stream (not an in memory buffer)
+        :param data: object
+        :type data: object
+        :return bool
+        :rtype bool
+        """
+
+        if data is None:
+            return False
+        return not isinstance(data, (bytes, bytearray, memoryview, str))
+
+    @property
+    def is_file(self):
+        """
+        Return True if the source is a file-like object (reads may block)
+        :return bool
+        :rtype bool
+        """
+
+        return self._file is not None
+
+    def is_rewindable(self):
+        """
+        Return True if the stream can be read again from its start (seekable file)
+        :return bool
+        :rtype bool
+        """
+
+        return self._file_pos is not None
+
+    def rewind(self):
+        """
+        Rewind to the start of the stream (seekable file only)
+        """
+
+        if self._file_pos is None:
+            raise Exception("HttpRequestBody not rewindable")
+        self._file.seek(self._file_pos)
+        self.bytes_read = 0
+
+    @classmethod
+    def _to_binary(cls, chunk):
+        """
+        To binary
+        :param chunk: bytes,str
+        :type chunk: bytes,str
+        :return bytes
+        :rtype bytes
+        """
+
+        if isinstance(chunk, str):
+            return chunk.encode("utf-8")
+        return chunk
+
+    def read(self, length=-1):
+        """
+        Read up to length bytes (all remaining if length is None or negative).
+        Return empty bytes at end of stream.
+        :param length: int,None
+        :type length: int,None
+        :return bytes
+        :rtype bytes
+        """
+
+        if length is None:
+            length = -1
+
+        if self._file is not None:
+            # File-like
+            buf = self._to_binary(self._file.read(length))
+        else:
+            # Iterable : buffer up to length
+            while length < 0 or len(self._buf) < length:
+                try:
+                    chunk = next(self._it)
+                except StopIteration:
+                    break
+                if chunk:
+                    self._buf += self._to_binary(chunk)
+
+            if length < 0 or len(self._buf) <= length:
+                buf = bytes(self._buf)
+                self._buf.clear()
+            else:
+                buf = bytes(self._buf[:length])
+                del self._buf[:length]
+
+        if buf:
+            self.bytes_read += len(buf)
+        return buf
+
+    def __iter__(self):
+        """
+        Iterate over chunks
+        :return generator
+        :rtype generator
+        """
+
+        while True:
+            buf = self.read(64 * 1024)
+            if not buf:
+                return
+            yield buf
+
+    def __len__(self):
+        """
+        Known length. Raise TypeError if unknown (as len() does for objects without len).
+        :return int
+        :rtype int
+        """
+
+        if self.length is None:
+            raise TypeError("HttpRequestBody length unknown")
+        return self.length
+
+    def __bool__(self):
+        """
+        Always true (a stream may be non empty without known length)
+        :return bool
+        :rtype bool
+        """
+
+        return True
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hbody:len={0}*read={1}".format(
+            self.length,
+            self.bytes_read,
+        )
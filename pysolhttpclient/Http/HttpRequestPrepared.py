@@ -0,0 +1,96 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+from urllib.parse import urlsplit
+
+
+class HttpRequestPrepared(object):
+    """
+    Http request prepared form : parsed uri and pool keys, computed once by HttpRequest.prepare
+    """
+
+    __slots__ = (
+        "scheme", "host", "port", "is_https", "request_uri",
+        "pool_key", "urllib3_key",
+        "gevent_url",
+    )
+
+    def __init__(self, http_request):
+        """
+        Const
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        """
+
+        # Uri
+        url = urlsplit(http_request.uri)
+        self.scheme = url.scheme
+        self.is_https = url.scheme == "https"
+        self.host = url.hostname
+        self.port = url.port if url.port else (443 if self.is_https else 80)
+        self.request_uri = url.path if url.path else "/"
+        if url.query:
+            self.request_uri += "?" + url.query
+
+        # Notice : mtls material may be rotated, the mtls key (content hash) is not part of the keys,
+        # it is appended by clients (mtls_enabled is)
+        is_proxy = http_request.http_proxy_host is not None
+
+        # Per target pool key (gevent, asyncio)
+        self.pool_key = (
+            self.host,
+            self.port,
+            self.is_https,
+            http_request.https_insecure,
+            http_request.disable_ipv6,
+            http_request.http_proxy_host,
+            http_request.http_proxy_port,
+            http_request.mtls_enabled,
+        )
+
+        # Urllib3 pool key : None for basic pools (proxy off, mtls off)
+        if not is_proxy and not http_request.mtls_enabled:
+            self.urllib3_key = None
+        else:
+            self.urllib3_key = (
+                http_request.http_proxy_host,
+                http_request.http_proxy_port,
+                http_request.https_insecure,
+                self.is_https,
+                http_request.mtls_enabled,
+            )
+
+        # geventhttpclient.url.URL, set lazily by HttpClient
+        self.gevent_url = None
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hprep:key={0}*u3key={1}*ruri={2}".format(
+            self.pool_key,
+            self.urllib3_key,
+            self.request_uri,
+        )
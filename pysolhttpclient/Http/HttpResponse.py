@@ -23,6 +23,7 @@
 """
 from pysolbase.SolBase import SolBase
 
+from pysolhttpclient.Http.HttpTimings import HttpTimings
 from pysolhttpclient.NonCsDict.NonCsDict import NonCsDict
 
 
@@ -42,15 +43,34 @@ class HttpResponse(object):
         # Exception while processing
         self.exception = None
 
-        # Time taken in ms
+        # Time taken in ms (all attempts)
         self.elapsed_ms = None
 
+        # Per phase timings of the last attempt (pool, dns, connect, tls, write, ttfb, read), HttpTimings
+        self.timings = HttpTimings()
+
+        # Attempts done (HttpRequest.retry_policy)
+        self.attempts = 1
+
+        # Redirect hops followed (HttpRequest.follow_redirects), list of HttpResponse, in order
+        self.redirects = list()
+
+        # Served from cache (HttpClient.cache), fresh or revalidated (304)
+        self.from_cache = False
+
+        # Coalesced : response of an identical concurrent request (HttpRequest.coalesce), body buffer shared
+        self.coalesced = False
+
         # Class used for internal http processing
         self.http_implementation = None
 
         # Response buffer (binary / bytes)
+        # None if the response is streamed
         self.buffer = None
 
+        # Response stream (HttpResponseStream), set only if HttpRequest.stream_response is True
+        self.stream = None
+
         # Response headers
         # It can be
         # - bytes => bytes
@@ -61,8 +81,41 @@ class HttpResponse(object):
         self.status_code = 0
 
         # Content-length
+        # If the response is streamed, this is the announced content-length (0 if unknown, or if decoded)
+        # If the response is decoded (Content-Encoding), this is the decoded length
         self.content_length = 0
 
+        # Body bytes received (compressed if Content-Encoding) and body bytes after decoding
+        # Updated as the stream is read if the response is streamed
+        self.compressed_bytes = 0
+        self.decompressed_bytes = 0
+
+    @classmethod
+    def add_header(cls, d, k, v):
+        """
+        Add header k,v to d
+        :param d: dict
+        :type d: dict
+        :param k: header key
+        :param k: str
+        :param v: header value
+        :param v: str
+        """
+
+        if isinstance(k, str):
+            k = k.lower()
+
+        if k not in d:
+            d[k] = v
+        else:
+            # Already present
+            if isinstance(d[k], list):
+                # Just append
+                d[k].append(v)
+            else:
+                # Build a list, existing value and new value
+                d[k] = [d[k], v]
+
     def __str__(self):
         """
         To string override
@@ -70,7 +123,7 @@ class HttpResponse(object):
         :rtype str
         """
 
-        return "hresp:st={0}*cl={1}*impl={2}*ms={3}*h={4}*req.uri={5}*req.h={6}*ex={7}".format(
+        return "hresp:st={0}*cl={1}*impl={2}*ms={3}*h={4}*req.uri={5}*req.h={6}*ex={7}*stream={8}*att={9}*redir={10}*cache={11}*coal={12}".format(
             self.status_code,
             self.content_length,
             self.http_implementation,
@@ -79,4 +132,9 @@ class HttpResponse(object):
             self.http_request.uri,
             self.http_request.headers,
             SolBase.extostr(self.exception) if self.exception else "None",
+            self.stream,
+            self.attempts,
+            len(self.redirects),
+            self.from_cache,
+            self.coalesced,
         )
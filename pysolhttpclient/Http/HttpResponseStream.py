@@ -0,0 +1,176 @@
+"""
+# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import logging
+
+from pysolbase.SolBase import SolBase
+
+logger = logging.getLogger(__name__)
+
+
+class HttpResponseStream(object):
+    """
+    Http response body stream.
+    Body is read from the underlying connection on demand, the connection is released back to its pool
+    when the stream is fully consumed or closed.
+    """
+
+    # Default chunk size for iteration
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, read_func, close_func, chunk_size=CHUNK_SIZE):
+        """
+        Const
+        :param read_func: callable(length), return bytes (up to length, all remaining if length is None), empty bytes at eof
+        :type read_func: callable
+        :param close_func: callable(), release the underlying connection
+        :type close_func: callable
+        :param chunk_size: int
+        :type chunk_size: int
+        """
+
+        self._read_func = read_func
+        self._close_func = close_func
+        self.chunk_size = chunk_size
+
+        # Bytes read so far
+        self.bytes_read = 0
+
+        # Status
+        self.is_eof = False
+        self.is_closed = False
+
+    def read(self, length=None):
+        """
+        Read up to length bytes (all remaining bytes if length is None or negative).
+        Return empty bytes at end of stream.
+        :param length: int,None
+        :type length: int,None
+        :return bytes
+        :rtype bytes
+        """
+
+        if self.is_closed:
+            return b""
+
+        if length is not None and length < 0:
+            length = None
+
+        try:
+            buf = self._read_func(length)
+        except Exception:
+            # Connection is no more usable
+            self.close()
+            raise
+
+        if buf:
+            self.bytes_read += len(buf)
+        SolBase.sleep(0)
+
+        # Eof : full read or nothing more
+        if length is None or not buf:
+            self.is_eof = True
+            self.close()
+
+        return buf
+
+    def readinto(self, b):
+        """
+        Read up to len(b) bytes into b (bytearray or writable memoryview).
+        Return the number of bytes read, 0 at end of stream.
+        :param b: bytearray,memoryview
+        :type b: bytearray,memoryview
+        :return int
+        :rtype int
+        """
+
+        buf = self.read(len(b))
+        n = len(buf)
+        if n:
+            memoryview(b)[:n] = buf
+        return n
+
+    def close(self):
+        """
+        Close the stream and release the underlying connection.
+        A connection not fully consumed is not given back to the pool (it is closed).
+        """
+
+        if self.is_closed:
+            return
+
+        self.is_closed = True
+        try:
+            self._close_func()
+        except Exception as e:
+            logger.debug("Exception while closing stream, ex=%s", SolBase.extostr(e))
+
+    def __iter__(self):
+        """
+        Iterate over chunks (up to chunk_size)
+        :return HttpResponseStream
+        :rtype HttpResponseStream
+        """
+
+        return self
+
+    def __next__(self):
+        """
+        Next chunk
+        :return bytes
+        :rtype bytes
+        """
+
+        buf = self.read(self.chunk_size)
+        if not buf:
+            raise StopIteration()
+        return buf
+
+    def __enter__(self):
+        """
+        Context manager
+        :return HttpResponseStream
+        :rtype HttpResponseStream
+        """
+
+        return self
+
+    def __exit__(self, *args):
+        """
+        Context manager
+        """
+
+        self.close()
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hstream:read={0}*eof={1}*closed={2}".format(
+            self.bytes_read,
+            self.is_eof,
+            self.is_closed,
+        )
@@ -0,0 +1,103 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+from threading import Lock
+
+
+class HttpRetryBudget(object):
+    """
+    Http retry budget (client wide), token bucket :
+    - each request deposits ratio token (capped to max_tokens)
+    - each retry withdraws one token, the retry is denied if not available
+    Over time, retries are capped to ratio of the traffic (plus the initial min_tokens burst),
+    retries cannot amplify an outage.
+    """
+
+    def __init__(self, ratio=0.1, min_tokens=10, max_tokens=100):
+        """
+        Const
+        :param ratio: float (retries allowed per request)
+        :type ratio: float
+        :param min_tokens: int (initial tokens, allow some retries on low traffic)
+        :type min_tokens: int
+        :param max_tokens: int (max tokens, bound retry bursts)
+        :type max_tokens: int
+        """
+
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = float(min(min_tokens, max_tokens))
+        self._locker = Lock()
+
+        # Counters
+        self.request_count = 0
+        self.retry_count = 0
+        self.retry_denied_count = 0
+
+    def deposit(self):
+        """
+        Deposit (one request)
+        """
+
+        with self._locker:
+            self.request_count += 1
+            # Rounded : 10 deposits of 0.1 must give 1 token
+            self._tokens = min(self.max_tokens, round(self._tokens + self.ratio, 6))
+
+    def withdraw(self):
+        """
+        Withdraw (one retry)
+        :return bool (True if the retry is allowed)
+        :rtype bool
+        """
+
+        with self._locker:
+            if self._tokens < 1.0:
+                self.retry_denied_count += 1
+                return False
+            self._tokens -= 1.0
+            self.retry_count += 1
+            return True
+
+    def tokens_get(self):
+        """
+        Get available tokens
+        :return float
+        :rtype float
+        """
+
+        return self._tokens
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hbudget:ratio={0}*tok={1:.2f}*req={2}*retry={3}*denied={4}".format(
+            self.ratio,
+            self._tokens,
+            self.request_count,
+            self.retry_count,
+            self.retry_denied_count,
+        )
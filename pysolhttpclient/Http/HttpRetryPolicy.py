@@ -0,0 +1,144 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import random
+from http.client import HTTPException
+
+from pysolhttpclient.Http.HttpRequestBody import HttpRequestBody
+
+
+class HttpRetryPolicy(object):
+    """
+    Http retry policy (HttpRequest.retry_policy), applied by HttpClient on both implementations.
+    - only idempotent methods are retried, requests with a stream body are never retried (cannot be replayed)
+    - retried on retryable exceptions (connect, reset, network timeout...) and retryable status codes
+    - exponential backoff with full jitter : random(0, min(backoff_max_ms, backoff_base_ms * 2 ** (attempt - 1)))
+    - HttpRequest.general_timeout_ms is the overall deadline : no retry is attempted if the backoff would reach it
+    - retries are also bounded by the client retry budget (HttpClient.retry_budget)
+    """
+
+    # Idempotent methods (RFC 9110)
+    IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "TRACE", "PUT", "DELETE"])
+
+    # Retryable status codes
+    RETRY_STATUS_CODES = frozenset([502, 503, 504])
+
+    # Default retryable exceptions, resolved lazily (urllib3 must not be imported before gevent monkey patching)
+    _default_exceptions = None
+
+    def __init__(self, max_attempts=3, retry_status_codes=RETRY_STATUS_CODES, retry_exceptions=None, methods=IDEMPOTENT_METHODS, backoff_base_ms=50, backoff_max_ms=2000):
+        """
+        Const
+        :param max_attempts: int (total attempts, including the first one)
+        :type max_attempts: int
+        :param retry_status_codes: iterable of int
+        :type retry_status_codes: iterable
+        :param retry_exceptions: tuple,None (exception classes, None for transport errors : OSError, http.client.HTTPException, urllib3 HTTPError)
+        :type retry_exceptions: tuple,None
+        :param methods: iterable of str (methods which can be retried)
+        :type methods: iterable
+        :param backoff_base_ms: int
+        :type backoff_base_ms: int
+        :param backoff_max_ms: int
+        :type backoff_max_ms: int
+        """
+
+        if max_attempts < 1:
+            raise Exception("Invalid max_attempts={0}".format(max_attempts))
+
+        self.max_attempts = max_attempts
+        self.retry_status_codes = frozenset(retry_status_codes)
+        self.retry_exceptions = retry_exceptions
+        self.methods = frozenset(m.upper() for m in methods)
+        self.backoff_base_ms = backoff_base_ms
+        self.backoff_max_ms = backoff_max_ms
+
+    @classmethod
+    def _default_exceptions_get(cls):
+        """
+        Get default retryable exceptions (transport errors)
+        :return tuple
+        :rtype tuple
+        """
+
+        if cls._default_exceptions is None:
+            from urllib3.exceptions import HTTPError
+            cls._default_exceptions = (OSError, HTTPException, HTTPError)
+        return cls._default_exceptions
+
+    def is_retryable(self, http_request, http_response):
+        """
+        Check if a response (failed or with a retryable status code) can be retried
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        :return bool
+        :rtype bool
+        """
+
+        # Method (auto-detect : POST if post data, GET otherwise)
+        method = http_request.method
+        if not method:
+            method = "POST" if http_request.post_data else "GET"
+        if method.upper() not in self.methods:
+            return False
+
+        # Stream bodies cannot be replayed
+        if HttpRequestBody.is_stream(http_request.post_data):
+            return False
+
+        # Exception
+        if http_response.exception is not None:
+            if self.retry_exceptions is not None:
+                return isinstance(http_response.exception, self.retry_exceptions)
+            return isinstance(http_response.exception, self._default_exceptions_get())
+
+        # Status
+        return http_response.status_code in self.retry_status_codes
+
+    def backoff_ms_get(self, attempt):
+        """
+        Get backoff before next attempt (exponential, full jitter)
+        :param attempt: int (attempt which failed, 1 for the first one)
+        :type attempt: int
+        :return float
+        :rtype float
+        """
+
+        cap = min(self.backoff_max_ms, self.backoff_base_ms * (2 ** (attempt - 1)))
+        return random.uniform(0, cap)
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hretry:max={0}*st={1}*m={2}*bo={3}/{4}".format(
+            self.max_attempts,
+            sorted(self.retry_status_codes),
+            sorted(self.methods),
+            self.backoff_base_ms,
+            self.backoff_max_ms,
+        )
@@ -0,0 +1,104 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+from collections import deque
+from threading import Lock
+
+
+class HttpSpanCollector(object):
+    """
+    In process span collector (HttpTracer), bounded (oldest spans dropped).
+    Spans are dicts shaped as OpenTelemetry (OTLP json) spans, ready to be forwarded to an exporter.
+    """
+
+    def __init__(self, max_spans=10000):
+        """
+        Const
+        :param max_spans: int
+        :type max_spans: int
+        """
+
+        self.max_spans = max_spans
+        self._spans = deque(maxlen=max_spans)
+        self._locker = Lock()
+
+        # Counters
+        self.exported_count = 0
+        self.dropped_count = 0
+
+    def export(self, span):
+        """
+        Export a span
+        :param span: dict
+        :type span: dict
+        """
+
+        with self._locker:
+            if len(self._spans) >= self.max_spans:
+                self.dropped_count += 1
+            self._spans.append(span)
+            self.exported_count += 1
+
+    def spans_get(self, clear=False):
+        """
+        Get collected spans (oldest first)
+        :param clear: bool (clear collected spans)
+        :type clear: bool
+        :return list of dict
+        :rtype list
+        """
+
+        with self._locker:
+            ar = list(self._spans)
+            if clear:
+                self._spans.clear()
+            return ar
+
+    def clear(self):
+        """
+        Clear
+        """
+
+        with self._locker:
+            self._spans.clear()
+
+    def __len__(self):
+        """
+        Spans count
+        :return int
+        :rtype int
+        """
+
+        return len(self._spans)
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hspans:len={0}*exported={1}*dropped={2}".format(
+            len(self._spans),
+            self.exported_count,
+            self.dropped_count,
+        )
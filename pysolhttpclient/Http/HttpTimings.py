@@ -0,0 +1,95 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+
+
+class HttpTimings(object):
+    """
+    Http request per phase timings (ms), of the last attempt (HttpResponse.timings).
+    A phase is None if not done (connection reused, response served from cache...) or not measurable.
+    Notice : the gevent implementation cannot observe request writes, they are included in ttfb_ms (write_ms is None).
+    Notice : the urllib3 implementation resolves names itself without HttpClient.dns_cache, they are included in connect_ms (dns_ms is None).
+    """
+
+    # Phases, in order
+    PHASES = ("pool_ms", "dns_ms", "connect_ms", "tls_ms", "write_ms", "ttfb_ms", "read_ms")
+
+    def __init__(self):
+        """
+        Const
+        """
+
+        # Wait for a connection from the pool (new connection setup excluded)
+        self.pool_ms = None
+
+        # New connection : name resolution, tcp connect (including proxy CONNECT tunnel), tls handshake
+        self.dns_ms = None
+        self.connect_ms = None
+        self.tls_ms = None
+
+        # Request write (headers and body)
+        self.write_ms = None
+
+        # Time to first byte : request written => response headers received
+        self.ttfb_ms = None
+
+        # Body read (None if the response is streamed)
+        self.read_ms = None
+
+        # True if a new connection was opened, False if a pooled one was reused
+        self.connection_new = False
+
+        # Internal : new connection setup time (all phases), last mark (epoch ms)
+        self._setup_ms = 0.0
+        self._mark_ms = None
+
+    def add(self, phase, ms):
+        """
+        Add ms to a phase (phases may be hit several times, ie connecting to several addresses)
+        :param phase: str
+        :type phase: str
+        :param ms: float
+        :type ms: float
+        """
+
+        cur = getattr(self, phase)
+        setattr(self, phase, ms if cur is None else cur + ms)
+
+    def to_dict(self):
+        """
+        To dict
+        :return dict
+        :rtype dict
+        """
+
+        d = dict((phase, getattr(self, phase)) for phase in HttpTimings.PHASES)
+        d["connection_new"] = self.connection_new
+        return d
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "htimings:" + "*".join("{0}={1}".format(phase[:-3], getattr(self, phase)) for phase in HttpTimings.PHASES) + "*new={0}".format(self.connection_new)
@@ -0,0 +1,215 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import random
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+from pysolhttpclient.Http.HttpHook import HttpHook
+from pysolhttpclient.Http.HttpImpl import HttpImpl
+from pysolhttpclient.Http.HttpSpanCollector import HttpSpanCollector
+
+
+class HttpTracer(HttpHook):
+    """
+    Tracing hook (HttpClient.hook_add) : one OpenTelemetry compatible client span per attempt, sent to a collector.
+    - span attributes follow http client semantic conventions (http.request.method, url.full, server.address...)
+    - W3C traceparent header is injected, a traceparent set by the caller is used as parent (trace continued)
+    - new connections are recorded as "connect" span events
+    Streamed responses end their span when headers are received.
+    """
+
+    def __init__(self, collector=None, inject=True):
+        """
+        Const
+        :param collector: HttpSpanCollector,None (None : a new one)
+        :type collector: HttpSpanCollector,None
+        :param inject: bool (inject traceparent header)
+        :type inject: bool
+        """
+
+        self.collector = collector if collector is not None else HttpSpanCollector()
+        self.inject = inject
+
+        # Pending spans, id(http_response) => span
+        self._spans = dict()
+
+    @classmethod
+    def _traceparent_get(cls, headers):
+        """
+        Get (trace_id, parent_span_id) from a W3C traceparent header, (None, None) if absent or invalid
+        :param headers: dict
+        :type headers: dict
+        :return tuple
+        :rtype tuple
+        """
+
+        for k, v in headers.items():
+            if k.lower() == "traceparent":
+                ar = str(v).strip().split("-")
+                if len(ar) >= 4 and len(ar[1]) == 32 and len(ar[2]) == 16 and ar[1] != "0" * 32:
+                    return ar[1], ar[2]
+                break
+        return None, None
+
+    @classmethod
+    def _attributes_get(cls, http_request):
+        """
+        Get span attributes of a request
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :return dict
+        :rtype dict
+        """
+
+        method = http_request.method
+        if not method:
+            method = "POST" if http_request.post_data else "GET"
+        method = method.upper()
+
+        # Credentials are not recorded
+        u = urlsplit(http_request.uri)
+        port = u.port or (443 if u.scheme == "https" else 80)
+        netloc = u.netloc.rpartition("@")[2]
+        return {
+            "http.request.method": method,
+            "url.full": urlunsplit((u.scheme, netloc, u.path, u.query, "")),
+            "url.scheme": u.scheme,
+            "server.address": u.hostname,
+            "server.port": port,
+        }
+
+    def pre_send(self, http_request, http_response, headers, body):
+        """
+        Start a span
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        :param headers: dict (headers to send)
+        :type headers: dict
+        :param body: bytes,str,HttpRequestBody,None
+        :type body: object
+        """
+
+        trace_id, parent_span_id = self._traceparent_get(headers)
+        if trace_id is None:
+            trace_id = "{0:032x}".format(random.getrandbits(128))
+        span_id = "{0:016x}".format(random.getrandbits(64))
+
+        attributes = self._attributes_get(http_request)
+        attributes["pysolhttpclient.impl"] = "gevent" if http_response.http_implementation == HttpImpl.HTTP_IMPL_GEVENT else "urllib3"
+        self._spans[id(http_response)] = {
+            "name": attributes["http.request.method"],
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_span_id": parent_span_id or "",
+            "kind": "SPAN_KIND_CLIENT",
+            "start_time_unix_nano": time.time_ns(),
+            "end_time_unix_nano": None,
+            "attributes": attributes,
+            "events": list(),
+            "status": {"code": "STATUS_CODE_UNSET", "message": ""},
+        }
+
+        if self.inject:
+            for k in [k for k in headers if k.lower() == "traceparent"]:
+                del headers[k]
+            headers["traceparent"] = "00-{0}-{1}-01".format(trace_id, span_id)
+
+    def on_connect(self, http_request, http_response):
+        """
+        Record a connect event
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        """
+
+        span = self._spans.get(id(http_response))
+        if span is not None:
+            span["events"].append({"name": "connect", "time_unix_nano": time.time_ns(), "attributes": {}})
+
+    def on_response(self, http_request, http_response):
+        """
+        End a span
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        """
+
+        span = self._spans.pop(id(http_response), None)
+        if span is None:
+            return
+        span["attributes"]["http.response.status_code"] = http_response.status_code
+        span["attributes"]["pysolhttpclient.connection_new"] = http_response.timings.connection_new
+        if http_response.status_code >= 400:
+            span["attributes"]["error.type"] = str(http_response.status_code)
+            span["status"]["code"] = "STATUS_CODE_ERROR"
+        self._span_end(span)
+
+    def on_error(self, http_request, http_response, ex):
+        """
+        End a span (error)
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        :param ex: BaseException
+        :type ex: BaseException
+        """
+
+        span = self._spans.pop(id(http_response), None)
+        if span is None:
+            return
+        span["attributes"]["error.type"] = ex.__class__.__name__
+        span["status"] = {"code": "STATUS_CODE_ERROR", "message": str(ex)}
+        span["events"].append({
+            "name": "exception",
+            "time_unix_nano": time.time_ns(),
+            "attributes": {"exception.type": ex.__class__.__name__, "exception.message": str(ex)},
+        })
+        self._span_end(span)
+
+    def _span_end(self, span):
+        """
+        End a span and export it
+        :param span: dict
+        :type span: dict
+        """
+
+        span["end_time_unix_nano"] = time.time_ns()
+        self.collector.export(span)
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "htracer:pending={0}*inject={1}*collector={2}".format(
+            len(self._spans),
+            self.inject,
+            self.collector,
+        )
@@ -22,15 +22,10 @@
 # ===============================================================================
 """
 
-# WE MUST MONKEY PATCH ASAP HERE FOR PY3
-from pysolbase.SolBase import SolBase
-
-SolBase.voodoo_init(init_logging=False)
+# Notice : gevent monkey patching is done by HttpClient (gevent and urllib3 implementations)
+# HttpRequest, HttpResponse and HttpAsyncClient (asyncio) do not monkey patch
+# Nothing importing ssl (urllib3...) must be imported here, HttpClient may patch after us
 
 # noinspection PyPep8
 import warnings
 warnings.simplefilter("ignore", ResourceWarning)
-
-# noinspection PyPep8
-from urllib3.exceptions import InsecureRequestWarning
-warnings.simplefilter("ignore", InsecureRequestWarning)
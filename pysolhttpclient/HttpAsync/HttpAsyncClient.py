@@ -0,0 +1,537 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import asyncio
+import logging
+import ssl
+
+from pysolbase.SolBase import SolBase
+
+from pysolhttpclient.Http.HttpImpl import HttpImpl
+from pysolhttpclient.Http.HttpPoolCache import HttpPoolCache
+from pysolhttpclient.Http.HttpRequestBody import HttpRequestBody
+from pysolhttpclient.Http.HttpResponse import HttpResponse
+from pysolhttpclient.HttpAsync.HttpAsyncPool import HttpAsyncPool
+
+logger = logging.getLogger(__name__)
+
+
+class HttpAsyncClient(object):
+    """
+    Http client, asyncio implementation (HTTP/1.1, keep-alive pools).
+    It does not rely on gevent and does not monkey patch.
+    Not supported : HttpRequest.stream_response, https over http proxy.
+    """
+
+    # Read block size
+    BLOCK_SIZE = 64 * 1024
+
+    # Methods without request body
+    METHODS_NO_BODY = ("HEAD", "OPTIONS")
+
+    # Methods expecting a request body
+    METHODS_BODY = ("POST", "PUT", "PATCH")
+
+    def __init__(self):
+        """
+        Const
+        """
+
+        # Pools, bound to one loop
+        self._pool = HttpPoolCache("asyncio", close_func=lambda p: p.close(), max_size=1024, idle_ttl_ms=300000)
+        self._pool_loop = None
+
+        # Ssl contexts
+        self._ssl_context = dict()
+
+    # ====================================
+    # POOL
+    # ====================================
+
+    def _ssl_context_get(self, http_request):
+        """
+        Get ssl context (cached)
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :return ssl.SSLContext
+        :rtype ssl.SSLContext
+        """
+
+        # Mtls : cached per material content hash
+        if http_request.mtls_enabled:
+            return http_request.mtls_ssl_context_get()
+
+        key = http_request.https_insecure
+        if key in self._ssl_context:
+            return self._ssl_context[key]
+
+        ctx = ssl.create_default_context()
+        if http_request.https_insecure:
+            ctx.check_hostname = False
+            ctx.verify_mode = ssl.CERT_NONE
+
+        self._ssl_context[key] = ctx
+        return ctx
+
+    def async_from_pool(self, http_request):
+        """
+        Get an asyncio pool from request
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :return HttpAsyncPool
+        :rtype HttpAsyncPool
+        """
+
+        # Pools are bound to the running loop (called from a coroutine)
+        loop = asyncio.get_running_loop()
+        if self._pool_loop is not loop:
+            if len(self._pool) > 0:
+                logger.info("Event loop changed, dropping pools, count=%s", len(self._pool))
+            self._pool = HttpPoolCache(self._pool.name, close_func=lambda pool: pool.close(), max_size=self._pool.max_size, idle_ttl_ms=self._pool.idle_ttl_ms)
+            self._pool_loop = loop
+
+        # Key (prepared once per request, mtls material hash appended as it may be rotated)
+        prepared = http_request.prepare()
+        key = prepared.pool_key
+        if http_request.mtls_enabled:
+            key = key + (http_request.mtls_pool_key_get(),)
+
+        # Check
+        p = self._pool.get(key)
+        if p is not None:
+            return p
+
+        # Allocate (least recently used pools are evicted if maxed)
+        if http_request.http_proxy_host:
+            p = HttpAsyncPool(
+                connect_host=http_request.http_proxy_host,
+                connect_port=http_request.http_proxy_port,
+                size=http_request.http_concurrency,
+                disable_ipv6=http_request.disable_ipv6,
+            )
+        else:
+            p = HttpAsyncPool(
+                connect_host=prepared.host,
+                connect_port=prepared.port,
+                ssl_context=self._ssl_context_get(http_request) if prepared.is_https else None,
+                server_hostname=prepared.host if prepared.is_https else None,
+                size=http_request.http_concurrency,
+                disable_ipv6=http_request.disable_ipv6,
+            )
+
+        self._pool.put(key, p)
+        logger.info("Started new pool for key=%s", key)
+        return p
+
+    def close(self):
+        """
+        Close all pools
+        """
+
+        self._pool.clear()
+
+    # ====================================
+    # HTTP EXEC
+    # ====================================
+
+    async def go_http_async(self, http_request):
+        """
+        Perform an http request
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :return HttpResponse
+        :rtype HttpResponse
+        """
+
+        ms = SolBase.mscurrent()
+        http_response = HttpResponse()
+        general_timeout_sec = float(http_request.general_timeout_ms) / 1000.0
+        try:
+            # Assign request
+            http_response.http_request = http_request
+
+            # Fire
+            await asyncio.wait_for(
+                self._go_http_internal(http_request, http_response),
+                timeout=general_timeout_sec)
+        except asyncio.TimeoutError:
+            # Failed
+            http_response.exception = Exception("Timeout while processing, general_timeout_sec={0}".format(general_timeout_sec))
+        except Exception as e:
+            # Failed
+            http_response.exception = e
+        finally:
+            # Assign ms
+            http_response.elapsed_ms = SolBase.msdiff(ms)
+
+        # Return
+        return http_response
+
+    async def _go_http_internal(self, http_request, http_response):
+        """
+        Perform an http request
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        """
+
+        # Implementation
+        if http_request.force_http_implementation not in (HttpImpl.HTTP_IMPL_AUTO, HttpImpl.HTTP_IMPL_ASYNCIO):
+            raise Exception("Invalid force_http_implementation={0} (HttpAsyncClient)".format(http_request.force_http_implementation))
+        if http_request.stream_response:
+            raise Exception("stream_response not supported on HTTP_IMPL_ASYNCIO")
+        http_response.http_implementation = HttpImpl.HTTP_IMPL_ASYNCIO
+
+        # Validate MTLS
+        if http_request.mtls_enabled:
+            http_request.mtls_material_validate()
+
+        # Uri (parsed once per request)
+        prepared = http_request.prepare()
+        if prepared.scheme not in ("http", "https"):
+            raise Exception("Invalid uri scheme, uri={0}".format(http_request.uri))
+        if http_request.http_proxy_host and prepared.is_https:
+            raise Exception("https over http proxy not supported on HTTP_IMPL_ASYNCIO")
+        if http_request.mtls_enabled and not prepared.is_https:
+            raise Exception("Cannot process, mtls ON, https OFF")
+
+        # Pool
+        pool = self.async_from_pool(http_request)
+
+        # Request
+        method, head, body, chunked = self._request_build(prepared, http_request)
+
+        # Fire (a stale keep-alive connection is retried once, if the body can be replayed :
+        # in memory, or a stream over a seekable file, rewound ; other streams are not retried)
+        connection_timeout_sec = http_request.connection_timeout_ms / 1000.0
+        network_timeout_sec = http_request.network_timeout_ms / 1000.0
+        attempts = 2 if not isinstance(body, HttpRequestBody) or body.is_rewindable() else 1
+        while True:
+            attempts -= 1
+            reader, writer, reused = await pool.acquire(connection_timeout_sec)
+            reusable = False
+            try:
+                await self._request_send(writer, head, body, chunked, network_timeout_sec)
+                reusable = await self._response_read(reader, method, network_timeout_sec, http_response)
+                if not http_request.keep_alive:
+                    reusable = False
+                return
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                if reused and attempts > 0 and http_response.status_code == 0:
+                    logger.debug("Stale connection, retrying, ex=%s", e)
+                    if isinstance(body, HttpRequestBody):
+                        body.rewind()
+                    continue
+                raise
+            finally:
+                pool.release(reader, writer, reusable)
+
+    # ====================================
+    # REQUEST
+    # ====================================
+
+    def _request_build(self, prepared, http_request):
+        """
+        Build request
+        :param prepared: HttpRequestPrepared
+        :type prepared: HttpRequestPrepared
+        :param http_request: HttpRequest
+        :type http_request: HttpRequest
+        :return tuple (method, head bytes, body (bytes, HttpRequestBody or None), chunked)
+        :rtype tuple
+        """
+
+        # Method
+        if http_request.method:
+            method = http_request.method
+        elif http_request.post_data:
+            method = "POST"
+        else:
+            method = "GET"
+
+        # Body
+        body = http_request.post_data
+        if method in HttpAsyncClient.METHODS_NO_BODY:
+            body = None
+        elif HttpRequestBody.is_stream(body):
+            body = HttpRequestBody(body, length=http_request.post_data_length)
+        elif isinstance(body, str):
+            body = body.encode("utf-8")
+
+        # Target
+        if http_request.http_proxy_host:
+            # Proxy : absolute uri
+            target = http_request.uri
+        else:
+            target = prepared.request_uri
+
+        # Headers
+        headers = dict()
+        lower_keys = set(k.lower() for k in http_request.headers.keys())
+        if "host" not in lower_keys:
+            host = prepared.host
+            if ":" in host:
+                host = "[" + host + "]"
+            if prepared.port not in (80, 443):
+                host += ":" + str(prepared.port)
+            headers["Host"] = host
+
+        # Framing
+        chunked = False
+        if "content-length" not in lower_keys and "transfer-encoding" not in lower_keys:
+            if isinstance(body, HttpRequestBody):
+                if body.length is not None and not http_request.chunked:
+                    headers["Content-Length"] = str(body.length)
+                else:
+                    chunked = True
+            elif body:
+                if http_request.chunked:
+                    chunked = True
+                else:
+                    headers["Content-Length"] = str(len(body))
+            elif method in HttpAsyncClient.METHODS_BODY:
+                headers["Content-Length"] = "0"
+            if chunked:
+                headers["Transfer-Encoding"] = "chunked"
+        elif "transfer-encoding" in lower_keys:
+            chunked = True
+
+        if not http_request.keep_alive and "connection" not in lower_keys:
+            headers["Connection"] = "close"
+
+        headers.update(http_request.headers)
+
+        # Head (cr/lf rejected : no request splitting)
+        if self._is_crlf(method) or self._is_crlf(target):
+            raise ValueError("Invalid request line (cr/lf), method={0!r}, target={1!r}".format(method, target))
+        ar = [method + " " + target + " HTTP/1.1"]
+        for k, v in headers.items():
+            k = str(k)
+            v = str(v)
+            if self._is_crlf(k) or self._is_crlf(v):
+                raise ValueError("Invalid header (cr/lf), name={0!r}".format(k))
+            ar.append(k + ": " + v)
+        head = ("\r\n".join(ar) + "\r\n\r\n").encode("latin-1")
+
+        return method, head, body, chunked
+
+    @classmethod
+    def _is_crlf(cls, s):
+        """
+        Return True if s contains cr or lf
+        :param s: str
+        :type s: str
+        :return bool
+        :rtype bool
+        """
+
+        return "\r" in s or "\n" in s
+
+    @classmethod
+    async def _drain(cls, writer, network_timeout_sec):
+        """
+        Drain writer
+        :param writer: asyncio.StreamWriter
+        :type writer: asyncio.StreamWriter
+        :param network_timeout_sec: float
+        :type network_timeout_sec: float
+        """
+
+        try:
+            await asyncio.wait_for(writer.drain(), timeout=network_timeout_sec)
+        except asyncio.TimeoutError:
+            raise Exception("Network timeout while writing, network_timeout_sec={0}".format(network_timeout_sec))
+
+    async def _request_send(self, writer, head, body, chunked, network_timeout_sec):
+        """
+        Send request
+        :param writer: asyncio.StreamWriter
+        :type writer: asyncio.StreamWriter
+        :param head: bytes
+        :type head: bytes
+        :param body: bytes,HttpRequestBody,None
+        :type body: bytes,HttpRequestBody,None
+        :param chunked: bool
+        :type chunked: bool
+        :param network_timeout_sec: float
+        :type network_timeout_sec: float
+        """
+
+        if not body:
+            writer.write(head + b"0\r\n\r\n" if chunked else head)
+        elif not isinstance(body, HttpRequestBody):
+            if chunked:
+                writer.write(head + b"%x\r\n" % len(body) + body + b"\r\n0\r\n\r\n")
+            else:
+                writer.write(head + body)
+        else:
+            # File reads may block : done in the loop executor
+            loop = asyncio.get_running_loop()
+            writer.write(head)
+            while True:
+                if body.is_file:
+                    buf = await loop.run_in_executor(None, body.read, HttpAsyncClient.BLOCK_SIZE)
+                else:
+                    buf = body.read(HttpAsyncClient.BLOCK_SIZE)
+                if not buf:
+                    break
+                if chunked:
+                    writer.write(b"%x\r\n" % len(buf) + buf + b"\r\n")
+                else:
+                    writer.write(buf)
+                await self._drain(writer, network_timeout_sec)
+            if chunked:
+                writer.write(b"0\r\n\r\n")
+        await self._drain(writer, network_timeout_sec)
+
+    # ====================================
+    # RESPONSE
+    # ====================================
+
+    @classmethod
+    async def _read_wait(cls, aw, network_timeout_sec):
+        """
+        Wait for a read
+        :param aw: awaitable
+        :type aw: awaitable
+        :param network_timeout_sec: float
+        :type network_timeout_sec: float
+        :return object
+        :rtype object
+        """
+
+        try:
+            return await asyncio.wait_for(aw, timeout=network_timeout_sec)
+        except asyncio.TimeoutError:
+            raise Exception("Network timeout while reading, network_timeout_sec={0}".format(network_timeout_sec))
+
+    async def _read_exactly(self, reader, n, network_timeout_sec):
+        """
+        Read exactly n bytes, by blocks
+        :param reader: asyncio.StreamReader
+        :type reader: asyncio.StreamReader
+        :param n: int
+        :type n: int
+        :param network_timeout_sec: float
+        :type network_timeout_sec: float
+        :return bytes
+        :rtype bytes
+        """
+
+        if n <= HttpAsyncClient.BLOCK_SIZE:
+            return await self._read_wait(reader.readexactly(n), network_timeout_sec)
+
+        buf = bytearray()
+        while len(buf) < n:
+            buf += await self._read_wait(reader.readexactly(min(n - len(buf), HttpAsyncClient.BLOCK_SIZE)), network_timeout_sec)
+        return bytes(buf)
+
+    async def _response_read(self, reader, method, network_timeout_sec, http_response):
+        """
+        Read response
+        :param reader: asyncio.StreamReader
+        :type reader: asyncio.StreamReader
+        :param method: str
+        :type method: str
+        :param network_timeout_sec: float
+        :type network_timeout_sec: float
+        :param http_response: HttpResponse
+        :type http_response: HttpResponse
+        :return bool (True if connection can be reused)
+        :rtype bool
+        """
+
+        # Status line and headers (skip interim 1xx)
+        while True:
+            line = await self._read_wait(reader.readline(), network_timeout_sec)
+            if not line:
+                raise ConnectionResetError("Connection closed before response")
+            ar = line.decode("latin-1").strip().split(" ", 2)
+            if len(ar) < 2 or not ar[0].startswith("HTTP/"):
+                raise Exception("Invalid status line={0}".format(line))
+            version = ar[0]
+            status_code = int(ar[1])
+
+            headers = list()
+            while True:
+                line = await self._read_wait(reader.readline(), network_timeout_sec)
+                if not line:
+                    raise Exception("Connection closed while reading headers")
+                if line in (b"\r\n", b"\n"):
+                    break
+                k, _, v = line.decode("latin-1").partition(":")
+                headers.append((k.strip(), v.strip()))
+
+            if not 100 <= status_code < 200:
+                break
+
+        # Headers
+        http_response.status_code = status_code
+        d = dict()
+        for k, v in headers:
+            HttpResponse.add_header(http_response.headers, k, v)
+            d[k.lower()] = v
+
+        # Keep alive
+        conn = d.get("connection", "").lower()
+        if version == "HTTP/1.1":
+            reusable = "close" not in conn
+        else:
+            reusable = "keep-alive" in conn
+
+        # Body
+        if method == "HEAD" or status_code in (204, 304):
+            buf = b""
+        elif "chunked" in d.get("transfer-encoding", "").lower():
+            ar = list()
+            while True:
+                line = await self._read_wait(reader.readline(), network_timeout_sec)
+                if not line:
+                    raise Exception("Connection closed while reading chunks")
+                size = int(line.split(b";", 1)[0].strip(), 16)
+                if size == 0:
+                    # Trailers
+                    while True:
+                        line = await self._read_wait(reader.readline(), network_timeout_sec)
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                    break
+                ar.append(await self._read_exactly(reader, size, network_timeout_sec))
+                await self._read_exactly(reader, 2, network_timeout_sec)
+            buf = b"".join(ar)
+        elif "content-length" in d:
+            buf = await self._read_exactly(reader, int(d["content-length"]), network_timeout_sec)
+        else:
+            # Until close
+            ar = list()
+            while True:
+                b = await self._read_wait(reader.read(HttpAsyncClient.BLOCK_SIZE), network_timeout_sec)
+                if not b:
+                    break
+                ar.append(b)
+            buf = b"".join(ar)
+            reusable = False
+
+        http_response.buffer = buf
+        http_response.content_length = len(buf)
+        return reusable
@@ -0,0 +1,162 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import asyncio
+import logging
+import socket
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class HttpAsyncPool(object):
+    """
+    Asyncio keep-alive connection pool, for one target (host, port, tls, proxy)
+    """
+
+    def __init__(self, connect_host, connect_port, ssl_context=None, server_hostname=None, size=8192, disable_ipv6=True):
+        """
+        Const
+        :param connect_host: str (host we connect to, target or proxy)
+        :type connect_host: str
+        :param connect_port: int
+        :type connect_port: int
+        :param ssl_context: ssl.SSLContext,None
+        :type ssl_context: ssl.SSLContext,None
+        :param server_hostname: str,None (tls only)
+        :type server_hostname: str,None
+        :param size: int (max concurrent connections)
+        :type size: int
+        :param disable_ipv6: bool
+        :type disable_ipv6: bool
+        """
+
+        self.connect_host = connect_host
+        self.connect_port = connect_port
+        self.ssl_context = ssl_context
+        self.server_hostname = server_hostname
+        self.size = size
+        self.disable_ipv6 = disable_ipv6
+
+        # Idle connections (lifo), tuple (reader, writer)
+        self._idle = deque()
+
+        # Allocated lazily (must be bound to the running loop)
+        self._semaphore = None
+        self._closed = False
+
+        # Stats
+        self.connections_created = 0
+
+    async def acquire(self, connection_timeout_sec):
+        """
+        Acquire a connection (idle one if any, new one otherwise). Block if size is reached.
+        :param connection_timeout_sec: float
+        :type connection_timeout_sec: float
+        :return tuple (asyncio.StreamReader, asyncio.StreamWriter, bool reused)
+        :rtype tuple
+        """
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.size)
+
+        await self._semaphore.acquire()
+        try:
+            if self._closed:
+                raise Exception("HttpAsyncPool closed")
+
+            # Idle
+            while len(self._idle) > 0:
+                reader, writer = self._idle.pop()
+                if reader.at_eof() or writer.is_closing():
+                    # Closed by peer
+                    writer.close()
+                    continue
+                return reader, writer, True
+
+            # New one
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(
+                        host=self.connect_host,
+                        port=self.connect_port,
+                        ssl=self.ssl_context,
+                        server_hostname=self.server_hostname if self.ssl_context else None,
+                        family=socket.AF_INET if self.disable_ipv6 else 0,
+                    ),
+                    timeout=connection_timeout_sec)
+            except asyncio.TimeoutError:
+                raise Exception("Connection timeout, host=%s, port=%s, connection_timeout_sec=%s" % (
+                    self.connect_host, self.connect_port, connection_timeout_sec))
+            self.connections_created += 1
+            return reader, writer, False
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def release(self, reader, writer, reusable):
+        """
+        Release a connection
+        :param reader: asyncio.StreamReader
+        :type reader: asyncio.StreamReader
+        :param writer: asyncio.StreamWriter
+        :type writer: asyncio.StreamWriter
+        :param reusable: bool (if False, connection is closed)
+        :type reusable: bool
+        """
+
+        try:
+            if reusable and not self._closed:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+        finally:
+            self._semaphore.release()
+
+    def close(self):
+        """
+        Close idle connections, in use connections are closed upon release
+        """
+
+        self._closed = True
+        while len(self._idle) > 0:
+            _, writer = self._idle.pop()
+            try:
+                writer.close()
+            except Exception as e:
+                logger.debug("Exception while closing, ex=%s", e)
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hapool:target={0}:{1}*ssl={2}*size={3}*idle={4}*created={5}".format(
+            self.connect_host,
+            self.connect_port,
+            self.ssl_context is not None,
+            self.size,
+            len(self._idle),
+            self.connections_created,
+        )
@@ -23,14 +23,18 @@
 """
 
 import logging
+import zlib
 from threading import Lock
 
 import gevent
+from gevent import socket
 from gevent.event import Event
 from gevent.pywsgi import WSGIServer
 from pysolbase.SolBase import SolBase
 from urllib import parse
 
+from pysolhttpclient.Http.HttpContentDecoder import HttpContentDecoder
+
 logger = logging.getLogger(__name__)
 lifecyclelogger = logging.getLogger("LifeCycle")
 
@@ -39,13 +43,52 @@ lifecyclelogger = logging.getLogger("LifeCycle")
 class HttpMock(object):
     """
     Http mock
+    Routes (see route_add) :
+    - /unittest : echo of query string, post data (urlencoded) and method
+    - /bytes?n=N : N bytes
+    - /chunks?n=N&size=S[&interval_ms=I] : N chunks of S bytes (chunked transfer encoding), I ms apart
+    Any route accepts latency_ms=L (query string) : L ms server side latency (overrides latency_ms).
     """
 
-    def __init__(self):
+    # Max bytes per request (/bytes, /chunks), above : 400
+    MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, host="localhost", port=7900, latency_ms=None, quiet=False, certfile=None, keyfile=None, reuse_port=False):
         """
         Constructor
+        :param host: str
+        :type host: str
+        :param port: int (0 : any free port, available in self.port after start)
+        :type port: int
+        :param latency_ms: float,callable,None (server side latency per request : fixed, or callable returning ms for a distribution)
+        :type latency_ms: float,callable,None
+        :param quiet: bool (no per request logging)
+        :type quiet: bool
+        :param certfile: str,None (https : server certificate file)
+        :type certfile: str,None
+        :param keyfile: str,None (https : server key file)
+        :type keyfile: str,None
+        :param reuse_port: bool (SO_REUSEPORT : several processes listen on the same port, see HttpMockPrefork)
+        :type reuse_port: bool
         """
 
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.quiet = quiet
+        self.certfile = certfile
+        self.keyfile = keyfile
+        self.reuse_port = reuse_port
+
+        # Routes : path => callable(environ, start_response)
+        self._routes = dict()
+        self.route_add("/unittest", self._on_unit_test)
+        self.route_add("/bytes", self._on_bytes)
+        self.route_add("/chunks", self._on_chunks)
+
+        # Counters
+        self.request_count = 0
+
         # Daemon control
         self._locker = Lock()
         self._is_running = False
@@ -167,7 +210,16 @@ class HttpMock(object):
         try:
             # Alloc
             logger.info("Allocating WSGIServer")
-            self._wsgi_server = WSGIServer(listener=('localhost', 7900), application=self.on_request)
+            listener = self._listener_get()
+            self.port = listener.getsockname()[1]
+            kwargs = dict()
+            if self.certfile:
+                kwargs["certfile"] = self.certfile
+                kwargs["keyfile"] = self.keyfile
+            if self.quiet:
+                # No access log
+                kwargs["log"] = None
+            self._wsgi_server = WSGIServer(listener=listener, application=self.on_request, **kwargs)
 
             logger.info("Starting, %s", self._wsgi_server.address)
             SolBase.sleep(0)
@@ -188,10 +240,145 @@ class HttpMock(object):
             logger.info("Clearing _start_event")
             self._start_event.clear()
 
+    def _listener_get(self):
+        """
+        Get the listening socket.
+        Nagle is off (inherited by accepted sockets) : pywsgi writes headers and body apart on reused connections,
+        which would stall the body on the client delayed ack.
+        :return socket.socket
+        :rtype socket.socket
+        """
+
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.reuse_port:
+                if not hasattr(socket, "SO_REUSEPORT"):
+                    raise Exception("SO_REUSEPORT not supported on this platform")
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            sock.bind((self.host, self.port))
+            sock.listen(1024)
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    # ==========================
+    # ROUTES
+    # ==========================
+
+    def route_add(self, path, handler):
+        """
+        Add (or replace) a route
+        :param path: str (exact path, query string excluded)
+        :type path: str
+        :param handler: callable(environ, start_response), return an iterable of bytes (wsgi)
+        :type handler: callable
+        """
+
+        self._routes[path] = handler
+
+    def route_remove(self, path):
+        """
+        Remove a route
+        :param path: str
+        :type path: str
+        """
+
+        self._routes.pop(path, None)
+
+    def _route_get(self, pi):
+        """
+        Get the route handler, None if not found
+        :param pi: str (PATH_INFO)
+        :type pi: str
+        :return callable,None
+        :rtype callable,None
+        """
+
+        handler = self._routes.get(pi)
+        if handler is None and "://" in pi:
+            # Sometimes PATH_INFO come with full uri (urllib3) (?!)
+            # http://127.0.0.1:7900/unittest
+            handler = self._routes.get("/" + pi.split("://", 1)[1].partition("/")[2])
+        if handler is None and pi.endswith("/unittest"):
+            # Prefixed unittest paths (/xxx/unittest), as before routes
+            handler = self._routes.get("/unittest")
+        return handler
+
+    def _latency_get(self, environ):
+        """
+        Get the latency to apply (query string latency_ms, then self.latency_ms)
+        :param environ: dict
+        :type environ: dict
+        :return float
+        :rtype float
+        """
+
+        ms = self._get_qs_float(environ, "latency_ms", None)
+        if ms is not None:
+            return ms
+        elif callable(self.latency_ms):
+            return self.latency_ms()
+        elif self.latency_ms:
+            return self.latency_ms
+        return 0.0
+
     # ==========================
     # TOOLS
     # ==========================
 
+    # noinspection PyMethodMayBeStatic
+    def _get_qs_float(self, environ, name, default):
+        """
+        Get a query string parameter as float, default if missing or invalid
+        :param environ: dict
+        :type environ: dict
+        :param name: str
+        :type name: str
+        :param default: object
+        :type default: object
+        :return float,object
+        :rtype float,object
+        """
+
+        qs = environ.get("QUERY_STRING")
+        if not qs or name not in qs:
+            return default
+        for k, v in parse.parse_qsl(qs, keep_blank_values=True):
+            if k == name:
+                try:
+                    return float(v)
+                except ValueError:
+                    return default
+        return default
+
+    def _get_qs_int(self, environ, name, default):
+        """
+        Get a query string parameter as int, default if missing, None if not an integer
+        :param environ: dict
+        :type environ: dict
+        :param name: str
+        :type name: str
+        :param default: int
+        :type default: int
+        :return int,None
+        :rtype int,None
+        """
+
+        qs = environ.get("QUERY_STRING")
+        if not qs or name not in qs:
+            return default
+        for k, v in parse.parse_qsl(qs, keep_blank_values=True):
+            if k == name:
+                try:
+                    return int(v)
+                except ValueError:
+                    return None
+        return default
+
     def _get_param_from_qs(self, environ):
         """
         Extract params from query string
@@ -275,12 +462,18 @@ class HttpMock(object):
         """
         wi = self._get_post_data_raw(environ)
         if wi:
-            # Try gzip
-            try:
-                wi = wi.decode("zlib")
-            except Exception as ex:
-                logger.debug("Unable to decode zlib, should be a normal buffer, ex=%s",
-                             SolBase.extostr(ex))
+            decoder = HttpContentDecoder.from_content_encoding(environ.get("HTTP_CONTENT_ENCODING"))
+            if decoder:
+                # Content-Encoding
+                wi = decoder.decode_all(wi)
+            elif self._zip_enabled:
+                # Try zlib
+                try:
+                    wi = zlib.decompress(wi)
+                except Exception as ex:
+                    if not self.quiet:
+                        logger.debug("Unable to decode zlib, should be a normal buffer, ex=%s",
+                                     SolBase.extostr(ex))
 
         return wi
 
@@ -300,23 +493,28 @@ class HttpMock(object):
         """
 
         try:
-            logger.info("Request start now")
+            self.request_count += 1
+            if not self.quiet:
+                logger.info("Request start now")
 
-            # Log
-            for k, v in environ.items():
-                logger.debug("Env: %s=%s", k, v)
+                # Log
+                for k, v in environ.items():
+                    logger.debug("Env: %s=%s", k, v)
 
             # Switch
             pi = environ["PATH_INFO"]
-            logger.debug("pi=%s", pi)
+            handler = self._route_get(pi)
 
-            # Sometimes PATH_INFO come with full uri (urllib3) (?!)
-            # http://127.0.0.1:7900/unittest
-            if pi.endswith("/unittest"):
-                logger.debug("call _on_unit_test")
-                return self._on_unit_test(environ, start_response)
+            # Latency
+            ms = self._latency_get(environ)
+            if ms > 0.0:
+                SolBase.sleep(ms)
+
+            if handler is not None:
+                return handler(environ, start_response)
             else:
-                logger.debug("call _on_invalid")
+                if not self.quiet:
+                    logger.debug("call _on_invalid, pi=%s", pi)
                 return self._on_invalid(start_response)
         except Exception as e:
             logger.warning("Ex=%s", SolBase.extostr(e))
@@ -326,7 +524,6 @@ class HttpMock(object):
             start_response(status, headers)
             return [SolBase.unicode_to_binary(body, "utf-8")]
         finally:
-            logger.debug("exit")
             self._lifecycle_log_status()
 
     # ==============================
@@ -366,22 +563,17 @@ class HttpMock(object):
         """
 
         # Param
-        logger.debug("_get_param_from_qs")
         from_qs = self._get_param_from_qs(environ)
-        logger.debug("_get_param_from_post_data")
         from_post = self._get_param_from_post_data(environ)
-        logger.debug("_get_method")
         from_method = self._get_method(environ)
 
         # Debug
-        logger.debug("reply set")
         status = "200 OK"
         if from_method == "HEAD":
             # We sent empty body in output
             body = ""
             headers = [('Content-Type', 'text/txt')]
             start_response(status, headers)
-            logger.debug("reply send")
         else:
             body = "OK" + "\n"
             body += "from_qs=" + str(from_qs) + " -EOL\n"
@@ -389,5 +581,59 @@ class HttpMock(object):
             body += "from_method=" + from_method + "\n"
             headers = [('Content-Type', 'text/txt')]
             start_response(status, headers)
-            logger.debug("reply send")
+        if not self.quiet:
+            logger.debug("reply send, method=%s", from_method)
         return [SolBase.unicode_to_binary(body, "utf-8")]
+
+    # ==============================
+    # REQUEST : BYTES, CHUNKS
+    # ==============================
+
+    def _on_bytes(self, environ, start_response):
+        """
+        On request callback : n bytes (query string n, default 0)
+        :param environ: environ
+        :type environ: dict
+        :param start_response: start_response
+        :type start_response: instancemethod
+        :return: list
+        :rtype: list
+        """
+
+        n = self._get_qs_int(environ, "n", 0)
+        if n is None or n < 0 or n > HttpMock.MAX_BYTES:
+            return self._on_invalid(start_response)
+        start_response("200 OK", [("Content-Type", "application/octet-stream"), ("Content-Length", str(n))])
+        if self._get_method(environ) == "HEAD":
+            return [b""]
+        return [b"x" * n]
+
+    def _on_chunks(self, environ, start_response):
+        """
+        On request callback : n chunks of size bytes (query string n, size, interval_ms), chunked transfer encoding
+        :param environ: environ
+        :type environ: dict
+        :param start_response: start_response
+        :type start_response: instancemethod
+        :return: generator
+        :rtype: generator
+        """
+
+        n = self._get_qs_int(environ, "n", 1)
+        size = self._get_qs_int(environ, "size", 1024)
+        interval_ms = self._get_qs_float(environ, "interval_ms", 0.0)
+        if n is None or size is None or n < 0 or size < 0 or n * size > HttpMock.MAX_BYTES:
+            return self._on_invalid(start_response)
+
+        start_response("200 OK", [("Content-Type", "application/octet-stream")])
+        if self._get_method(environ) == "HEAD":
+            return [b""]
+
+        def _chunks():
+            chunk = b"x" * size
+            for i in range(n):
+                if i and interval_ms > 0.0:
+                    SolBase.sleep(interval_ms)
+                yield chunk
+
+        return _chunks()
@@ -0,0 +1,306 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import argparse
+import importlib
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+from os.path import dirname, abspath
+from threading import Lock
+
+import gevent
+from pysolbase.SolBase import SolBase
+
+logger = logging.getLogger(__name__)
+
+
+class HttpMockPrefork(object):
+    """
+    Http mock, multi process : N worker processes, each one running an HttpMock listening on the same port (SO_REUSEPORT),
+    the kernel balances incoming connections between them.
+    - start : workers are started, start returns once all of them listen (or fails, all stopped)
+    - stop : workers are asked to stop (then terminated if they do not), their last counters are kept
+    - request_count_get : requests served, aggregated over workers
+    Workers are started as python processes (not forked, gevent and forked interpreters do not mix well),
+    HttpMock parameters must be json serializable (latency_ms as a fixed value).
+    Custom routes are set by a factory ("module:callable", called in each worker with HttpMock parameters, returning an HttpMock).
+    """
+
+    def __init__(self, workers=None, host="localhost", port=7900, factory=None, start_timeout_ms=30000, **mock_kwargs):
+        """
+        Constructor
+        :param workers: int,None (None : cpu count)
+        :type workers: int,None
+        :param host: str
+        :type host: str
+        :param port: int (0 : any free port, available in self.port after start)
+        :type port: int
+        :param factory: str,None ("module:callable", HttpMock factory, None : HttpMock)
+        :type factory: str,None
+        :param start_timeout_ms: int
+        :type start_timeout_ms: int
+        :param mock_kwargs: HttpMock parameters (latency_ms, quiet, certfile, keyfile)
+        :type mock_kwargs: dict
+        """
+
+        self.workers = workers or os.cpu_count() or 1
+        self.host = host
+        self.port = port
+        self.factory = factory
+        self.start_timeout_ms = start_timeout_ms
+        self.mock_kwargs = mock_kwargs
+
+        # Daemon control
+        self._locker = Lock()
+        self._is_running = False
+        self._processes = list()
+
+        # Port reservation (bound, not listening, does not receive connections)
+        self._reserve_socket = None
+
+        # Counters of stopped workers
+        self._stopped_request_count = 0
+
+    # ==============================
+    # START / STOP
+    # ==============================
+
+    def start(self):
+        """
+        Start
+        """
+
+        with self._locker:
+            if self._is_running:
+                logger.warning("Already running, doing nothing")
+                return
+            if not hasattr(socket, "SO_REUSEPORT"):
+                raise Exception("SO_REUSEPORT not supported on this platform")
+
+            # Reserve the port (resolves port 0), workers join it
+            family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+            self._reserve_socket = socket.socket(family, socket.SOCK_STREAM)
+            self._reserve_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._reserve_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            self._reserve_socket.bind((self.host, self.port))
+            self.port = self._reserve_socket.getsockname()[1]
+
+            config = dict(self.mock_kwargs)
+            config["host"] = self.host
+            config["port"] = self.port
+            config["reuse_port"] = True
+            config["factory"] = self.factory
+
+            # Workers : package importable from the child whatever its cwd
+            env = dict(os.environ)
+            root = dirname(dirname(dirname(abspath(__file__))))
+            env["PYTHONPATH"] = root + os.pathsep + env["PYTHONPATH"] if env.get("PYTHONPATH") else root
+            try:
+                for _ in range(self.workers):
+                    self._processes.append(subprocess.Popen(
+                        [sys.executable, "-m", "pysolhttpclient.HttpMock.HttpMockPrefork", "--worker", json.dumps(config)],
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.DEVNULL if self.mock_kwargs.get("quiet") else None,
+                        env=env,
+                    ))
+
+                # Wait for all
+                with gevent.Timeout(self.start_timeout_ms / 1000.0, Exception("Start timeout, start_timeout_ms={0}".format(self.start_timeout_ms))):
+                    for p in self._processes:
+                        line = p.stdout.readline().decode("utf-8").strip()
+                        if line != "READY":
+                            raise Exception("Worker start failed, pid={0}, line={1}".format(p.pid, line))
+            except BaseException:
+                self._stop_internal()
+                raise
+
+            self._is_running = True
+            logger.info("Started, host=%s, port=%s, workers=%s", self.host, self.port, self.workers)
+
+    def stop(self):
+        """
+        Stop
+        """
+
+        with self._locker:
+            self._stop_internal()
+            logger.info("Stopped")
+
+    def _stop_internal(self):
+        """
+        Stop workers (keep their last counters), release the port
+        """
+
+        self._is_running = False
+
+        # Ask
+        for p in self._processes:
+            try:
+                p.stdin.write(b"STOP\n")
+                p.stdin.flush()
+            except (IOError, OSError):
+                pass
+
+        # Wait (last counters), terminate if needed
+        for p in self._processes:
+            try:
+                with gevent.Timeout(5.0):
+                    self._stopped_request_count += self._count_read(p)
+            except (gevent.Timeout, Exception) as e:
+                logger.warning("Worker stop failed, pid=%s, ex=%s", p.pid, SolBase.extostr(e))
+            try:
+                p.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                p.kill()
+                p.wait()
+            for f in (p.stdin, p.stdout):
+                try:
+                    f.close()
+                except (IOError, OSError):
+                    pass
+        self._processes = list()
+
+        if self._reserve_socket:
+            self._reserve_socket.close()
+            self._reserve_socket = None
+
+    # ==============================
+    # COUNTERS
+    # ==============================
+
+    @classmethod
+    def _count_read(cls, p):
+        """
+        Read a worker counter line
+        :param p: subprocess.Popen
+        :type p: subprocess.Popen
+        :return int
+        :rtype int
+        """
+
+        line = p.stdout.readline().decode("utf-8").strip()
+        if not line.startswith("COUNT "):
+            raise Exception("Invalid worker reply, pid={0}, line={1}".format(p.pid, line))
+        return int(line[len("COUNT "):])
+
+    def request_counts_get(self):
+        """
+        Get requests served, per running worker
+        :return list of int
+        :rtype list
+        """
+
+        with self._locker:
+            for p in self._processes:
+                p.stdin.write(b"COUNT\n")
+                p.stdin.flush()
+            return [self._count_read(p) for p in self._processes]
+
+    def request_count_get(self):
+        """
+        Get requests served, aggregated over workers (stopped ones included)
+        :return int
+        :rtype int
+        """
+
+        return self._stopped_request_count + sum(self.request_counts_get())
+
+    @property
+    def pids(self):
+        """
+        Worker pids
+        :return list of int
+        :rtype list
+        """
+
+        return [p.pid for p in self._processes]
+
+    # ==============================
+    # WORKER
+    # ==============================
+
+    @classmethod
+    def worker_run(cls, config):
+        """
+        Worker : run an HttpMock, serve commands (COUNT, STOP) from stdin
+        :param config: dict (HttpMock parameters, plus factory)
+        :type config: dict
+        """
+
+        # Control channel on a private stdout, anything else printed goes to stderr
+        out = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+        SolBase.voodoo_init(init_logging=False)
+
+        # noinspection PyPep8
+        from gevent.fileobject import FileObject
+        from pysolhttpclient.HttpMock.HttpMock import HttpMock
+
+        factory = config.pop("factory", None)
+        if factory:
+            module_name, _, func_name = factory.partition(":")
+            mock = getattr(importlib.import_module(module_name), func_name)(**config)
+        else:
+            mock = HttpMock(**config)
+        mock.start()
+
+        out.write("READY\n")
+        out.flush()
+
+        # Commands (cooperative read), stop on STOP or parent gone
+        f = FileObject(sys.stdin.fileno(), "rb", close=False)
+        while True:
+            line = f.readline().strip()
+            if line == b"COUNT":
+                out.write("COUNT {0}\n".format(mock.request_count))
+                out.flush()
+            elif line == b"STOP" or not line:
+                mock.stop()
+                out.write("COUNT {0}\n".format(mock.request_count))
+                out.flush()
+                return
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hmprefork:host={0}*port={1}*workers={2}*running={3}".format(
+            self.host,
+            self.port,
+            self.workers,
+            self._is_running,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HttpMockPrefork worker")
+    parser.add_argument("--worker", required=True, help="json config")
+    HttpMockPrefork.worker_run(json.loads(parser.parse_args().worker))
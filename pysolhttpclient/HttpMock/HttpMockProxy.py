@@ -0,0 +1,198 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+
+import logging
+import socket
+from threading import Lock
+
+import gevent
+from gevent.server import StreamServer
+from pysolbase.SolBase import SolBase
+
+logger = logging.getLogger(__name__)
+
+
+class HttpMockProxy(object):
+    """
+    Http mock proxy : CONNECT tunnelling (https over http proxy), stand-in for squid in unittests.
+    Other methods are answered with 405.
+    """
+
+    # Max request head size
+    HEAD_MAX_SIZE = 64 * 1024
+
+    def __init__(self, host="127.0.0.1", port=0, connect_timeout_ms=10000):
+        """
+        Constructor
+        :param host: str
+        :type host: str
+        :param port: int (0 : any free port, available in self.port after start)
+        :type port: int
+        :param connect_timeout_ms: int (upstream connect timeout)
+        :type connect_timeout_ms: int
+        """
+
+        self.host = host
+        self.port = port
+        self.connect_timeout_ms = connect_timeout_ms
+
+        # Daemon control
+        self._locker = Lock()
+        self._is_running = False
+        self._server = None
+
+        # Counters
+        self.connect_count = 0
+        self.connect_failed_count = 0
+        self.bytes_up = 0
+        self.bytes_down = 0
+
+    # ==============================
+    # START / STOP
+    # ==============================
+
+    def start(self):
+        """
+        Start
+        """
+
+        with self._locker:
+            if self._is_running:
+                logger.warning("Already running, doing nothing")
+                return
+
+            self._server = StreamServer((self.host, self.port), self._on_connection)
+            self._server.start()
+            self.port = self._server.server_port
+            self._is_running = True
+            logger.info("Started, host=%s, port=%s", self.host, self.port)
+
+    def stop(self):
+        """
+        Stop
+        """
+
+        self._is_running = False
+
+        with self._locker:
+            try:
+                if self._server:
+                    self._server.stop(timeout=1)
+                    self._server = None
+                logger.info("Stopped")
+            except Exception as e:
+                logger.error("Exception, e=%s", SolBase.extostr(e))
+
+    # ==============================
+    # HANDLER
+    # ==============================
+
+    def _on_connection(self, sock, address):
+        """
+        Handle a client connection
+        :param sock: gevent.socket.socket
+        :type sock: gevent.socket.socket
+        :param address: tuple
+        :type address: tuple
+        """
+
+        upstream = None
+        try:
+            # Head
+            buf = b""
+            while b"\r\n\r\n" not in buf:
+                block = sock.recv(4096)
+                if not block:
+                    return
+                buf += block
+                if len(buf) > HttpMockProxy.HEAD_MAX_SIZE:
+                    sock.sendall(b"HTTP/1.1 431 Request Header Fields Too Large\r\nContent-Length: 0\r\n\r\n")
+                    return
+            head, rest = buf.split(b"\r\n\r\n", 1)
+            ar = head.split(b"\r\n", 1)[0].decode("latin-1").split()
+
+            # Only CONNECT
+            if len(ar) < 3 or ar[0].upper() != "CONNECT":
+                logger.info("Method not allowed, from=%s, line=%s", address, ar)
+                sock.sendall(b"HTTP/1.1 405 Method Not Allowed\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                return
+
+            # Target (host:port, [ipv6]:port)
+            target_host, _, target_port = ar[1].rpartition(":")
+            target_host = target_host.strip("[]")
+
+            # Upstream
+            try:
+                upstream = socket.create_connection((target_host, int(target_port)), timeout=self.connect_timeout_ms / 1000.0)
+                upstream.settimeout(None)
+            except Exception as e:
+                logger.info("Upstream connect failed, target=%s, ex=%s", ar[1], SolBase.extostr(e))
+                self.connect_failed_count += 1
+                sock.sendall(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                return
+
+            self.connect_count += 1
+            sock.sendall(b"HTTP/1.1 200 Connection established\r\n\r\n")
+            if rest:
+                upstream.sendall(rest)
+                self.bytes_up += len(rest)
+
+            # Tunnel, both ways
+            g = gevent.spawn(self._pipe, upstream, sock, False)
+            self._pipe(sock, upstream, True)
+            g.join()
+        except Exception as e:
+            logger.debug("Exception, from=%s, ex=%s", address, SolBase.extostr(e))
+        finally:
+            if upstream:
+                upstream.close()
+            sock.close()
+
+    def _pipe(self, src, dst, is_up):
+        """
+        Forward src to dst until eof, then shutdown dst write side
+        :param src: gevent.socket.socket
+        :type src: gevent.socket.socket
+        :param dst: gevent.socket.socket
+        :type dst: gevent.socket.socket
+        :param is_up: bool (client to upstream)
+        :type is_up: bool
+        """
+
+        try:
+            while True:
+                buf = src.recv(64 * 1024)
+                if not buf:
+                    break
+                dst.sendall(buf)
+                if is_up:
+                    self.bytes_up += len(buf)
+                else:
+                    self.bytes_down += len(buf)
+        except Exception as e:
+            logger.debug("Pipe closed, ex=%s", SolBase.extostr(e))
+        finally:
+            try:
+                dst.shutdown(socket.SHUT_WR)
+            except Exception as e:
+                logger.debug("Shutdown failed, ex=%s", SolBase.extostr(e))
@@ -0,0 +1,319 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import itertools
+import logging
+import os
+import platform
+import resource
+import time
+
+import gevent
+from pysolbase.SolBase import SolBase
+
+from pysolhttpclient.Http.HttpClient import HttpClient
+from pysolhttpclient.Http.HttpHistogram import HttpHistogram
+from pysolhttpclient.Http.HttpRequest import HttpRequest
+from pysolhttpclient_bench.HttpBenchServer import HttpBenchServer
+
+logger = logging.getLogger(__name__)
+
+
+class HttpBench(object):
+    """
+    Benchmark : HttpClient.go_http against HttpMock (HttpBenchServer, worker processes), per scenario :
+    - implementation (gevent, urllib3), scheme (http, https), keep-alive (on, off)
+    - concurrency (greenlets), payload size (bytes posted, echoed back by HttpMock, 0 : GET)
+    Reports requests/s, latency percentiles, client cpu per request and rss, as a json serializable dict.
+    """
+
+    IMPLS = {"gevent": HttpClient.HTTP_IMPL_GEVENT, "urllib3": HttpClient.HTTP_IMPL_URLLIB3}
+
+    def __init__(self, impls=("gevent", "urllib3"), schemes=("http", "https"), keep_alives=(True, False),
+                 concurrencies=(1, 16, 64), sizes=(0, 1024, 65536), duration_ms=2000, warmup_ms=200,
+                 server_workers=1):
+        """
+        Const
+        :param impls: iterable of str (gevent, urllib3)
+        :type impls: tuple,list
+        :param schemes: iterable of str (http, https)
+        :type schemes: tuple,list
+        :param keep_alives: iterable of bool
+        :type keep_alives: tuple,list
+        :param concurrencies: iterable of int
+        :type concurrencies: tuple,list
+        :param sizes: iterable of int (payload bytes)
+        :type sizes: tuple,list
+        :param duration_ms: int (per scenario, measured)
+        :type duration_ms: int
+        :param warmup_ms: int (per scenario, not measured)
+        :type warmup_ms: int
+        :param server_workers: int (HttpMock worker processes)
+        :type server_workers: int
+        """
+
+        for impl in impls:
+            if impl not in self.IMPLS:
+                raise Exception("Invalid impl={0}".format(impl))
+        for scheme in schemes:
+            if scheme not in ("http", "https"):
+                raise Exception("Invalid scheme={0}".format(scheme))
+
+        self.impls = list(impls)
+        self.schemes = list(schemes)
+        self.keep_alives = list(keep_alives)
+        self.concurrencies = list(concurrencies)
+        self.sizes = list(sizes)
+        self.duration_ms = duration_ms
+        self.warmup_ms = warmup_ms
+        self.server_workers = server_workers
+
+    @classmethod
+    def _cpu_ms_get(cls):
+        """
+        Get process cpu (user + system)
+        :return float
+        :rtype float
+        """
+
+        ru = resource.getrusage(resource.RUSAGE_SELF)
+        return (ru.ru_utime + ru.ru_stime) * 1000.0
+
+    @classmethod
+    def _rss_kb_get(cls):
+        """
+        Get current rss (linux), None if not available
+        :return int,None
+        :rtype int,None
+        """
+
+        try:
+            with open("/proc/self/statm", "r") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+        except (IOError, OSError, ValueError, IndexError):
+            return None
+
+    @classmethod
+    def meta_get(cls):
+        """
+        Get run metadata
+        :return dict
+        :rtype dict
+        """
+
+        try:
+            from importlib.metadata import version
+            v = version("pysolhttpclient")
+        except Exception:
+            v = None
+        return {
+            "version": v,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+
+    @classmethod
+    def _request_get(cls, uri, impl, keep_alive, payload):
+        """
+        Get a request
+        :param uri: str
+        :type uri: str
+        :param impl: int
+        :type impl: int
+        :param keep_alive: bool
+        :type keep_alive: bool
+        :param payload: bytes,None
+        :type payload: bytes,None
+        :return HttpRequest
+        :rtype HttpRequest
+        """
+
+        hreq = HttpRequest()
+        hreq.uri = uri
+        hreq.force_http_implementation = impl
+        hreq.post_data = payload
+        hreq.keep_alive = keep_alive
+        return hreq
+
+    def scenario_run(self, server, impl_name, keep_alive, concurrency, size):
+        """
+        Run a scenario
+        :param server: HttpBenchServer (started)
+        :type server: HttpBenchServer
+        :param impl_name: str
+        :type impl_name: str
+        :param keep_alive: bool
+        :type keep_alive: bool
+        :param concurrency: int
+        :type concurrency: int
+        :param size: int
+        :type size: int
+        :return dict
+        :rtype dict
+        """
+
+        scheme = "https" if server.https else "http"
+        impl = self.IMPLS[impl_name]
+        uri = server.uri_get()
+        payload = b"p=" + b"x" * (size - 2) if size > 2 else None
+
+        # Fresh client : pools are not shared between scenarios
+        hc = HttpClient()
+        h = HttpHistogram()
+        state = {"measure": False, "stop": False, "requests": 0, "errors": 0}
+
+        def _loop():
+            while not state["stop"]:
+                ms = SolBase.mscurrent()
+                hresp = hc.go_http(self._request_get(uri, impl, keep_alive, payload))
+                if not state["measure"]:
+                    continue
+                state["requests"] += 1
+                if hresp.exception or hresp.status_code != 200:
+                    state["errors"] += 1
+                else:
+                    h.record(SolBase.msdiff(ms))
+
+        greenlets = [gevent.spawn(_loop) for _ in range(concurrency)]
+        try:
+            # Warmup, then measure
+            SolBase.sleep(self.warmup_ms)
+            state["measure"] = True
+            cpu_ms = self._cpu_ms_get()
+            ms = SolBase.mscurrent()
+            SolBase.sleep(self.duration_ms)
+            state["measure"] = False
+            elapsed_ms = SolBase.msdiff(ms)
+            cpu_ms = self._cpu_ms_get() - cpu_ms
+        finally:
+            state["stop"] = True
+            gevent.joinall(greenlets, timeout=30)
+            gevent.killall(greenlets)
+
+        requests = state["requests"]
+        d = {
+            "name": "{0}-{1}-{2}-c{3}-s{4}".format(impl_name, scheme, "ka" if keep_alive else "noka", concurrency, size),
+            "impl": impl_name,
+            "scheme": scheme,
+            "keep_alive": keep_alive,
+            "concurrency": concurrency,
+            "size": size,
+            "requests": requests,
+            "errors": state["errors"],
+            "elapsed_ms": elapsed_ms,
+            "rps": requests * 1000.0 / elapsed_ms if elapsed_ms else 0.0,
+            "latency_ms": {
+                "mean": h.sum_ms / h.count if h.count else None,
+                "p50": h.percentile(50.0),
+                "p90": h.percentile(90.0),
+                "p99": h.percentile(99.0),
+                "p999": h.percentile(99.9),
+                "max": h.max_ms,
+            },
+            "cpu_us_per_request": cpu_ms * 1000.0 / requests if requests else None,
+            "rss_kb": self._rss_kb_get(),
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+        logger.info("Scenario done, name=%s, rps=%.1f, p99=%s, errors=%s", d["name"], d["rps"], d["latency_ms"]["p99"], d["errors"])
+        return d
+
+    def run(self):
+        """
+        Run all scenarios
+        :return dict, "meta" => dict, "results" => list of dict
+        :rtype dict
+        """
+
+        results = list()
+        for scheme in self.schemes:
+            server = HttpBenchServer(https=scheme == "https", workers=self.server_workers)
+            server.start()
+            try:
+                for impl_name, keep_alive, concurrency, size in itertools.product(self.impls, self.keep_alives, self.concurrencies, self.sizes):
+                    results.append(self.scenario_run(server, impl_name, keep_alive, concurrency, size))
+            finally:
+                server.stop()
+
+        meta = self.meta_get()
+        meta["duration_ms"] = self.duration_ms
+        meta["warmup_ms"] = self.warmup_ms
+        meta["server_workers"] = self.server_workers
+        return {"meta": meta, "results": results}
+
+    @classmethod
+    def compare(cls, baseline, current, tolerance=0.1):
+        """
+        Compare two runs (matched by scenario name) : regression if rps drops or p99 / cpu per request grows above tolerance
+        :param baseline: dict (run)
+        :type baseline: dict
+        :param current: dict (run)
+        :type current: dict
+        :param tolerance: float (ratio)
+        :type tolerance: float
+        :return list of dict, per scenario : name, rps_ratio, p99_ratio, cpu_ratio, regression
+        :rtype list
+        """
+
+        def _ratio(cur, base):
+            if cur is None or not base:
+                return None
+            return cur / base
+
+        by_name = {d["name"]: d for d in baseline["results"]}
+        ar = list()
+        for d in current["results"]:
+            base = by_name.get(d["name"])
+            if base is None:
+                continue
+            rps_ratio = _ratio(d["rps"], base["rps"])
+            p99_ratio = _ratio(d["latency_ms"]["p99"], base["latency_ms"]["p99"])
+            cpu_ratio = _ratio(d["cpu_us_per_request"], base["cpu_us_per_request"])
+            regression = (rps_ratio is not None and rps_ratio < 1.0 - tolerance) \
+                or (p99_ratio is not None and p99_ratio > 1.0 + tolerance) \
+                or (cpu_ratio is not None and cpu_ratio > 1.0 + tolerance)
+            ar.append({
+                "name": d["name"],
+                "rps_ratio": rps_ratio,
+                "p99_ratio": p99_ratio,
+                "cpu_ratio": cpu_ratio,
+                "regression": regression,
+            })
+        return ar
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hbench:impls={0}*schemes={1}*ka={2}*conc={3}*sizes={4}*ms={5}".format(
+            self.impls,
+            self.schemes,
+            self.keep_alives,
+            self.concurrencies,
+            self.sizes,
+            self.duration_ms,
+        )
@@ -0,0 +1,104 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import logging
+from os.path import dirname, abspath
+
+from pysolbase.SolBase import SolBase
+
+from pysolhttpclient.HttpMock.HttpMockPrefork import HttpMockPrefork
+
+logger = logging.getLogger(__name__)
+
+
+class HttpBenchServer(object):
+    """
+    Benchmark target : HttpMock served by worker processes (HttpMockPrefork, client cpu is measured apart from the server).
+    Workers serve HttpMock (http or https) on an ephemeral port, quiet (no request logging).
+    """
+
+    # Server certificate (https), from the repository
+    MTLS_DIR = dirname(dirname(abspath(__file__))) + SolBase.get_pathseparator() + "z_mtls" + SolBase.get_pathseparator()
+
+    def __init__(self, https=False, workers=1):
+        """
+        Const
+        :param https: bool
+        :type https: bool
+        :param workers: int
+        :type workers: int
+        """
+
+        self.https = https
+        self.workers = workers
+        self.port = None
+        self._prefork = None
+
+    def start(self):
+        """
+        Start workers, wait for them
+        """
+
+        kwargs = dict()
+        if self.https:
+            kwargs["certfile"] = self.MTLS_DIR + "server.crt"
+            kwargs["keyfile"] = self.MTLS_DIR + "server.key"
+
+        self._prefork = HttpMockPrefork(workers=self.workers, host="127.0.0.1", port=0, quiet=True, **kwargs)
+        self._prefork.start()
+        self.port = self._prefork.port
+        logger.info("Bench server started, https=%s, port=%s, pids=%s", self.https, self.port, self._prefork.pids)
+
+    def stop(self):
+        """
+        Stop workers
+        """
+
+        if self._prefork is None:
+            return
+        self._prefork.stop()
+        self._prefork = None
+        self.port = None
+
+    def uri_get(self, path="/unittest"):
+        """
+        Get server uri
+        :param path: str
+        :type path: str
+        :return str
+        :rtype str
+        """
+
+        return "{0}://127.0.0.1:{1}{2}".format("https" if self.https else "http", self.port, path)
+
+    def __str__(self):
+        """
+        To string override
+        :return: A string
+        :rtype str
+        """
+
+        return "hbserver:https={0}*port={1}*workers={2}".format(
+            self.https,
+            self.port,
+            self.workers,
+        )
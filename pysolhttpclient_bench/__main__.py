@@ -0,0 +1,105 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+# WE MUST MONKEY PATCH ASAP HERE FOR PY3 (HttpClient does it)
+# noinspection PyPep8
+from pysolhttpclient_bench.HttpBench import HttpBench
+
+# noinspection PyPep8
+import argparse
+import json
+import logging
+import sys
+
+
+def _csv(s, cast=str):
+    """
+    Parse a comma separated list
+    :param s: str
+    :type s: str
+    :param cast: callable
+    :type cast: callable
+    :return list
+    :rtype list
+    """
+
+    return [cast(x.strip()) for x in s.split(",") if x.strip()]
+
+
+def main(argv=None):
+    """
+    Run the benchmark, write results as json, optionally compare with a previous run
+    :param argv: list,None
+    :type argv: list,None
+    :return int (exit code, 1 if a regression is detected)
+    :rtype int
+    """
+
+    parser = argparse.ArgumentParser(prog="python -m pysolhttpclient_bench", description="pysolhttpclient benchmark against HttpMock")
+    parser.add_argument("--impls", default="gevent,urllib3", help="implementations (gevent,urllib3)")
+    parser.add_argument("--schemes", default="http,https", help="schemes (http,https)")
+    parser.add_argument("--keep-alive", default="on,off", help="keep-alive (on,off)")
+    parser.add_argument("--concurrency", default="1,16,64", help="concurrency levels")
+    parser.add_argument("--sizes", default="0,1024,65536", help="payload sizes (bytes, 0 : GET)")
+    parser.add_argument("--duration-ms", type=int, default=2000, help="measured duration per scenario")
+    parser.add_argument("--warmup-ms", type=int, default=200, help="warmup duration per scenario")
+    parser.add_argument("--server-workers", type=int, default=1, help="HttpMock worker processes")
+    parser.add_argument("--out", default=None, help="json output file (stdout if not set)")
+    parser.add_argument("--compare", default=None, help="json file of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="regression tolerance (ratio)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", stream=sys.stderr)
+    logging.getLogger("pysolhttpclient").setLevel(logging.WARNING)
+
+    bench = HttpBench(
+        impls=_csv(args.impls),
+        schemes=_csv(args.schemes),
+        keep_alives=[x == "on" for x in _csv(args.keep_alive)],
+        concurrencies=_csv(args.concurrency, int),
+        sizes=_csv(args.sizes, int),
+        duration_ms=args.duration_ms,
+        warmup_ms=args.warmup_ms,
+        server_workers=args.server_workers,
+    )
+    run = bench.run()
+
+    buf = json.dumps(run, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(buf)
+    else:
+        sys.stdout.write(buf + "\n")
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare, "r") as f:
+        baseline = json.load(f)
+    ar = HttpBench.compare(baseline, run, args.tolerance)
+    for d in ar:
+        logging.info("%s %s, rps=%s, p99=%s, cpu=%s", "REGRESSION" if d["regression"] else "ok", d["name"], d["rps_ratio"], d["p99_ratio"], d["cpu_ratio"])
+    return 1 if any(d["regression"] for d in ar) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
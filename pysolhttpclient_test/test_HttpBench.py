@@ -0,0 +1,68 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import copy
+import json
+import logging
+import unittest
+
+from pysolhttpclient_bench.HttpBench import HttpBench
+
+logger = logging.getLogger(__name__)
+
+
+class TestHttpBench(unittest.TestCase):
+    """
+    Test description
+    """
+
+    def test_bench_smoke(self):
+        """
+        Test
+        """
+
+        bench = HttpBench(concurrencies=(4,), sizes=(0, 1024), duration_ms=100, warmup_ms=20)
+        run = json.loads(json.dumps(bench.run()))
+        logger.info("run=%s", run)
+
+        self.assertEqual(run["meta"]["duration_ms"], 100)
+        self.assertEqual(len(run["results"]), 2 * 2 * 2 * 2)
+        names = set()
+        for d in run["results"]:
+            names.add(d["name"])
+            self.assertGreater(d["requests"], 0)
+            self.assertEqual(d["errors"], 0, d["name"])
+            self.assertGreater(d["rps"], 0.0)
+            self.assertLessEqual(d["latency_ms"]["p50"], d["latency_ms"]["p99"])
+            self.assertGreater(d["cpu_us_per_request"], 0.0)
+            self.assertGreater(d["max_rss_kb"], 0)
+        self.assertIn("gevent-https-noka-c4-s1024", names)
+        self.assertIn("urllib3-http-ka-c4-s0", names)
+
+        # Compare : same run, no regression, then degraded
+        self.assertFalse(any(d["regression"] for d in HttpBench.compare(run, run)))
+        slow = copy.deepcopy(run)
+        slow["results"][0]["rps"] /= 2.0
+        ar = HttpBench.compare(run, slow)
+        self.assertTrue(ar[0]["regression"])
+        self.assertEqual(ar[0]["rps_ratio"], 0.5)
+        self.assertFalse(any(d["regression"] for d in ar[1:]))
@@ -0,0 +1,220 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import logging
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+from os.path import dirname, abspath
+
+import gevent
+from pysolbase.SolBase import SolBase
+
+from pysolhttpclient.Http.HttpCacheDisk import HttpCacheDisk
+from pysolhttpclient.Http.HttpRequest import HttpRequest
+from pysolhttpclient.Http.HttpResponse import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+
+# noinspection PyProtectedMember
+class TestHttpCacheDisk(unittest.TestCase):
+    """
+    Test description
+    """
+
+    # noinspection PyPep8Naming
+    def setUp(self):
+        """
+        Setup (called before each test)
+        """
+
+        self.tmp_dir = tempfile.mkdtemp(prefix="test_cache_")
+        self.path = self.tmp_dir + "/cache.sqlite"
+
+    # noinspection PyPep8Naming
+    def tearDown(self):
+        """
+        Setup (called after each test)
+        """
+
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    @classmethod
+    def req_resp_get(cls, uri, buf, headers=None):
+        """
+        Get a request and a cacheable response
+        :return tuple HttpRequest, HttpResponse
+        :rtype tuple
+        """
+
+        hreq = HttpRequest()
+        hreq.uri = uri
+        hreq.headers = headers or dict()
+        hresp = HttpResponse()
+        hresp.http_request = hreq
+        hresp.status_code = 200
+        hresp.headers["Cache-Control"] = "max-age=60"
+        hresp.headers["Vary"] = "X-Lang"
+        hresp.headers["Multi"] = ["a", "b"]
+        hresp.buffer = buf
+        hresp.content_length = len(buf)
+        return hreq, hresp
+
+    def test_store_lookup_restart(self):
+        """
+        Test
+        """
+
+        c = HttpCacheDisk(self.path)
+        hreq, hresp = self.req_resp_get("http://127.0.0.1/a", b"a" * 100, {"X-Lang": "fr"})
+        self.assertTrue(c.store(hreq, hresp))
+        self.assertEqual(len(c), 1)
+
+        # Hit
+        entry, fresh = c.lookup(hreq)
+        self.assertTrue(fresh)
+        self.assertEqual(entry["buffer"], b"a" * 100)
+        self.assertEqual(entry["vary_names"], ("x-lang",))
+        r = HttpResponse()
+        c.response_fill(entry, r, entry["response_ms"])
+        self.assertTrue(r.from_cache)
+        self.assertEqual(r.headers["multi"], ["a", "b"])
+        self.assertEqual(r.buffer, b"a" * 100)
+
+        # Vary miss
+        hreq_en, _ = self.req_resp_get("http://127.0.0.1/a", b"", {"X-Lang": "en"})
+        self.assertIsNone(c.lookup(hreq_en)[0])
+        c.close()
+
+        # Restart : warm
+        c = HttpCacheDisk(self.path)
+        entry, fresh = c.lookup(hreq)
+        self.assertTrue(fresh)
+        self.assertEqual(entry["buffer"], b"a" * 100)
+        self.assertEqual(c.hit_count, 1)
+
+        # Invalidate
+        c.invalidate("http://127.0.0.1/a")
+        self.assertEqual(c.invalidated_count, 1)
+        self.assertEqual(len(c), 0)
+        self.assertEqual(c.bytes, 0)
+        self.assertIsNone(c.lookup(hreq)[0])
+        c.close()
+
+    def test_lru(self):
+        """
+        Test
+        """
+
+        c = HttpCacheDisk(self.path, max_bytes=5000)
+        for i in range(3):
+            hreq, hresp = self.req_resp_get("http://127.0.0.1/%s" % i, b"z" * 2000)
+            c.store(hreq, hresp)
+        self.assertEqual(c.evicted_count, 1)
+        self.assertEqual(len(c), 2)
+        self.assertLessEqual(c.bytes, 5000)
+        self.assertIsNone(c.lookup(self.req_resp_get("http://127.0.0.1/0", b"")[0])[0])
+        self.assertIsNotNone(c.lookup(self.req_resp_get("http://127.0.0.1/2", b"")[0])[0])
+
+        # Several evicted at once
+        c.store(*self.req_resp_get("http://127.0.0.1/big", b"z" * 4000))
+        self.assertEqual(c.evicted_count, 3)
+        self.assertEqual(len(c), 1)
+        self.assertLessEqual(c.bytes, 5000)
+
+        # Clear
+        c.clear()
+        self.assertEqual(len(c), 0)
+        self.assertEqual(c.bytes, 0)
+        logger.info("c=%s", c)
+        c.close()
+
+    def test_locked(self):
+        """
+        Test
+        """
+
+        c = HttpCacheDisk(self.path, busy_timeout_ms=300)
+        hreq, hresp = self.req_resp_get("http://127.0.0.1/a", b"a" * 100)
+        c.store(hreq, hresp)
+
+        # Another connection holds the write lock
+        other = sqlite3.connect(self.path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+
+        # Greenlets keep running while sqlite waits
+        d = {"ticks": 0}
+
+        def _tick():
+            while True:
+                d["ticks"] += 1
+                SolBase.sleep(10)
+
+        g = gevent.spawn(_tick)
+        try:
+            # Store skipped, reads still served (wal)
+            c.store(*self.req_resp_get("http://127.0.0.1/b", b"b" * 100))
+            self.assertGreater(d["ticks"], 10)
+            self.assertIsNone(c.lookup(self.req_resp_get("http://127.0.0.1/b", b"")[0])[0])
+            self.assertIsNotNone(c.lookup(hreq)[0])
+
+            # Remove, clear skipped, last known count
+            c.invalidate("http://127.0.0.1/a")
+            self.assertEqual(c.invalidated_count, 0)
+            c.clear()
+            self.assertEqual(len(c), 1)
+        finally:
+            g.kill()
+            other.execute("ROLLBACK")
+            other.close()
+
+        # Lock released
+        c.store(*self.req_resp_get("http://127.0.0.1/b", b"b" * 100))
+        self.assertIsNotNone(c.lookup(self.req_resp_get("http://127.0.0.1/b", b"")[0])[0])
+        c.close()
+
+    def test_multi_process(self):
+        """
+        Test
+        """
+
+        c = HttpCacheDisk(self.path)
+
+        # Another process stores (subprocess : not affected by gevent monkey patching)
+        code = "\n".join([
+            "from pysolhttpclient.Http.HttpCacheDisk import HttpCacheDisk",
+            "from pysolhttpclient_test.test_HttpCacheDisk import TestHttpCacheDisk",
+            "c = HttpCacheDisk(%r)" % self.path,
+            "c.store(*TestHttpCacheDisk.req_resp_get('http://127.0.0.1/child', b'from_child'))",
+            "c.close()",
+        ])
+        subprocess.check_call([sys.executable, "-c", code], cwd=dirname(dirname(abspath(__file__))), timeout=30)
+
+        # Shared hit
+        entry, fresh = c.lookup(self.req_resp_get("http://127.0.0.1/child", b"")[0])
+        self.assertTrue(fresh)
+        self.assertEqual(entry["buffer"], b"from_child")
+        c.close()
@@ -0,0 +1,119 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import gzip
+import logging
+import unittest
+import zlib
+from io import BytesIO
+
+from pysolhttpclient.Http.HttpContentDecoder import HttpContentDecoder
+
+# Optional : brotli (br)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+# noinspection PyProtectedMember
+class TestHttpContentDecoder(unittest.TestCase):
+    """
+    Test description
+    """
+
+    @classmethod
+    def _read_all(cls, decoder, wire, length):
+        """
+        Read a wire body through a wrapped read function, by length
+        :return tuple bytes, max read length
+        :rtype tuple
+        """
+
+        f = BytesIO(wire)
+        read_func = decoder.read_func_wrap(lambda n: f.read(n) if n is not None else f.read())
+        ar = list()
+        max_len = 0
+        while True:
+            buf = read_func(length)
+            if not buf:
+                break
+            max_len = max(max_len, len(buf))
+            ar.append(buf)
+        return b"".join(ar), max_len
+
+    def test_decode(self):
+        """
+        Test
+        """
+
+        data = b'{"key": "value", "list": [1, 2, 3]}' * 5000
+        encoders = {
+            "gzip": gzip.compress,
+            "deflate": zlib.compress,
+        }
+        if brotli:
+            encoders["br"] = brotli.compress
+
+        for encoding, encoder in encoders.items():
+            wire = encoder(data)
+            self.assertEqual(HttpContentDecoder.from_content_encoding(encoding).decode_all(wire), data)
+            for length in [1, 100, 4096, 1000000]:
+                buf, max_len = self._read_all(HttpContentDecoder.from_content_encoding(encoding), wire, length)
+                self.assertEqual(buf, data)
+                self.assertLessEqual(max_len, length)
+
+        # Raw deflate, concatenated gzip, chained encodings
+        c = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        self.assertEqual(HttpContentDecoder.from_content_encoding("deflate").decode_all(c.compress(data) + c.flush()), data)
+        self.assertEqual(self._read_all(HttpContentDecoder.from_content_encoding("gzip"), gzip.compress(data) + gzip.compress(data), 1000)[0], data + data)
+        self.assertEqual(self._read_all(HttpContentDecoder.from_content_encoding("deflate, gzip"), gzip.compress(zlib.compress(data)), 1000)[0], data)
+
+    def test_bomb(self):
+        """
+        Test
+        """
+
+        # 64 MB of zeros, ~64 KB on the wire
+        size = 64 * 1024 * 1024
+        encoders = {"gzip": gzip.compress}
+        if brotli:
+            encoders["br"] = brotli.compress
+        for encoding, encoder in encoders.items():
+            wire = encoder(b"\0" * size)
+
+            # Stream : decoded up to the length read
+            d = HttpContentDecoder.from_content_encoding(encoding)
+            f = BytesIO(wire)
+            read_func = d.read_func_wrap(f.read)
+            self.assertEqual(read_func(4096), b"\0" * 4096)
+            self.assertEqual(d.decompressed_bytes, 4096)
+            # Kept output bounded (brotli output limit is not exact)
+            self.assertLessEqual(len(d._decoders[0]["out"]), HttpContentDecoder.CHUNK_SIZE)
+
+            # Buffered : bounded
+            d = HttpContentDecoder.from_content_encoding(encoding, max_decoded_bytes=1024 * 1024)
+            with self.assertRaises(Exception):
+                d.decode_all(wire)
+            self.assertLessEqual(d.decompressed_bytes, 1024 * 1024 + HttpContentDecoder.CHUNK_SIZE)
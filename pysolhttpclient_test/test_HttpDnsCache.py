@@ -0,0 +1,139 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import logging
+import socket
+import unittest
+
+from pysolbase.SolBase import SolBase
+
+from pysolhttpclient.Http.HttpDnsCache import HttpDnsCache
+
+logger = logging.getLogger(__name__)
+
+
+# noinspection PyProtectedMember
+class TestHttpDnsCache(unittest.TestCase):
+    """
+    Test description
+    """
+
+    # noinspection PyPep8Naming
+    def setUp(self):
+        """
+        Setup (called before each test)
+        """
+
+        # Stub resolver : host => list of ips, counts calls
+        self.records = {
+            "one.local": ["10.0.0.1"],
+            "three.local": ["10.0.0.1", "10.0.0.2", "10.0.0.3"],
+        }
+        self.calls = list()
+
+    def _resolver(self, host, port, family, type_, proto):
+        """
+        Stub resolver
+        """
+
+        self.calls.append(host)
+        if host not in self.records:
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (ip, port)) for ip in self.records[host]]
+
+    def test_ttl_round_robin(self):
+        """
+        Test
+        """
+
+        c = HttpDnsCache(ttl_ms=200, refresh_ahead_ms=0, resolver=self._resolver)
+
+        # Miss, then hits
+        ar = [c.getaddrinfo("three.local", 80)[0][4][0] for _ in range(6)]
+        self.assertEqual(ar, ["10.0.0.1", "10.0.0.2", "10.0.0.3"] * 2)
+        self.assertEqual(self.calls, ["three.local"])
+        self.assertEqual(c.miss_count, 1)
+        self.assertEqual(c.hit_count, 5)
+
+        # Single address
+        self.assertEqual(c.getaddrinfo("one.local", 80)[0][4], ("10.0.0.1", 80))
+        self.assertEqual(len(c), 2)
+
+        # Expired
+        SolBase.sleep(250)
+        c.getaddrinfo("three.local", 80)
+        self.assertEqual(self.calls, ["three.local", "one.local", "three.local"])
+
+        # Clear
+        c.clear()
+        self.assertEqual(len(c), 0)
+
+    def test_negative(self):
+        """
+        Test
+        """
+
+        c = HttpDnsCache(negative_ttl_ms=200, resolver=self._resolver)
+        for _ in range(3):
+            with self.assertRaises(socket.gaierror):
+                c.getaddrinfo("unknown.local", 80)
+        self.assertEqual(self.calls, ["unknown.local"])
+        self.assertEqual(c.negative_hit_count, 2)
+        self.assertEqual(c.error_count, 1)
+
+        # Expired, now known
+        SolBase.sleep(250)
+        self.records["unknown.local"] = ["10.0.0.9"]
+        self.assertEqual(c.getaddrinfo("unknown.local", 80)[0][4], ("10.0.0.9", 80))
+
+        # Disabled
+        c = HttpDnsCache(negative_ttl_ms=0, resolver=self._resolver)
+        for _ in range(2):
+            with self.assertRaises(socket.gaierror):
+                c.getaddrinfo("nope.local", 80)
+        self.assertEqual(self.calls.count("nope.local"), 2)
+
+    def test_refresh_ahead(self):
+        """
+        Test
+        """
+
+        c = HttpDnsCache(ttl_ms=300, refresh_ahead_ms=200, resolver=self._resolver)
+        c.getaddrinfo("one.local", 80)
+
+        # Not in refresh window
+        c.getaddrinfo("one.local", 80)
+        self.assertEqual(len(self.calls), 1)
+
+        # In refresh window : served from cache, refreshed in background (once)
+        SolBase.sleep(150)
+        self.records["one.local"] = ["10.0.0.5"]
+        self.assertEqual(c.getaddrinfo("one.local", 80)[0][4], ("10.0.0.1", 80))
+        self.assertEqual(c.getaddrinfo("one.local", 80)[0][4], ("10.0.0.1", 80))
+        SolBase.sleep(50)
+        self.assertEqual(c.refresh_count, 1)
+        self.assertEqual(len(self.calls), 2)
+
+        # Refreshed entry
+        self.assertEqual(c.getaddrinfo("one.local", 80)[0][4], ("10.0.0.5", 80))
+        self.assertEqual(len(self.calls), 2)
+        logger.info("c=%s", c)
@@ -0,0 +1,197 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import logging
+import os
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import unittest
+from os.path import dirname, abspath
+
+from pysolbase.SolBase import SolBase
+
+from pysolhttpclient.Http.HttpMtlsCache import HttpMtlsCache
+from pysolhttpclient.Http.HttpRequest import HttpRequest
+
+logger = logging.getLogger(__name__)
+
+
+# noinspection PyProtectedMember
+class TestHttpMtlsCache(unittest.TestCase):
+    """
+    Test description
+    """
+
+    # noinspection PyPep8Naming
+    def setUp(self):
+        """
+        Setup (called before each test)
+        """
+
+        HttpMtlsCache.clear()
+        self.check_interval_ms = HttpMtlsCache.CHECK_INTERVAL_MS
+
+        current_dir = dirname(abspath(__file__)) + SolBase.get_pathseparator()
+        self.mtls_dir = current_dir + "../z_mtls/"
+        self.s_client_crt = self.mtls_dir + "client.crt"
+        self.s_client_key = self.mtls_dir + "client.key"
+        self.s_client_pass = "zzzz"
+        self.s_ca_crt = self.mtls_dir + "ca.crt"
+
+        self.tmp_dir = tempfile.mkdtemp(prefix="test_mtls_")
+
+    # noinspection PyPep8Naming
+    def tearDown(self):
+        """
+        Setup (called after each test)
+        """
+
+        HttpMtlsCache.CHECK_INTERVAL_MS = self.check_interval_ms
+        HttpMtlsCache.clear()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _hreq_get(self, client_key, client_crt, client_pwd, ca_crt):
+        """
+        Get a mtls request
+        :return HttpRequest
+        :rtype HttpRequest
+        """
+
+        hreq = HttpRequest()
+        hreq.uri = "https://127.0.0.1:7943"
+        hreq.mtls_enabled = True
+        hreq.mtls_client_key = client_key
+        hreq.mtls_client_crt = client_crt
+        hreq.mtls_client_pwd = client_pwd
+        hreq.mtls_ca_crt = ca_crt
+        return hreq
+
+    def test_paths_and_bytes(self):
+        """
+        Test
+        """
+
+        # Paths
+        hreq = self._hreq_get(self.s_client_key, self.s_client_crt, self.s_client_pass, self.s_ca_crt)
+        k1 = hreq.mtls_pool_key_get()
+        self.assertTrue(k1.startswith("MTLS_"))
+        self.assertEqual(hreq.mtls_pool_key_get(), k1)
+        self.assertEqual(HttpMtlsCache.load_count, 1)
+
+        ctx1 = hreq.mtls_ssl_context_get()
+        self.assertIs(hreq.mtls_ssl_context_get(), ctx1)
+
+        # Bytes : same content, same key and context
+        with open(self.s_client_key, "rb") as f:
+            b_key = f.read()
+        with open(self.s_client_crt, "rb") as f:
+            b_crt = f.read()
+        with open(self.s_ca_crt, "rb") as f:
+            b_ca = f.read()
+        hreq2 = self._hreq_get(b_key, b_crt, self.s_client_pass, b_ca)
+        self.assertEqual(hreq2.mtls_pool_key_get(), k1)
+        self.assertIs(hreq2.mtls_ssl_context_get(), ctx1)
+        self.assertEqual(HttpMtlsCache.context_count, 1)
+
+        # Key never written to a temporary directory (memfd)
+        if hasattr(os, "memfd_create"):
+            mkdtemp = tempfile.mkdtemp
+            tempfile.mkdtemp = None
+            fd_count = len(os.listdir("/proc/self/fd"))
+            try:
+                HttpMtlsCache._context_build(HttpMtlsCache._content[hreq2.mtls_pool_key_get()[len("MTLS_"):]], True)
+            finally:
+                tempfile.mkdtemp = mkdtemp
+            self.assertEqual(len(os.listdir("/proc/self/fd")), fd_count)
+
+        # Secure : another context, hostname and certificate checked (insecure : none)
+        hreq2.https_insecure = False
+        ctx2 = hreq2.mtls_ssl_context_get()
+        self.assertIsNot(ctx2, ctx1)
+        self.assertTrue(ctx2.check_hostname)
+        self.assertEqual(ctx2.verify_mode, ssl.CERT_REQUIRED)
+        self.assertFalse(ctx1.check_hostname)
+        self.assertEqual(ctx1.verify_mode, ssl.CERT_NONE)
+
+        # No password : pool key ok, context fails (encrypted key), without prompting
+        hreq3 = self._hreq_get(self.s_client_key, self.s_client_crt, None, self.s_ca_crt)
+        self.assertNotEqual(hreq3.mtls_pool_key_get(), k1)
+        self.assertRaises(Exception, hreq3.mtls_ssl_context_get)
+
+        # Mtls off
+        hreq3.mtls_enabled = False
+        self.assertIsNone(hreq3.mtls_pool_key_get())
+
+    def test_no_file_access_and_rotation(self):
+        """
+        Test
+        """
+
+        client_key = os.path.join(self.tmp_dir, "client.key")
+        client_crt = os.path.join(self.tmp_dir, "client.crt")
+        shutil.copy(self.s_client_key, client_key)
+        shutil.copy(self.s_client_crt, client_crt)
+
+        hreq = self._hreq_get(client_key, client_crt, self.s_client_pass, None)
+        hreq.mtls_status_validate()
+        k1 = hreq.mtls_pool_key_get()
+
+        # Removed : still served from memory until checked
+        HttpMtlsCache.CHECK_INTERVAL_MS = 3600000
+        os.rename(client_crt, client_crt + ".bak")
+        for _ in range(0, 10):
+            hreq.mtls_status_validate()
+            self.assertEqual(hreq.mtls_pool_key_get(), k1)
+
+        # Checked : fails
+        HttpMtlsCache.CHECK_INTERVAL_MS = 0
+        self.assertRaisesRegex(Exception, "MTLS_FAILED.*mtls_client_crt.*", hreq.mtls_status_validate)
+
+        # Rotated : reloaded, new key
+        os.rename(client_crt + ".bak", client_crt)
+        with open(client_crt, "ab") as f:
+            f.write(b"\n")
+        k2 = hreq.mtls_pool_key_get()
+        self.assertNotEqual(k2, k1)
+        self.assertEqual(hreq.mtls_pool_key_get(), k2)
+        self.assertEqual(HttpMtlsCache.reload_count, 1)
+        self.assertIsNotNone(hreq.mtls_ssl_context_get())
+
+    def test_lock_after_monkey_patching(self):
+        """
+        Test
+        """
+
+        # Imported before monkey patching (subprocess) : the lock is created on first use, patched
+        code = "\n".join([
+            "from pysolhttpclient.Http.HttpRequest import HttpRequest",
+            "from pysolhttpclient.Http.HttpMtlsCache import HttpMtlsCache",
+            "from pysolbase.SolBase import SolBase",
+            "SolBase.voodoo_init()",
+            "import gevent.thread",
+            "assert HttpMtlsCache._locker is None",
+            "assert isinstance(HttpMtlsCache._locker_get(), gevent.thread.LockType)",
+        ])
+        subprocess.check_call([sys.executable, "-c", code], cwd=dirname(dirname(abspath(__file__))), timeout=30)
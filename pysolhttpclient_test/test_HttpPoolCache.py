@@ -0,0 +1,120 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import logging
+import unittest
+
+from pysolbase.SolBase import SolBase
+
+from pysolhttpclient.Http.HttpPoolCache import HttpPoolCache
+
+logger = logging.getLogger(__name__)
+
+
+# noinspection PyProtectedMember
+class TestHttpPoolCache(unittest.TestCase):
+    """
+    Test description
+    """
+
+    # noinspection PyPep8Naming
+    def setUp(self):
+        """
+        Setup (called before each test)
+        """
+
+        self.closed = list()
+
+    # noinspection PyPep8Naming
+    def tearDown(self):
+        """
+        Setup (called after each test)
+        """
+
+        pass
+
+    def test_lru(self):
+        """
+        Test
+        """
+
+        c = HttpPoolCache("test", close_func=self.closed.append, max_size=2, idle_ttl_ms=None)
+        self.assertIsNone(c.get("a"))
+
+        c.put("a", "pa")
+        c.put("b", "pb")
+        self.assertEqual(len(c), 2)
+
+        # Touch a, b is now the least recently used
+        self.assertEqual(c.get("a"), "pa")
+        c.put("c", "pc")
+        self.assertEqual(len(c), 2)
+        self.assertIn("a", c)
+        self.assertNotIn("b", c)
+        self.assertIn("c", c)
+        self.assertEqual(self.closed, ["pb"])
+        self.assertEqual(c.evicted_lru_count, 1)
+        self.assertEqual(c.evicted_idle_count, 0)
+
+        # Clear
+        c.clear()
+        self.assertEqual(len(c), 0)
+        self.assertEqual(sorted(self.closed), ["pa", "pb", "pc"])
+
+    def test_idle(self):
+        """
+        Test
+        """
+
+        c = HttpPoolCache("test", close_func=self.closed.append, max_size=1024, idle_ttl_ms=100)
+        c.idle_check_interval_ms = 0
+        c.put("a", "pa")
+        c.put("b", "pb")
+        SolBase.sleep(150)
+
+        # Touch b : a is evicted
+        c.put("c", "pc")
+        self.assertNotIn("a", c)
+        self.assertNotIn("b", c)
+        self.assertIn("c", c)
+        self.assertEqual(sorted(self.closed), ["pa", "pb"])
+        self.assertEqual(c.evicted_idle_count, 2)
+
+        # Explicit
+        SolBase.sleep(150)
+        c.evict_idle()
+        self.assertEqual(len(c), 0)
+        self.assertEqual(c.evicted_idle_count, 3)
+
+    def test_close_exception(self):
+        """
+        Test
+        """
+
+        def _close(_):
+            raise Exception("ko")
+
+        c = HttpPoolCache("test", close_func=_close, max_size=1, idle_ttl_ms=None)
+        c.put("a", "pa")
+        c.put("b", "pb")
+        self.assertEqual(len(c), 1)
+        self.assertEqual(c.evicted_lru_count, 1)
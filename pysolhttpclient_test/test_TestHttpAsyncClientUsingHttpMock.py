@@ -0,0 +1,273 @@
+"""# -*- coding: utf-8 -*-
+# ===============================================================================
+#
+# Copyright (C) 2013/2025 Laurent Labatut / Laurent Champagnac
+#
+#
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
+# ===============================================================================
+"""
+import subprocess
+import sys
+
+from pysolbase.SolBase import SolBase
+
+# HttpMock is gevent based : we need cooperative asyncio loop (monkey patched selectors)
+SolBase.voodoo_init()
+import asyncio
+import logging
+import unittest
+from io import BytesIO
+from urllib import parse
+
+from gevent.server import StreamServer
+
+from pysolhttpclient.Http.HttpImpl import HttpImpl
+from pysolhttpclient.Http.HttpRequest import HttpRequest
+from pysolhttpclient.HttpAsync.HttpAsyncClient import HttpAsyncClient
+from pysolhttpclient.HttpMock.HttpMock import HttpMock
+
+logger = logging.getLogger(__name__)
+
+
+# noinspection PyProtectedMember
+class TestHttpAsyncClientUsingHttpMock(unittest.TestCase):
+    """
+    Test description
+    """
+
+    # noinspection PyPep8Naming
+    def setUp(self):
+        """
+        Setup (called before each test)
+        """
+
+        self.h = None
+
+    # noinspection PyPep8Naming
+    def tearDown(self):
+        """
+        Setup (called after each test)
+        """
+
+        if self.h:
+            self.h.stop()
+            self.h = None
+
+    def test_import_no_monkey_patch(self):
+        """
+        Test
+        """
+
+        cmd = "import pysolhttpclient.HttpAsync.HttpAsyncClient; " \
+              "import pysolhttpclient.Http.HttpRequest; " \
+              "from gevent import monkey; " \
+              "print(monkey.is_module_patched('socket'))"
+        out = subprocess.check_output([sys.executable, "-c", cmd]).decode("utf-8").strip()
+        self.assertEqual(out, "False")
+
+    def test_httpmock_asyncio(self):
+        """
+        Test
+        """
+
+        self.h = HttpMock()
+        self.h.start()
+        self.assertTrue(self.h._is_running)
+
+        v = parse.urlencode({"p1": "v1 2.3/4"})
+        hc = HttpAsyncClient()
+
+        async def _go():
+            # AUTO-DETECT : Http get
+            for _ in range(0, 4):
+                hreq = HttpRequest()
+                hreq.uri = "http://127.0.0.1:7900/unittest?" + v
+                hresp = await hc.go_http_async(hreq)
+                logger.info("Got=%s", hresp)
+                self.assertIsNone(hresp.exception)
+                self.assertEqual(hresp.http_implementation, HttpImpl.HTTP_IMPL_ASYNCIO)
+                self.assertEqual(hresp.status_code, 200)
+                self.assertEqual(SolBase.binary_to_unicode(hresp.buffer, "utf-8"),
+                                 "OK\nfrom_qs={'p1': 'v1 2.3/4'} -EOL\nfrom_post={} -EOL\nfrom_method=GET\n")
+                self.assertEqual(hresp.content_length, len(hresp.buffer))
+                self.assertGreater(len(hresp.headers), 0)
+
+            # Keep alive
+            self.assertEqual(len(hc._pool), 1)
+            self.assertEqual(hc._pool.items()[0][1].connections_created, 1)
+
+            # AUTO-DETECT : Http post
+            hreq = HttpRequest()
+            hreq.uri = "http://127.0.0.1:7900/unittest"
+            hreq.post_data = v
+            hresp = await hc.go_http_async(hreq)
+            self.assertIsNone(hresp.exception)
+            self.assertEqual(hresp.status_code, 200)
+            self.assertEqual(SolBase.binary_to_unicode(hresp.buffer, "utf-8"),
+                             "OK\nfrom_qs={} -EOL\nfrom_post={b'p1': b'v1 2.3/4'} -EOL\nfrom_method=POST\n")
+
+            # No post
+            for cur_method in ["GET", "HEAD", "OPTIONS", "TRACE"]:
+                hreq = HttpRequest()
+                hreq.force_http_implementation = HttpImpl.HTTP_IMPL_ASYNCIO
+                hreq.uri = "http://127.0.0.1:7900/unittest?" + v
+                hreq.method = cur_method
+                hresp = await hc.go_http_async(hreq)
+                self.assertIsNone(hresp.exception)
+                self.assertEqual(hresp.status_code, 200)
+                if cur_method == "HEAD":
+                    self.assertEqual(hresp.buffer, b"")
+                else:
+                    self.assertEqual(SolBase.binary_to_unicode(hresp.buffer, "utf-8"),
+                                     "OK\nfrom_qs={'p1': 'v1 2.3/4'} -EOL\nfrom_post={} -EOL\nfrom_method=" + cur_method + "\n")
+
+            # Post (buffer, stream with and without length)
+            for cur_method in ["GET", "TRACE", "POST", "PUT", "PATCH", "DELETE"]:
+                for cur_data, cur_len in [
+                    (lambda: v, None),
+                    (lambda: iter([v[:3], v[3:]]), None),
+                    (lambda: iter([v[:3], v[3:]]), len(v)),
+                ]:
+                    hreq = HttpRequest()
+                    hreq.uri = "http://127.0.0.1:7900/unittest"
+                    hreq.method = cur_method
+                    hreq.post_data = cur_data()
+                    hreq.post_data_length = cur_len
+                    hresp = await hc.go_http_async(hreq)
+                    self.assertIsNone(hresp.exception)
+                    self.assertEqual(hresp.status_code, 200)
+                    self.assertEqual(SolBase.binary_to_unicode(hresp.buffer, "utf-8"),
+                                     "OK\nfrom_qs={} -EOL\nfrom_post={b'p1': b'v1 2.3/4'} -EOL\nfrom_method=" + cur_method + "\n")
+
+            # Post, file-like stream (read in executor)
+            hreq = HttpRequest()
+            hreq.uri = "http://127.0.0.1:7900/unittest"
+            hreq.post_data = BytesIO(v.encode("utf-8"))
+            hresp = await hc.go_http_async(hreq)
+            self.assertIsNone(hresp.exception)
+            self.assertIn("from_post={b'p1': b'v1 2.3/4'}", SolBase.binary_to_unicode(hresp.buffer, "utf-8"))
+
+            # Cr/lf in headers : rejected (request splitting)
+            for headers in [{"X-A": "a\r\nX-Injected: b"}, {"X-A\nX-B": "a"}]:
+                hreq = HttpRequest()
+                hreq.uri = "http://127.0.0.1:7900/unittest"
+                hreq.headers = headers
+                hresp = await hc.go_http_async(hreq)
+                self.assertIsInstance(hresp.exception, ValueError)
+
+            # Concurrent
+            ar_req = list()
+            for i in range(0, 16):
+                hreq = HttpRequest()
+                hreq.uri = "http://127.0.0.1:7900/unittest?" + parse.urlencode({"p1": str(i)})
+                ar_req.append(hreq)
+            ar_resp = await asyncio.gather(*[hc.go_http_async(hreq) for hreq in ar_req])
+            for i, hresp in enumerate(ar_resp):
+                self.assertIsNone(hresp.exception)
+                self.assertIn("from_qs={'p1': '%s'}" % i, SolBase.binary_to_unicode(hresp.buffer, "utf-8"))
+
+            # Invalid
+            hreq = HttpRequest()
+            hreq.uri = "http://127.0.0.1:7900/invalid"
+            hresp = await hc.go_http_async(hreq)
+            self.assertEqual(hresp.status_code, 400)
+
+            # Not supported
+            hreq = HttpRequest()
+            hreq.uri = "http://127.0.0.1:7900/unittest"
+            hreq.force_http_implementation = HttpImpl.HTTP_IMPL_GEVENT
+            hresp = await hc.go_http_async(hreq)
+            self.assertIsNotNone(hresp.exception)
+
+            hc.close()
+
+        asyncio.run(_go())
+
+        # Over
+        self.h.stop()
+        self.h = None
+
+    def test_asyncio_general_timeout(self):
+        """
+        Test
+        """
+
+        # Server which accepts and never replies
+        def _handle(sock, _):
+            SolBase.sleep(10000)
+            sock.close()
+
+        server = StreamServer(("127.0.0.1", 0), _handle)
+        server.start()
+        try:
+            hc = HttpAsyncClient()
+            hreq = HttpRequest()
+            hreq.uri = "http://127.0.0.1:%s/unittest" % server.server_port
+            hreq.general_timeout_ms = 500
+            hresp = asyncio.run(hc.go_http_async(hreq))
+            self.assertIsNotNone(hresp.exception)
+            self.assertIn("Timeout while processing", str(hresp.exception))
+            self.assertLess(hresp.elapsed_ms, 5000)
+        finally:
+            server.stop(timeout=0)
+
+    def test_asyncio_stale_rewind(self):
+        """
+        Test
+        """
+
+        # Server : one request per connection, echo body ; a second request on the connection gets it closed (stale)
+        d = {"connections": 0}
+
+        def _handle(sock, _):
+            d["connections"] += 1
+            f = sock.makefile("rb")
+            content_length = 0
+            line = f.readline()
+            while line and line != b"\r\n":
+                line = f.readline()
+                k, _, v = line.decode("latin-1").partition(":")
+                if k.strip().lower() == "content-length":
+                    content_length = int(v)
+            body = f.read(content_length)
+            sock.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+            f.readline()
+            f.close()
+            sock.close()
+
+        server = StreamServer(("127.0.0.1", 0), _handle)
+        server.start()
+        try:
+            hc = HttpAsyncClient()
+
+            async def _go():
+                for i in range(3):
+                    hreq = HttpRequest()
+                    hreq.uri = "http://127.0.0.1:%s/" % server.server_port
+                    hreq.method = "PUT"
+                    hreq.post_data = BytesIO(b"body_%d" % i)
+                    hreq.post_data_length = 6
+                    hresp = await hc.go_http_async(hreq)
+                    self.assertIsNone(hresp.exception)
+                    self.assertEqual(hresp.buffer, b"body_%d" % i)
+                hc.close()
+
+            # Stale keep-alive connections : retried, file body rewound
+            asyncio.run(_go())
+            self.assertEqual(d["connections"], 3)
+        finally:
+            server.stop(timeout=0)
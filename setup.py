@@ -50,7 +50,7 @@ setup(
     version=p_version,
 
     # Packages
-    packages=find_packages(exclude=["*_test*", "_*"]),
+    packages=find_packages(exclude=["*_test*", "*_bench*", "_*"]),
     include_package_data=True,
 
     # License & read me